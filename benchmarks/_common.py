@@ -0,0 +1,30 @@
+"""
+Shared helpers for the extractor benchmarks
+"""
+
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COMPONENTS_PATH = REPO_ROOT / "frontend" / "src" / "lib" / "components"
+
+# Make the top-level scripts importable when running from benchmarks/
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+def build_copied_corpus(target_dir: Path, copies: int) -> Path:
+    """Replicate the repo's components directory `copies` times under target_dir"""
+    target_dir = Path(target_dir)
+    for i in range(copies):
+        shutil.copytree(COMPONENTS_PATH, target_dir / f"copy_{i:04d}")
+    return target_dir
+
+@contextmanager
+def timed(label: str, results: dict):
+    """Record the wall time of the block under results[label]"""
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
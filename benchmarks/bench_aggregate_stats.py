@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Time the summary report statistics (top-k lists, percentiles, property
+co-occurrence, directory rollups) on synthetic aggregates of growing size,
+with the pure-Python backend of css_stats and, when installed, NumPy.
+"""
+
+import argparse
+import random
+import time
+
+import _common  # noqa: F401  (puts the repo root on sys.path)
+
+from css_aggregates import CSSAggregates
+from css_stats import AggregateStats, np
+
+def synthetic_components(count: int, property_pool: int, per_component: int, seed: int = 0):
+    rng = random.Random(seed)
+    pool = [f"prop-{i}" for i in range(property_pool)]
+    for c in range(count):
+        rules = {}
+        for r in range(rng.randint(1, max(1, per_component // 2))):
+            rules[f".c{c}-r{r}"] = {p: f"{rng.randint(0, 99)}px" for p in rng.sample(pool, 4)}
+        yield f"Component{c}", {'has_styles': True, 'css_rules': rules,
+                                'relative_path': f"group{c % 200}/Component{c}.svelte"}
+
+def report_statistics(stats: AggregateStats) -> None:
+    stats.most_rules(15)
+    stats.most_diverse(15)
+    for values in (stats.rule_counts, stats.unique_counts, stats.property_component_counts()):
+        stats.percentiles(values, (50, 90, 99))
+    stats.cooccurrence(10)
+    stats.directory_rollups()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--properties', type=int, default=300)
+    parser.add_argument('--per-component', type=int, default=24)
+    args = parser.parse_args()
+
+    backends = [False, True] if np is not None else [False]
+    if np is None:
+        print("NumPy is not installed; timing the pure-Python backend only")
+    print(f"{'components':>10} {'collect s':>10} " + " ".join(f"{('numpy' if b else 'python') + ' s':>9}" for b in backends))
+    for size in args.sizes:
+        start = time.perf_counter()
+        aggregates = CSSAggregates.collect(synthetic_components(size, args.properties, args.per_component))
+        collect_time = time.perf_counter() - start
+        times = []
+        for use_numpy in backends:
+            start = time.perf_counter()
+            report_statistics(AggregateStats(aggregates, use_numpy=use_numpy))
+            times.append(time.perf_counter() - start)
+        print(f"{size:>10} {collect_time:>10.3f} " + " ".join(f"{t:>9.3f}" for t in times))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the single-pass css_parser against the original regex rule
+matcher, over every style block in frontend/src/lib/components.
+"""
+
+import argparse
+import re
+import time
+
+from _common import COMPONENTS_PATH
+from css_extractor import SvelteCSSExtractor
+from css_parser import parse_stylesheet, rules_to_dict
+
+def legacy_parse_css_rules(css_content: str) -> dict:
+    """The regex implementation parse_css_rules used before css_parser"""
+    rules = {}
+    css_content = re.sub(r'/\*.*?\*/', '', css_content, flags=re.DOTALL)
+    rule_pattern = r'([^{}]+)\s*{\s*([^{}]*)\s*}'
+    for match in re.finditer(rule_pattern, css_content):
+        selector = match.group(1).strip()
+        properties_block = match.group(2).strip()
+        properties = {}
+        prop_pattern = r'([^:;]+)\s*:\s*([^:;]+)(?:;|$)'
+        for prop_match in re.finditer(prop_pattern, properties_block):
+            property_name = prop_match.group(1).strip()
+            property_value = prop_match.group(2).strip()
+            if property_name and property_value:
+                properties[property_name] = property_value
+        if properties:
+            rules[selector] = properties
+    return rules
+
+def tokenizer_parse_css_rules(css_content: str) -> dict:
+    return rules_to_dict(parse_stylesheet(css_content))
+
+def load_style_blocks() -> list:
+    extractor = SvelteCSSExtractor(str(COMPONENTS_PATH))
+    blocks = []
+    for file_path in sorted(COMPONENTS_PATH.rglob("*.svelte")):
+        style = extractor.extract_style_section(file_path.read_text(encoding='utf-8'))
+        if style:
+            blocks.append(style)
+    return blocks
+
+def bench(parse, blocks: list, rounds: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for block in blocks:
+            parse(block)
+    elapsed = time.perf_counter() - start
+    declarations = sum(len(props) for block in blocks for props in parse(block).values())
+    return elapsed, declarations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+    
+    blocks = load_style_blocks()
+    total_bytes = sum(len(b) for b in blocks)
+    print(f"Style blocks: {len(blocks)} ({total_bytes / 1024:.1f} KiB), {args.rounds} rounds")
+    
+    for label, parse in (('regex', legacy_parse_css_rules), ('tokenizer', tokenizer_parse_css_rules)):
+        elapsed, declarations = bench(parse, blocks, args.rounds)
+        per_block = elapsed / (len(blocks) * args.rounds) * 1e6
+        throughput = total_bytes * args.rounds / elapsed / 1024 / 1024
+        print(f"{label:>10}: {elapsed:.3f}s total, {per_block:.1f} us/block, "
+              f"{throughput:.1f} MiB/s, {declarations} declarations kept")
+
+if __name__ == "__main__":
+    main()
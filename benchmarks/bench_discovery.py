@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare Path.rglob("*.svelte") with the pruned scandir discovery on a
+frontend-like tree: the real components plus a large node_modules (with
+.svelte files shipped by packages) and .svelte-kit build output, ignored
+through the tree's .gitignore.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from _common import COMPONENTS_PATH
+from css_discovery import iter_svelte_files
+
+def build_frontend_tree(root: Path, packages: int, files_per_package: int) -> Path:
+    frontend = root / "frontend"
+    shutil.copytree(COMPONENTS_PATH, frontend / "src" / "lib" / "components")
+    (frontend / ".gitignore").write_text("node_modules\n/.svelte-kit\n/build\n", encoding='utf-8')
+    for i in range(packages):
+        package = frontend / "node_modules" / f"package-{i:04d}"
+        for j in range(files_per_package):
+            folder = package / ("dist" if j % 2 else "src") / f"module_{j % 7}"
+            folder.mkdir(parents=True, exist_ok=True)
+            suffix = ".svelte" if j % 10 == 0 else ".js"
+            (folder / f"file_{j}{suffix}").write_text("export default {};\n", encoding='utf-8')
+    for j in range(files_per_package * 10):
+        folder = frontend / ".svelte-kit" / "output" / f"chunk_{j % 50}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"entry_{j}.js").write_text("", encoding='utf-8')
+    return frontend
+
+def time_discovery(files_iter) -> tuple:
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in files_iter:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return count, time.perf_counter() - start, first or 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--packages', type=int, default=1000, help="Packages in node_modules")
+    parser.add_argument('--files-per-package', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3, help="Best of N runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frontend = build_frontend_tree(Path(tmp), args.packages, args.files_per_package)
+        results = {}
+        for label, make_iter in (('rglob', lambda: frontend.rglob("*.svelte")),
+                                 ('scandir', lambda: iter_svelte_files(frontend))):
+            runs = [time_discovery(make_iter()) for _ in range(args.repeat)]
+            results[label] = min(runs, key=lambda r: r[1])
+
+    print(f"Tree: {args.packages} packages x {args.files_per_package} files in node_modules")
+    for label, (count, total, first) in results.items():
+        print(f"{label:<8} {count:6d} files  total {total * 1000:8.1f} ms  first file after {first * 1000:7.2f} ms")
+    print(f"Speedup: {results['rglob'][1] / results['scandir'][1]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Retained memory of the extractor state (components_data and the property
+set) with nested dicts, with the compact css_model records, and with the
+compact records without raw_css, measured with tracemalloc over a synthetic
+corpus. Also checks that the dict and compact runs write identical JSON.
+With --lookups, also times comp['css_rules'][selector][prop] on both forms.
+"""
+
+import argparse
+import contextlib
+import filecmp
+import gc
+import io
+import tempfile
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import _common  # noqa: F401  (puts the repo root on sys.path)
+from synthetic_corpus import generate_corpus
+from css_extractor import SvelteCSSExtractor
+
+MODES = {
+    'dict': {'compact': False},
+    'compact': {'compact': True},
+    'compact, no raw_css': {'compact': True, 'keep_raw_css': False},
+}
+
+def measure(corpus: Path, output: Path, options: dict) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    extractor = SvelteCSSExtractor(str(corpus), **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.process_all_components()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.save_results(str(output))
+    return retained, peak, elapsed
+
+def time_lookups(corpus: Path) -> dict:
+    """Mean time of one css_rules[selector][prop] lookup (every declaration, last in its rule first)"""
+    timings = {}
+    for label, compact in (('dict', False), ('compact', True)):
+        extractor = SvelteCSSExtractor(str(corpus), compact=compact)
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.process_all_components()
+        lookups = [(component['css_rules'], selector, prop)
+                   for component in extractor.components_data.values()
+                   for selector, properties in component['css_rules'].items()
+                   for prop in reversed(list(properties))]
+
+        def run():
+            for css_rules, selector, prop in lookups:
+                css_rules[selector][prop]
+
+        timings[label] = min(timeit.repeat(run, number=1, repeat=5)) / len(lookups)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--components', type=int, default=10000, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lookups', action='store_true', help="Also time selector/property lookups")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = generate_corpus(tmp / "corpus", args.components, args.seed)
+        results = {}
+        for i, (label, options) in enumerate(MODES.items()):
+            results[label] = measure(corpus, tmp / f"results_{i}.json", options)
+        identical = filecmp.cmp(tmp / "results_0.json", tmp / "results_1.json", shallow=False)
+        lookups = time_lookups(corpus) if args.lookups else None
+
+    baseline = results['dict'][0]
+    print(f"Components: {args.components}")
+    for label, (retained, peak, elapsed) in results.items():
+        print(f"{label:<20} retained {retained / 1e6:7.1f} MB ({retained / baseline:5.1%})  "
+              f"peak {peak / 1e6:7.1f} MB  extract {elapsed:6.2f}s (traced)")
+    print(f"JSON output identical (dict vs compact): {identical}")
+    if lookups:
+        print("Lookup css_rules[selector][prop]: " + ", ".join(
+            f"{label} {seconds * 1e6:.2f} us" for label, seconds in lookups.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare the export writers over a synthetic corpus: the previous per-row
+writerow / json.dump writers against css_output's batched writers, with and
+without gzip, serially and with CSV files written on threads. Reports wall
+time, throughput (uncompressed MB/s) and bytes on disk for the CSV set and
+the JSON results.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import _common  # noqa: F401  (puts the repo root on sys.path)
+
+from synthetic_corpus import generate_corpus
+from css_aggregates import CSSAggregates
+from css_extractor import SvelteCSSExtractor
+from css_model import json_default
+from css_pipeline import live_results
+from json_to_csv import write_csv_files
+
+def directory_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in Path(path).iterdir())
+
+def legacy_csv_files(data: dict, output_dir: Path) -> None:
+    """The pre-css_output writers: one writerow call per row, default buffering"""
+    output_dir.mkdir(exist_ok=True)
+
+    def write_rows(path, headers, rows):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+
+    write_rows(output_dir / "css_properties_by_component.csv",
+               data['csv_data']['property_rows']['headers'], data['csv_data']['property_rows']['data'])
+    write_rows(output_dir / "components_by_css_properties.csv",
+               data['csv_data']['component_rows']['headers'], data['csv_data']['component_rows']['data'])
+    with open(output_dir / "detailed_css_rules.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Component', 'Selector', 'Property', 'Value', 'File Path'])
+        aggregates = CSSAggregates.collect(data['components'].items(), on_declaration=lambda *row: writer.writerow(row))
+    write_rows(output_dir / "component_summary.csv",
+               ['Component', 'File Path', 'Has Styles', 'CSS Rules Count', 'Unique Properties Count'],
+               (list(stats) for stats in aggregates.components))
+    write_rows(output_dir / "css_custom_properties.csv",
+               ['Component', 'Selector', 'Property', 'Custom Property Used', 'Full Value', 'File Path'],
+               aggregates.token_rows)
+    write_rows(output_dir / "unused_selectors.csv", ['Component', 'Unused Selector', 'File Path'],
+               aggregates.unused_selector_rows)
+
+def legacy_json(extractor: SvelteCSSExtractor, path: Path) -> None:
+    results = {'metadata': extractor.metadata(), 'components': extractor.components_data,
+               'csv_data': extractor.generate_csv_data()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False, default=json_default)
+
+def timed_run(func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--components', type=int, default=10000)
+    parser.add_argument('--writers', type=int, default=4, help="Threads for the concurrent variants")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = generate_corpus(tmp / "corpus", args.components, args.seed)
+        extractor = SvelteCSSExtractor(str(corpus))
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.process_all_components()
+        index = extractor.property_index()
+
+        csv_variants: Dict[str, Callable[[Path], None]] = {
+            'legacy writerow': lambda out: legacy_csv_files(live_results(extractor, index), out),
+            'batched': lambda out: write_csv_files(live_results(extractor, index), str(out)),
+            f'batched, {args.writers} threads':
+                lambda out: write_csv_files(live_results(extractor, index), str(out), workers=args.writers),
+            'gzip': lambda out: write_csv_files(live_results(extractor, index), str(out), compress=True),
+            f'gzip, {args.writers} threads':
+                lambda out: write_csv_files(live_results(extractor, index), str(out), compress=True,
+                                            workers=args.writers),
+        }
+        raw_bytes = None
+        print(f"CSV set, {args.components} components")
+        print(f"{'variant':<22} {'seconds':>8} {'MB/s':>8} {'MiB on disk':>12}")
+        for i, (label, run) in enumerate(csv_variants.items()):
+            out = tmp / f"csv{i}"
+            seconds = timed_run(lambda: run(out))
+            size = directory_bytes(out)
+            raw_bytes = raw_bytes or size
+            print(f"{label:<22} {seconds:>8.3f} {raw_bytes / seconds / 1e6:>8.1f} {size / 2**20:>12.2f}")
+
+        print(f"\nJSON results")
+        print(f"{'variant':<22} {'seconds':>8} {'MB/s':>8} {'MiB on disk':>12}")
+        json_variants = {
+            'legacy json.dump': lambda: legacy_json(extractor, tmp / "legacy.json"),
+            'batched': lambda: extractor.save_results(str(tmp / "batched.json"), index=index),
+            'gzip': lambda: extractor.save_results(str(tmp / "gzip.json"), index=index, compress=True),
+        }
+        outputs = {'legacy json.dump': "legacy.json", 'batched': "batched.json", 'gzip': "gzip.json.gz"}
+        raw_bytes = None
+        for label, run in json_variants.items():
+            seconds = timed_run(run)
+            size = (tmp / outputs[label]).stat().st_size
+            raw_bytes = raw_bytes or size
+            print(f"{label:<22} {seconds:>8.3f} {raw_bytes / seconds / 1e6:>8.1f} {size / 2**20:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compare serial and parallel SvelteCSSExtractor scans over a replicated corpus
+and check that both produce byte-identical JSON output.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from _common import build_copied_corpus, timed
+from css_extractor import SvelteCSSExtractor
+
+def run_scan(corpus: Path, output: Path, workers: int, chunksize: int) -> None:
+    extractor = SvelteCSSExtractor(str(corpus))
+    with contextlib.redirect_stdout(io.StringIO()):
+        extractor.process_all_components(workers=workers, chunksize=chunksize)
+        extractor.save_results(str(output))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--copies', type=int, default=20, help="Copies of the components tree")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=16)
+    args = parser.parse_args()
+    
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = build_copied_corpus(tmp / "corpus", args.copies)
+        file_count = sum(1 for _ in corpus.rglob("*.svelte"))
+        
+        with timed('serial', timings):
+            run_scan(corpus, tmp / "serial.json", 1, args.chunksize)
+        with timed('parallel', timings):
+            run_scan(corpus, tmp / "parallel.json", args.workers, args.chunksize)
+        
+        identical = (tmp / "serial.json").read_bytes() == (tmp / "parallel.json").read_bytes()
+    
+    print(f"Files scanned: {file_count}")
+    print(f"Serial:   {timings['serial']:.3f}s")
+    print(f"Parallel: {timings['parallel']:.3f}s ({args.workers} workers, chunksize {args.chunksize})")
+    print(f"Speedup:  {timings['serial'] / timings['parallel']:.2f}x")
+    print(f"Output identical: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Per-file cost of the extraction hot path before and after the shared,
+precompiled patterns in css_patterns and the fused single-pass parser.
+
+The "legacy" path reproduces the original scripts: string patterns handed to
+re.* on every call, a separate comment-strip, rule-match and per-rule
+property-match pass, and the var() scan with its import inside the loop.
+Run with --profile to see where the remaining per-file time goes.
+"""
+
+import argparse
+import cProfile
+import pstats
+import re
+import time
+
+from _common import COMPONENTS_PATH
+from css_aggregates import CSSAggregates
+from css_extractor import SvelteCSSExtractor
+
+def legacy_file_pass(content: str) -> int:
+    match = re.search(r'<style[^>]*>(.*?)</style>', content, re.DOTALL)
+    if not match:
+        return 0
+    css_content = re.sub(r'/\*.*?\*/', '', match.group(1).strip(), flags=re.DOTALL)
+    references = 0
+    for rule in re.finditer(r'([^{}]+)\s*{\s*([^{}]*)\s*}', css_content):
+        for prop in re.finditer(r'([^:;]+)\s*:\s*([^:;]+)(?:;|$)', rule.group(2).strip()):
+            value = prop.group(2).strip()
+            if 'var(' in value:
+                import re as regex
+                references += len(regex.findall(r'var\((--[^,)]+)', value))
+    return references
+
+def current_file_pass(extractor: SvelteCSSExtractor, content: str) -> int:
+    style = extractor.extract_style_section(content)
+    if not style:
+        return 0
+    rules = extractor.parse_css_rules(style)
+    aggregates = CSSAggregates.collect([('bench', {'has_styles': True, 'css_rules': rules})])
+    return len(aggregates.token_rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--profile', action='store_true', help="Print a cProfile breakdown of the current path")
+    args = parser.parse_args()
+    
+    contents = [p.read_text(encoding='utf-8') for p in sorted(COMPONENTS_PATH.rglob("*.svelte"))]
+    extractor = SvelteCSSExtractor(str(COMPONENTS_PATH))
+    runs = {
+        'legacy': lambda: [legacy_file_pass(c) for c in contents],
+        'current': lambda: [current_file_pass(extractor, c) for c in contents],
+    }
+    
+    print(f"Files: {len(contents)}, rounds: {args.rounds}")
+    for label, run in runs.items():
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            run()
+        per_file = (time.perf_counter() - start) / (args.rounds * len(contents)) * 1e6
+        print(f"{label:>8}: {per_file:.1f} us/file")
+    
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(args.rounds):
+            runs['current']()
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats('tottime').print_stats(12)
+
+if __name__ == "__main__":
+    main()
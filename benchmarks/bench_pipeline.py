@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Stage-by-stage benchmark of the extractor pipeline over synthetic corpora.
+For each corpus size, times discover, parse, matrix build, JSON write, CSV
+write and the summary report, records memory per stage and writes the
+results as JSON so runs can be compared for regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List
+
+from _common import REPO_ROOT
+from synthetic_corpus import corpus_stats, generate_corpus
+from create_clean_summary import write_summary_report
+from css_extractor import SvelteCSSExtractor
+from css_pipeline import live_results
+from json_to_csv import write_csv_files
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+def max_rss_kb() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+@contextmanager
+def stage(name: str, stages: Dict[str, Dict[str, Any]], trace_memory: bool):
+    """Record seconds, max RSS and (with tracemalloc) the Python heap peak of a stage"""
+    if trace_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield
+    result = {'seconds': round(time.perf_counter() - start, 6), 'max_rss_kb': max_rss_kb()}
+    if trace_memory:
+        result['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+    stages[name] = result
+
+def run_stages(corpus: Path, work_dir: Path, trace_memory: bool) -> Dict[str, Dict[str, Any]]:
+    stages: Dict[str, Dict[str, Any]] = {}
+    extractor = SvelteCSSExtractor(str(corpus))
+    with contextlib.redirect_stdout(io.StringIO()):
+        with stage('discover', stages, trace_memory):
+            svelte_files = list(corpus.rglob("*.svelte"))
+        with stage('parse', stages, trace_memory):
+            for file_path in svelte_files:
+                extractor.add_component(extractor.extract_component_css(file_path))
+        with stage('matrix', stages, trace_memory):
+            index = extractor.property_index()
+        with stage('json_write', stages, trace_memory):
+            extractor.save_results(str(work_dir / "svelte_css_analysis.json"), index=index)
+        with stage('csv_write', stages, trace_memory):
+            _, aggregates = write_csv_files(live_results(extractor, index), str(work_dir / "csv"))
+        with stage('report', stages, trace_memory):
+            write_summary_report(extractor.metadata(), aggregates, str(work_dir / "summary.md"))
+    return stages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Corpus sizes in components (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', type=Path,
+                        help="Keep generated corpora here and reuse them on later runs (default: temporary)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also record the traced Python heap peak per stage (slows every stage down)")
+    parser.add_argument('--output', type=Path, default=Path("bench_pipeline.json"),
+                        help="Where to write the machine-readable results")
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_root = args.corpus_dir or Path(tmp) / "corpora"
+        for size in args.sizes:
+            corpus = generate_corpus(corpus_root / f"synthetic_{size}_seed{args.seed}", size, args.seed)
+            work_dir = Path(tmp) / f"out_{size}"
+            work_dir.mkdir()
+            if args.tracemalloc:
+                tracemalloc.start()
+            try:
+                stages = run_stages(corpus, work_dir, args.tracemalloc)
+            finally:
+                if args.tracemalloc:
+                    tracemalloc.stop()
+            run = {'components': size, **corpus_stats(corpus), 'stages': stages,
+                   'total_seconds': round(sum(s['seconds'] for s in stages.values()), 6)}
+            runs.append(run)
+
+            print(f"{size} components ({run['bytes'] / 1e6:.1f} MB):")
+            for name, result in stages.items():
+                memory = f", traced peak {result['peak_traced_bytes'] / 1e6:.1f} MB" if args.tracemalloc else ""
+                print(f"  {name:<10} {result['seconds']:8.3f}s  (max RSS {result['max_rss_kb'] / 1024:.0f} MB{memory})")
+            print(f"  {'total':<10} {run['total_seconds']:8.3f}s")
+
+    results = {
+        'benchmark': 'pipeline',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'tracemalloc': args.tracemalloc,
+        'repo': str(REPO_ROOT),
+        'runs': runs,
+    }
+    args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare the indented JSON results with the binary snapshot: write time, file
+size, time to open and read the metadata, and time and traced memory for the
+json_to_csv / summary path (load, aggregate, write CSVs). Also checks that
+both inputs produce byte-identical CSV files.
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from _common import timed
+from synthetic_corpus import generate_corpus
+from css_aggregates import CSSAggregates
+from css_extractor import SvelteCSSExtractor
+from css_results import load_results
+from json_to_csv import write_csv_files
+
+def measure_load(path: Path, csv_dir: Path, timings: dict, label: str) -> None:
+    with timed(f'{label}_open', timings):
+        data = load_results(str(path))
+        data['metadata']['total_components']
+    with timed(f'{label}_aggregate', timings):
+        CSSAggregates.collect(load_results(str(path))['components'].items())
+    with timed(f'{label}_csv', timings):
+        write_csv_files(load_results(str(path)), str(csv_dir))
+
+    tracemalloc.start()
+    CSSAggregates.collect(load_results(str(path))['components'].items())
+    timings[f'{label}_aggregate_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--components', type=int, default=10000, help="Synthetic corpus size")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = generate_corpus(tmp / "corpus", args.components, args.seed)
+        extractor = SvelteCSSExtractor(str(corpus))
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.process_all_components()
+            index = extractor.property_index()
+            with timed('json_write', timings):
+                extractor.save_results(str(tmp / "results.json"), index=index)
+            with timed('snapshot_write', timings):
+                extractor.save_results(str(tmp / "results.snap"), output_format='snapshot')
+            measure_load(tmp / "results.json", tmp / "csv_json", timings, 'json')
+            measure_load(tmp / "results.snap", tmp / "csv_snap", timings, 'snapshot')
+
+        json_size = (tmp / "results.json").stat().st_size
+        snapshot_size = (tmp / "results.snap").stat().st_size
+        names = sorted(p.name for p in (tmp / "csv_json").iterdir())
+        _, mismatch, errors = filecmp.cmpfiles(tmp / "csv_json", tmp / "csv_snap", names, shallow=False)
+
+    print(f"Components:     {args.components}")
+    print(f"File size:      json {json_size / 1e6:.1f} MB, snapshot {snapshot_size / 1e6:.1f} MB "
+          f"({json_size / snapshot_size:.1f}x smaller)")
+    for stage in ('write', 'open', 'aggregate', 'csv'):
+        json_time = timings[f'json_{stage}']
+        snapshot_time = timings[f'snapshot_{stage}']
+        print(f"{stage:<15} json {json_time:8.3f}s  snapshot {snapshot_time:8.3f}s  "
+              f"({json_time / max(snapshot_time, 1e-9):.1f}x)")
+    print(f"{'aggregate peak':<15} json {timings['json_aggregate_peak_mb']:6.1f} MB  "
+          f"snapshot {timings['snapshot_aggregate_peak_mb']:6.1f} MB")
+    print(f"CSV output identical: {not mismatch and not errors}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare the dense property x component matrices that generate_csv_data used
+to build against the SparsePropertyIndex, in time and peak memory, as the
+number of components grows.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import _common  # noqa: F401  (puts the repo root on sys.path)
+
+from css_matrix import SparsePropertyIndex
+
+def synthetic_components(count: int, property_pool: int, per_component: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    pool = [f"prop-{i}" for i in range(property_pool)]
+    components = {}
+    for c in range(count):
+        rules = {}
+        for r in range(max(1, per_component // 4)):
+            rules[f".c{c}-r{r}"] = {p: f"{rng.randint(0, 99)}px" for p in rng.sample(pool, 4)}
+        components[f"Component{c}"] = {'has_styles': True, 'css_rules': rules}
+    return components
+
+def dense_csv_data(components: dict, all_properties: set) -> dict:
+    """The pre-index implementation: two dense matrices, then two dense row lists"""
+    props = sorted(all_properties)
+    property_matrix = {prop: {} for prop in props}
+    component_matrix = {}
+    for name, data in components.items():
+        row = {}
+        for selector, properties in data['css_rules'].items():
+            for prop, value in properties.items():
+                if prop in row:
+                    row[prop] += f" | {selector}: {value}"
+                else:
+                    row[prop] = f"{selector}: {value}"
+        for prop in props:
+            property_matrix[prop][name] = row.get(prop, "")
+            row.setdefault(prop, "")
+        component_matrix[name] = row
+    property_rows = [[prop] + [property_matrix[prop].get(n, "") for n in components] for prop in props]
+    component_rows = [[n] + [component_matrix[n].get(p, "") for p in props] for n in sorted(components)]
+    return {'property_rows': property_rows, 'component_rows': component_rows}
+
+def sparse_csv_rows(components: dict, all_properties: set) -> int:
+    """Build the index once and stream both orientations, as the CSV writers do"""
+    index = SparsePropertyIndex(all_properties, ((n, d['css_rules']) for n, d in components.items()))
+    rows = 0
+    for _ in index.iter_property_rows():
+        rows += 1
+    for _ in index.iter_component_rows():
+        rows += 1
+    return rows
+
+def measure(func, *args) -> tuple:
+    """Wall time of an untraced run, then peak allocation of a traced one"""
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 1000, 4000])
+    parser.add_argument('--properties', type=int, default=300)
+    parser.add_argument('--per-component', type=int, default=24)
+    args = parser.parse_args()
+    
+    print(f"{'components':>10} {'dense s':>9} {'sparse s':>9} {'dense MiB':>10} {'sparse MiB':>11}")
+    for size in args.sizes:
+        components = synthetic_components(size, args.properties, args.per_component)
+        all_properties = {p for d in components.values() for props in d['css_rules'].values() for p in props}
+        dense_time, dense_peak = measure(dense_csv_data, components, all_properties)
+        sparse_time, sparse_peak = measure(sparse_csv_rows, components, all_properties)
+        print(f"{size:>10} {dense_time:>9.3f} {sparse_time:>9.3f} "
+              f"{dense_peak / 2**20:>10.1f} {sparse_peak / 2**20:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Seeded generator for synthetic Svelte component trees.
+Components get realistic style blocks: nested folders, comments, var() tokens
+with fallbacks, @media / @supports blocks, :global() and & nesting, strings
+and a share of unstyled files. The same (count, seed) always produces the
+same tree, so benchmark results are comparable across runs.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+CORPUS_MARKER = ".synthetic_corpus.json"
+
+PROPERTIES = {
+    'display': ['flex', 'grid', 'block', 'inline-flex', 'none'],
+    'flex-direction': ['row', 'column'],
+    'align-items': ['center', 'flex-start', 'stretch'],
+    'justify-content': ['space-between', 'center', 'flex-end'],
+    'gap': ['{space}', '8px', '1rem'],
+    'padding': ['{space}', '{space} {space}', '0'],
+    'margin': ['0', '0 auto', '{space} 0'],
+    'width': ['100%', '{px}px', 'auto', 'min(100%, {px}px)'],
+    'height': ['100%', '{px}px', 'auto'],
+    'max-width': ['{px}px', '60ch'],
+    'position': ['relative', 'absolute', 'sticky'],
+    'top': ['0', '{px}px'],
+    'left': ['0', '50%'],
+    'z-index': ['1', '10', '100', '{small}'],
+    'color': ['{color}', '#1a1a1a', 'inherit'],
+    'background-color': ['{color}', 'transparent', '#ffffff'],
+    'border': ['1px solid {color}', 'none'],
+    'border-radius': ['{radius}', '4px', '50%'],
+    'font-size': ['{font}', '0.875rem', '1.25rem'],
+    'font-weight': ['400', '600', 'var(--fw-bold, 700)'],
+    'line-height': ['1.4', '1.6', 'var(--lh-body)'],
+    'opacity': ['0', '0.5', '1'],
+    'transition': ['opacity 0.2s ease', 'transform 0.3s ease-out, opacity 0.3s'],
+    'transform': ['translateX(-50%)', 'scale(1.02)', 'none'],
+    'box-shadow': ['0 1px 2px rgba(0, 0, 0, 0.1)', 'var(--shadow-md)'],
+    'grid-template-columns': ['repeat(auto-fill, minmax({px}px, 1fr))', '1fr 2fr'],
+    'overflow': ['hidden', 'auto'],
+    'cursor': ['pointer', 'default'],
+    'text-decoration': ['none', 'underline'],
+    'content': ['""', '"\\2014"', "'{ }'"],
+}
+
+TOKENS = {
+    'space': ['--spc-100', '--spc-200', '--spc-300', '--spc-400', '--spc-800'],
+    'color': ['--fg-text-primary', '--fg-text-secondary', '--bg-page', '--bg-secondary', '--bdr-primary'],
+    'radius': ['--bdr-radius-small', '--bdr-radius-medium', '--bdr-radius-large'],
+    'font': ['--fs-200', '--fs-300', '--fs-400', '--fs-600'],
+}
+
+ELEMENTS = ['container', 'header', 'title', 'body', 'footer', 'icon', 'label', 'list', 'item', 'button',
+            'content', 'media', 'caption', 'wrapper', 'overlay']
+MODIFIERS = ['active', 'disabled', 'primary', 'secondary', 'compact', 'open']
+STATES = [':hover', ':focus-visible', '::before', '::after', ':first-child', ':not(:last-child)']
+BREAKPOINTS = ['(max-width: 600px)', '(min-width: 768px)', '(min-width: 1024px) and (max-width: 1440px)',
+               '(prefers-reduced-motion: reduce)', '(prefers-color-scheme: dark)']
+FOLDERS = ['cards', 'chat', 'layout', 'overlays', 'forms', 'navigation', 'media', 'widgets', 'typography']
+
+class ComponentGenerator:
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+
+    def value(self, prop: str) -> str:
+        pick = self.random
+        template = pick.choice(PROPERTIES[prop])
+        while '{' in template and '}' in template:
+            start = template.index('{')
+            end = template.index('}', start)
+            slot = template[start + 1:end]
+            if slot in TOKENS:
+                token = pick.choice(TOKENS[slot])
+                roll = pick.random()
+                if roll < 0.6:
+                    filled = f"var({token})"
+                elif roll < 0.85:
+                    filled = f"var({token}, {pick.choice(['8px', '#333', 'var(--bg-page)'])})"
+                else:
+                    filled = pick.choice(['12px', '#4a4a4a', '1rem'])
+            elif slot == 'px':
+                filled = str(pick.choice([16, 24, 48, 120, 240, 320, 640]))
+            elif slot == 'small':
+                filled = str(pick.randint(2, 9))
+            else:
+                # Literal braces inside a string value, e.g. content: '{ }'
+                break
+            template = template[:start] + filled + template[end + 1:]
+        return template
+
+    def declarations(self, indent: str, count: int) -> List[str]:
+        lines = []
+        for prop in self.random.sample(sorted(PROPERTIES), count):
+            lines.append(f"{indent}{prop}: {self.value(prop)};")
+        return lines
+
+    def selector(self, block: str) -> str:
+        pick = self.random
+        roll = pick.random()
+        element = f".{block}__{pick.choice(ELEMENTS)}"
+        if roll < 0.5:
+            return element
+        if roll < 0.65:
+            return f".{block}--{pick.choice(MODIFIERS)} {element}"
+        if roll < 0.8:
+            return f"{element}{pick.choice(STATES)}"
+        if roll < 0.9:
+            return f"{element}, .{block}__{pick.choice(ELEMENTS)}"
+        return f":global(.theme-{pick.choice(['dark', 'light'])}) {element}"
+
+    def style_block(self, block: str) -> str:
+        pick = self.random
+        lines = [f".{block} {{"] + self.declarations('    ', pick.randint(2, 6)) + ["}", ""]
+        for _ in range(pick.randint(2, 14)):
+            roll = pick.random()
+            if roll < 0.1:
+                lines.append(f"/* {pick.choice(ELEMENTS)} styles: {{ keep in sync; }} */")
+            if roll < 0.75:
+                lines.append(f"{self.selector(block)} {{")
+                lines.extend(self.declarations('    ', pick.randint(1, 7)))
+                if roll < 0.15:
+                    # CSS nesting
+                    lines.append(f"    &{pick.choice(STATES)} {{")
+                    lines.extend(self.declarations('        ', pick.randint(1, 3)))
+                    lines.append("    }")
+                lines.append("}")
+            elif roll < 0.95:
+                lines.append(f"@media {pick.choice(BREAKPOINTS)} {{")
+                for _ in range(pick.randint(1, 3)):
+                    lines.append(f"    {self.selector(block)} {{")
+                    lines.extend(self.declarations('        ', pick.randint(1, 4)))
+                    lines.append("    }")
+                lines.append("}")
+            else:
+                lines.append("@supports (backdrop-filter: blur(4px)) {")
+                lines.append(f"    .{block} {{ backdrop-filter: blur(4px); }}")
+                lines.append("}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def component(self, name: str) -> str:
+        block = name.lower()
+        parts = [
+            "<script>",
+            f"    export let title = '{name}';",
+            "    export let items = [];",
+            "</script>",
+            "",
+            f'<div class="{block}">',
+            f'    <h2 class="{block}__title">{{title}}</h2>',
+            "    {#each items as item}",
+            f'        <span class="{block}__item">{{item}}</span>',
+            "    {/each}",
+            "</div>",
+        ]
+        if self.random.random() < 0.85:
+            parts += ["", "<style>", self.style_block(block), "</style>"]
+        return "\n".join(parts) + "\n"
+
+def generate_corpus(target_dir: Path, count: int, seed: int = 0) -> Path:
+    """Write `count` synthetic components under target_dir (reused when already generated)"""
+    target_dir = Path(target_dir)
+    params = {'count': count, 'seed': seed}
+    marker = target_dir / CORPUS_MARKER
+    if marker.exists() and json.loads(marker.read_text(encoding='utf-8')) == params:
+        return target_dir
+
+    generator = ComponentGenerator(seed)
+    for i in range(count):
+        # A few hundred components per folder, two levels deep like the real tree
+        folder = target_dir / FOLDERS[i % len(FOLDERS)] / f"group_{i // 250:04d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"Component{i:06d}"
+        (folder / f"{name}.svelte").write_text(generator.component(name), encoding='utf-8')
+    marker.write_text(json.dumps(params), encoding='utf-8')
+    return target_dir
+
+def corpus_stats(target_dir: Path) -> Dict[str, int]:
+    files = list(Path(target_dir).rglob("*.svelte"))
+    return {'files': len(files), 'bytes': sum(f.stat().st_size for f in files)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Svelte component tree")
+    parser.add_argument('target', type=Path)
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_corpus(args.target, args.count, args.seed)
+    stats = corpus_stats(args.target)
+    print(f"{stats['files']} components ({stats['bytes'] / 1e6:.1f} MB) in {args.target}")
+
+if __name__ == "__main__":
+    main()
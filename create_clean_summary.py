@@ -3,47 +3,62 @@
 Create a clean, human-readable summary of the CSS extraction results
 """
 
-import json
+import argparse
 from collections import Counter, defaultdict
+from typing import Any, Dict
+
+from css_aggregates import CSSAggregates
+from css_stats import AggregateStats
+from css_instrument import add_instrumentation_arguments, instrumentation_from_args
+from css_results import load_results
+
+# Property groups of the "CSS Property Categories" section
+LAYOUT_PROPERTIES = frozenset([
+    'display', 'position', 'top', 'right', 'bottom', 'left', 'z-index',
+    'float', 'clear', 'overflow', 'overflow-x', 'overflow-y'
+])
+FLEXBOX_PROPERTIES = frozenset([
+    'flex', 'flex-direction', 'flex-wrap', 'flex-flow', 'justify-content',
+    'align-items', 'align-content', 'align-self', 'flex-grow', 'flex-shrink', 'flex-basis'
+])
+SPACING_PREFIXES = ('margin', 'padding', 'gap')
+TYPOGRAPHY_PREFIXES = ('font', 'text', 'line-height', 'letter-spacing', 'word-spacing')
+COLOR_PROPERTIES = frozenset([
+    'color', 'background', 'background-color', 'border-color', 'outline-color'
+])
+
+REPORT_PERCENTILES = (50, 90, 99)
 
 def create_summary_report(json_file_path: str, output_file: str):
     """Create a clean summary report"""
     
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_results(json_file_path)
+    write_summary_report(data['metadata'], CSSAggregates.collect(data['components'].items()), output_file)
+
+def write_summary_report(metadata: Dict[str, Any], aggregates: CSSAggregates, output_file: str) -> None:
+    """Write the Markdown report from precomputed aggregates"""
     
+    stats = AggregateStats(aggregates)
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write("# Svelte Components CSS Analysis Report\n\n")
         
         # Overview Statistics
         f.write("## Overview\n")
-        f.write(f"- **Total Components**: {data['metadata']['total_components']}\n")
-        f.write(f"- **Components with Styles**: {data['metadata']['components_with_styles']}\n")
-        f.write(f"- **Components without Styles**: {data['metadata']['total_components'] - data['metadata']['components_with_styles']}\n")
-        f.write(f"- **Total CSS Properties Found**: {data['metadata']['total_css_properties']}\n\n")
+        f.write(f"- **Total Components**: {metadata['total_components']}\n")
+        f.write(f"- **Components with Styles**: {metadata['components_with_styles']}\n")
+        f.write(f"- **Components without Styles**: {metadata['total_components'] - metadata['components_with_styles']}\n")
+        f.write(f"- **Total CSS Properties Found**: {metadata['total_css_properties']}\n\n")
         
         # CSS Properties Analysis
         f.write("## CSS Properties Analysis\n\n")
         
-        # Count property usage
-        property_usage = Counter()
-        custom_properties = set()
-        
-        for comp_data in data['components'].values():
-            if comp_data.get('has_styles', False):
-                for selector, properties in comp_data.get('css_rules', {}).items():
-                    for prop_name, prop_value in properties.items():
-                        property_usage[prop_name] += 1
-                        # Check for CSS custom properties usage
-                        if 'var(--' in prop_value:
-                            import re
-                            vars_found = re.findall(r'var\((--[^,)]+)', prop_value)
-                            custom_properties.update(vars_found)
+        property_usage = aggregates.property_usage
+        custom_properties = aggregates.custom_properties
         
         # Most used properties
         f.write("### Most Used CSS Properties\n")
         for i, (prop, count) in enumerate(property_usage.most_common(20), 1):
-            percentage = (count / data['metadata']['components_with_styles']) * 100
+            percentage = (count / metadata['components_with_styles']) * 100
             f.write(f"{i:2d}. **{prop}**: {count} components ({percentage:.1f}%)\n")
         f.write("\n")
         
@@ -84,70 +99,79 @@ def create_summary_report(json_file_path: str, output_file: str):
         # Component Complexity Analysis
         f.write("## Component Complexity Analysis\n\n")
         
-        comp_complexity = []
-        comp_property_diversity = []
-        
-        for comp_name, comp_data in data['components'].items():
-            if comp_data.get('has_styles', False):
-                rule_count = len(comp_data.get('css_rules', {}))
-                
-                # Count unique properties
-                unique_props = set()
-                for selector, properties in comp_data.get('css_rules', {}).items():
-                    unique_props.update(properties.keys())
-                
-                comp_complexity.append((comp_name, rule_count))
-                comp_property_diversity.append((comp_name, len(unique_props)))
-        
-        comp_complexity.sort(key=lambda x: x[1], reverse=True)
-        comp_property_diversity.sort(key=lambda x: x[1], reverse=True)
-        
         f.write("### Most Complex Components (by CSS rule count)\n")
-        for i, (comp_name, rule_count) in enumerate(comp_complexity[:15], 1):
+        for i, (comp_name, rule_count) in enumerate(stats.most_rules(15), 1):
             f.write(f"{i:2d}. **{comp_name}**: {rule_count} CSS rules\n")
         f.write("\n")
         
         f.write("### Components with Most CSS Property Diversity\n")
-        for i, (comp_name, prop_count) in enumerate(comp_property_diversity[:15], 1):
+        for i, (comp_name, prop_count) in enumerate(stats.most_diverse(15), 1):
             f.write(f"{i:2d}. **{comp_name}**: {prop_count} unique CSS properties\n")
         f.write("\n")
         
+        f.write("### Distribution\n")
+        f.write("| Measure | " + " | ".join(f"p{p}" for p in REPORT_PERCENTILES) + " | Max |\n")
+        f.write("|---|" + "---|" * (len(REPORT_PERCENTILES) + 1) + "\n")
+        for label, values in (("CSS rules per styled component", stats.rule_counts),
+                              ("Unique properties per styled component", stats.unique_counts),
+                              ("Styled components per property", stats.property_component_counts())):
+            cells = [f"{v:.1f}" for v in stats.percentiles(values, REPORT_PERCENTILES)]
+            f.write(f"| {label} | {' | '.join(cells)} | {max(values, default=0)} |\n")
+        f.write("\n")
+        
+        pairs = stats.cooccurrence(10)
+        if pairs:
+            f.write("### Properties Most Often Used Together\n")
+            for i, (prop_a, prop_b, count) in enumerate(pairs, 1):
+                f.write(f"{i:2d}. **{prop_a}** + **{prop_b}**: {count} components\n")
+            f.write("\n")
+        
         # Components without styles
-        components_without_styles = [
-            comp_name for comp_name, comp_data in data['components'].items() 
-            if not comp_data.get('has_styles', False)
-        ]
+        components_without_styles = [c.name for c in aggregates.components if not c.has_styles]
         
         if components_without_styles:
             f.write("### Components Without Styles\n")
             for comp_name in sorted(components_without_styles):
                 f.write(f"- {comp_name}\n")
             f.write("\n")
-        
+
+        # Unused selectors, grouped by component
+        f.write("## Unused Selectors\n\n")
+        unused_by_component = defaultdict(list)
+        for comp_name, selector, _ in aggregates.unused_selector_rows:
+            unused_by_component[comp_name].append(selector)
+
+        if unused_by_component:
+            f.write("Selectors that cannot match any element in their component's markup.\n\n")
+            for comp_name, selectors in sorted(unused_by_component.items()):
+                f.write(f"**{comp_name}** ({len(selectors)}):\n")
+                for selector in selectors:
+                    f.write(f"- `{selector}`\n")
+                f.write("\n")
+            f.write(f"**Total Unused Selectors**: {len(aggregates.unused_selector_rows)}\n\n")
+        else:
+            f.write("No unused selectors found.\n\n")
+
+        # Declarations overridden within a component
+        f.write("## Cascade Conflicts\n\n")
+        if aggregates.conflict_rows:
+            f.write("Declarations overridden by a more specific or later selector matching the same elements.\n\n")
+            overridden_by_component = Counter(row[0] for row in aggregates.conflict_rows)
+            f.write("### Components with Most Overridden Declarations\n")
+            for i, (comp_name, count) in enumerate(overridden_by_component.most_common(15), 1):
+                f.write(f"{i:2d}. **{comp_name}**: {count} overridden declarations\n")
+            f.write(f"\n**Total Overridden Declarations**: {len(aggregates.conflict_rows)}\n\n")
+        else:
+            f.write("No cascade conflicts found.\n\n")
+
         # CSS Categories Analysis
         f.write("## CSS Property Categories\n\n")
         
-        layout_props = [p for p, c in property_usage.items() if p in [
-            'display', 'position', 'top', 'right', 'bottom', 'left', 'z-index',
-            'float', 'clear', 'overflow', 'overflow-x', 'overflow-y'
-        ]]
-        
-        flexbox_props = [p for p, c in property_usage.items() if p in [
-            'flex', 'flex-direction', 'flex-wrap', 'flex-flow', 'justify-content',
-            'align-items', 'align-content', 'align-self', 'flex-grow', 'flex-shrink', 'flex-basis'
-        ]]
-        
-        spacing_props = [p for p, c in property_usage.items() if any(p.startswith(prefix) for prefix in [
-            'margin', 'padding', 'gap'
-        ])]
-        
-        typography_props = [p for p, c in property_usage.items() if any(p.startswith(prefix) for prefix in [
-            'font', 'text', 'line-height', 'letter-spacing', 'word-spacing'
-        ])]
-        
-        color_props = [p for p, c in property_usage.items() if p in [
-            'color', 'background', 'background-color', 'border-color', 'outline-color'
-        ]]
+        layout_props = [p for p in property_usage if p in LAYOUT_PROPERTIES]
+        flexbox_props = [p for p in property_usage if p in FLEXBOX_PROPERTIES]
+        spacing_props = [p for p in property_usage if p.startswith(SPACING_PREFIXES)]
+        typography_props = [p for p in property_usage if p.startswith(TYPOGRAPHY_PREFIXES)]
+        color_props = [p for p in property_usage if p in COLOR_PROPERTIES]
         
         if layout_props:
             f.write(f"**Layout Properties** ({len(layout_props)}): {', '.join(layout_props)}\n\n")
@@ -164,18 +188,13 @@ def create_summary_report(json_file_path: str, output_file: str):
         f.write("## Component Organization\n\n")
         
         directories = defaultdict(list)
-        for comp_name, comp_data in data['components'].items():
-            rel_path = comp_data.get('relative_path', '')
-            if '/' in rel_path:
-                directory = '/'.join(rel_path.split('/')[:-1])
-                directories[directory].append((comp_name, comp_data.get('has_styles', False)))
-            else:
-                directories['root'].append((comp_name, comp_data.get('has_styles', False)))
+        for component, directory_id in zip(aggregates.components, stats.component_directories):
+            directories[stats.directories[directory_id]].append((component.name, component.has_styles))
+        rollups = stats.directory_rollups()
         
         for directory, components in sorted(directories.items()):
-            styled_count = sum(1 for _, has_styles in components if has_styles)
-            total_count = len(components)
-            f.write(f"**{directory}/** ({styled_count}/{total_count} with styles)\n")
+            rollup = rollups[directory]
+            f.write(f"**{directory}/** ({rollup.styled}/{rollup.components} with styles)\n")
             for comp_name, has_styles in sorted(components):
                 status = "✓" if has_styles else "○"
                 f.write(f"  {status} {comp_name}\n")
@@ -184,10 +203,28 @@ def create_summary_report(json_file_path: str, output_file: str):
     print(f"Summary report created: {output_file}")
 
 def main():
-    json_file = "/Users/peterabbott/folio/svelte-folio/css_extraction_results.json"
-    summary_file = "/Users/peterabbott/folio/svelte-folio/CSS_Analysis_Summary.md"
+    parser = argparse.ArgumentParser(description="Write a Markdown summary of CSS extraction results")
+    parser.add_argument('json_file', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/css_extraction_results.json",
+                        help="Results from css_extractor.py (.json or .jsonl)")
+    parser.add_argument('summary_file', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/CSS_Analysis_Summary.md")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    
+    instrumentation = instrumentation_from_args(args)
+    if not instrumentation.enabled:
+        create_summary_report(args.json_file, args.summary_file)
+        return
     
-    create_summary_report(json_file, summary_file)
+    instrumentation.start()
+    with instrumentation.phase('load'):
+        data = load_results(args.json_file)
+    with instrumentation.phase('aggregate'):
+        aggregates = CSSAggregates.collect(data['components'].items())
+    with instrumentation.phase('summary'):
+        write_summary_report(data['metadata'], aggregates, args.summary_file)
+    instrumentation.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
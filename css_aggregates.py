@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Aggregates shared by the CSV exports and the summary report.
+Everything is gathered in a single pass over components[*].css_rules.
+"""
+
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from css_cascade import format_specificity
+from css_patterns import VAR_REFERENCE
+
+# Called with (component, selector, property, value, relative_path) for every styled declaration
+DeclarationCallback = Callable[[str, str, str, str, str], None]
+
+class ComponentStats(NamedTuple):
+    name: str
+    relative_path: str
+    has_styles: bool
+    rule_count: int
+    unique_properties: int
+
+class CSSAggregates:
+    def __init__(self):
+        self.components: List[ComponentStats] = []
+        # Property name -> number of rules setting it, over styled components
+        self.property_usage: Counter = Counter()
+        # Every var(--token) referenced by a styled component
+        self.custom_properties: Set[str] = set()
+        # Rows of css_custom_properties.csv, without the header
+        self.token_rows: List[List[str]] = []
+        # (component, selector, relative_path) for selectors that match nothing in their markup
+        self.unused_selector_rows: List[List[str]] = []
+        # Rows of the cascade conflicts CSV: one per overridden declaration
+        self.conflict_rows: List[List[str]] = []
+        # Integer ids of the property names of styled components, in first-seen order
+        self.property_names: List[str] = []
+        self.property_ids: Dict[str, int] = {}
+        # CSR occurrence data: property ids set by components[c] are
+        # occurrence_props[occurrence_ptr[c]:occurrence_ptr[c + 1]], for css_stats
+        self.occurrence_ptr = array('l', [0])
+        self.occurrence_props = array('l')
+
+    @classmethod
+    def collect(cls, components: Iterable[Tuple[str, Dict[str, Any]]],
+                on_declaration: Optional[DeclarationCallback] = None) -> 'CSSAggregates':
+        """Aggregate (name, component_data) pairs, e.g. data['components'].items()"""
+        aggregates = cls()
+        for comp_name, comp_data in components:
+            aggregates.add(comp_name, comp_data, on_declaration)
+        return aggregates
+
+    def add(self, comp_name: str, comp_data: Dict[str, Any],
+            on_declaration: Optional[DeclarationCallback] = None) -> None:
+        css_rules = comp_data.get('css_rules', {})
+        file_path = comp_data.get('relative_path', '')
+        has_styles = comp_data.get('has_styles', False)
+        unique_props = set()
+
+        for selector, properties in css_rules.items():
+            unique_props.update(properties)
+            if not has_styles:
+                continue
+            for prop_name, prop_value in properties.items():
+                self.property_usage[prop_name] += 1
+                if on_declaration is not None:
+                    on_declaration(comp_name, selector, prop_name, prop_value, file_path)
+                if 'var(' in prop_value:
+                    for var_name in VAR_REFERENCE.findall(prop_value):
+                        self.custom_properties.add(var_name)
+                        self.token_rows.append([comp_name, selector, prop_name, var_name, prop_value, file_path])
+                elif prop_value.startswith('--'):
+                    # CSS custom property definition
+                    self.token_rows.append([comp_name, selector, prop_name, prop_value, prop_value, file_path])
+
+        for selector in comp_data.get('unused_selectors', ()):
+            self.unused_selector_rows.append([comp_name, selector, file_path])
+
+        for conflict in comp_data.get('cascade_conflicts', ()):
+            winner = conflict['winner']
+            for overridden in conflict['overridden']:
+                self.conflict_rows.append([
+                    comp_name, conflict['property'],
+                    winner['selector'], winner['value'], format_specificity(winner['specificity']),
+                    overridden['selector'], overridden['value'], format_specificity(overridden['specificity']),
+                    file_path])
+
+        if has_styles:
+            property_ids = self.property_ids
+            # Sorted so ids do not depend on set (hash) order
+            for prop_name in sorted(unique_props.difference(property_ids)):
+                property_ids[prop_name] = len(self.property_names)
+                self.property_names.append(prop_name)
+            self.occurrence_props.extend(sorted(property_ids[p] for p in unique_props))
+        self.occurrence_ptr.append(len(self.occurrence_props))
+
+        self.components.append(ComponentStats(comp_name, file_path, has_styles, len(css_rules), len(unique_props)))
+
+    def extend_components(self, part: 'CSSAggregates') -> None:
+        """Append another aggregate's components: their stats, rows and property occurrences
+
+        The totals (property_usage, custom_properties) are left alone, so a
+        caller can keep them up to date by delta (css_watch).
+        """
+        self.components.extend(part.components)
+        self.token_rows.extend(part.token_rows)
+        self.unused_selector_rows.extend(part.unused_selector_rows)
+        self.conflict_rows.extend(part.conflict_rows)
+        property_ids = self.property_ids
+        ptr, props = part.occurrence_ptr, part.occurrence_props
+        for c in range(len(ptr) - 1):
+            names = {part.property_names[i] for i in props[ptr[c]:ptr[c + 1]]}
+            for prop_name in sorted(names.difference(property_ids)):
+                property_ids[prop_name] = len(self.property_names)
+                self.property_names.append(prop_name)
+            self.occurrence_props.extend(sorted(property_ids[p] for p in names))
+            self.occurrence_ptr.append(len(self.occurrence_props))
+
+    @property
+    def styled_components(self) -> List[ComponentStats]:
+        return [c for c in self.components if c.has_styles]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of per-file CSS extraction results.
+Entries are keyed on path + size + mtime, falling back to a content hash when
+only the mtime changed (e.g. after a git checkout), so unchanged files are
+never re-parsed between runs. A missed file is stamped (stat and hash) before
+it is parsed, so an edit that lands during extraction invalidates the entry
+on the next run instead of being hidden behind the new mtime.
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
+
+# Bump whenever the shape of extract_component_css results changes
+CACHE_VERSION = 10
+
+def file_stamp(file_path: Path) -> Tuple[int, int, str]:
+    """(size, mtime_ns, digest) of a file, from one open: the stat is taken before the read"""
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        return stat.st_size, stat.st_mtime_ns, hashlib.sha1(f.read()).hexdigest()
+
+class ExtractionCache:
+    def __init__(self, cache_path: str, base_path: str, compact: bool = True, keep_raw_css: bool = True):
+        self.cache_path = Path(cache_path)
+        self.base_path = str(base_path)
+        # Cached results are stored in the extractor's record shape, so the mode is part of the key
+        self.compact = compact
+        self.keep_raw_css = keep_raw_css
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Stamps of the files that missed, taken before they are extracted; store() records these
+        self.pending: Dict[str, Tuple[int, int, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self.load()
+    
+    def load(self) -> None:
+        """Load the cache file, discarding it if it was written for another version, tree or mode"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return
+        if payload.get('version') != CACHE_VERSION or payload.get('base_path') != self.base_path:
+            return
+        if payload.get('compact') != self.compact or payload.get('keep_raw_css') != self.keep_raw_css:
+            print(f"Cache {self.cache_path} was written with other record options; rebuilding it")
+            return
+        self.entries = payload.get('entries', {})
+    
+    def save(self) -> None:
+        """Write the cache atomically"""
+        # Stamps of files whose extraction failed were never stored
+        self.pending.clear()
+        payload = {
+            'version': CACHE_VERSION,
+            'base_path': self.base_path,
+            'compact': self.compact,
+            'keep_raw_css': self.keep_raw_css,
+            'entries': self.entries
+        }
+        tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+    
+    def lookup(self, file_path: Path) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        """Return the cached (component_data, css_properties) for a file, or None on a miss"""
+        key = str(file_path)
+        entry = self.entries.get(key)
+        if entry is not None:
+            stat = file_path.stat()
+            if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+                self.hits += 1
+                return entry['result'], entry['css_properties']
+        
+        stamp = file_stamp(file_path)
+        if entry is not None and stamp[0] == entry['size'] and stamp[2] == entry['digest']:
+            # Same size but touched: the content is unchanged, so the entry still holds
+            entry['mtime_ns'] = stamp[1]
+            self.hits += 1
+            return entry['result'], entry['css_properties']
+        
+        self.pending[key] = stamp
+        self.misses += 1
+        return None
+    
+    def store(self, file_path: Path, component_data: Dict[str, Any], css_properties: Set[str]) -> None:
+        """Record a freshly extracted result for a file, under the stamp lookup() took before extraction"""
+        key = str(file_path)
+        size, mtime_ns, digest = self.pending.pop(key, None) or file_stamp(file_path)
+        self.entries[key] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'digest': digest,
+            'result': component_data,
+            'css_properties': css_properties
+        }
+    
+    def prune(self, live_paths: Iterable[Path]) -> None:
+        """Drop entries for files that no longer exist in the tree"""
+        live = {str(p) for p in live_paths}
+        for key in [k for k in self.entries if k not in live]:
+            del self.entries[key]
+            self.removed += 1
+    
+    def stats_line(self) -> str:
+        return (f"Cache: {self.hits} hits, {self.misses} misses, "
+                f"{self.removed} removed ({self.cache_path})")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Selector specificity and cascade conflicts within a component.
+Each complex selector is parsed once into its specificity and its subject
+(the compound selector that picks the styled element); parses are memoized
+by selector string, since the same selectors repeat across components.
+
+Declarations of a property conflict when their selectors all reach the
+elements of some selector in the component: each subject's simple selectors
+are a subset of that selector's subject (.btn and .btn.primary, .title and
+.card .title, or .a and .b given a rule for .a.b) and all target the same
+pseudo-element. Conflicts are only looked for between rules in the same
+at-rule context. The winner is decided
+by !important, then specificity, then source order. Svelte's scoping class
+raises every scoped compound equally, so it is left out of the specificity.
+"""
+
+import argparse
+import csv
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+from css_markup import NON_SELECTOR_AT_RULES
+from css_parser import split_selector_list
+from css_patterns import PLAIN_SELECTOR_TOKEN, SELECTOR_TOKEN
+from css_results import load_results
+
+# Distinct selector strings kept parsed; bounded so huge trees cannot grow it without limit
+SELECTOR_CACHE_SIZE = 1 << 16
+
+# Pseudo-classes whose specificity is that of their most specific argument
+_ARGUMENT_PSEUDO_CLASSES = frozenset(['is', 'not', 'has', 'matches', '-webkit-any', '-moz-any'])
+# CSS 2 pseudo-elements that may be written with a single colon
+_LEGACY_PSEUDO_ELEMENTS = frozenset(['before', 'after', 'first-line', 'first-letter'])
+
+_COMBINATOR_CHARACTERS = frozenset(' \t\n\r\f>+~')
+
+Specificity = Tuple[int, int, int]
+
+class ParsedSelector(NamedTuple):
+    specificity: Specificity
+    # Simple selectors of the subject compound, e.g. {'button', '.btn', ':hover'}
+    subject: FrozenSet[str]
+    pseudo_element: Optional[str]
+
+def _closing_paren(selector: str, start: int) -> int:
+    depth = 0
+    for i in range(start, len(selector)):
+        if selector[i] == '(':
+            depth += 1
+        elif selector[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(selector)
+
+def _tokens(selector: str) -> List[Tuple[str, str, Optional[str]]]:
+    """(prefix, name, argument) per simple selector; prefix ' ' marks a combinator
+
+    Characters that add no specificity ('&', '|', ...) are skipped. Svelte's
+    :global(...) is unwrapped and a bare :global dropped, so global
+    selectors count like any other.
+    """
+    tokens: List[Tuple[str, str, Optional[str]]] = []
+    if '(' not in selector and '\\' not in selector:
+        # Common case: no functional pseudo-classes or escapes, so tokens split on their first character
+        for token in PLAIN_SELECTOR_TOKEN.findall(selector):
+            first = token[0]
+            if first == ':':
+                prefix = '::' if token[1] == ':' else ':'
+                if token != ':global':
+                    tokens.append((prefix, token[len(prefix):], None))
+            elif first in '.#':
+                tokens.append((first, token[1:], None))
+            elif first == '[':
+                tokens.append(('[', token[1:], None))
+            elif first == '*':
+                tokens.append(('*', '*', None))
+            elif first in _COMBINATOR_CHARACTERS:
+                tokens.append((' ', token.strip() or ' ', None))
+            else:
+                tokens.append(('', token, None))
+        return tokens
+
+    pos = 0
+    length = len(selector)
+    while pos < length:
+        match = SELECTOR_TOKEN.search(selector, pos)
+        if match is None:
+            break
+        prefix, name, attribute, universal, combinator, space = match.groups()
+        pos = match.end()
+        if name is not None:
+            argument = None
+            if prefix in (':', '::') and pos < length and selector[pos] == '(':
+                end = _closing_paren(selector, pos)
+                argument = selector[pos + 1:end]
+                pos = end + 1
+            if prefix == ':' and name == 'global':
+                if argument is not None:
+                    tokens.extend(_tokens(argument))
+                continue
+            tokens.append((prefix or '', name, argument))
+        elif attribute is not None:
+            tokens.append(('[', attribute[1:], None))
+        elif universal is not None:
+            tokens.append(('*', '*', None))
+        else:
+            tokens.append((' ', combinator or ' ', None))
+    return tokens
+
+def _add(counts: List[int], specificity: Specificity) -> None:
+    for i, n in enumerate(specificity):
+        counts[i] += n
+
+def _max_specificity(selector_list: str) -> Specificity:
+    return max((parse_selector(part).specificity for part in split_selector_list(selector_list)),
+               default=(0, 0, 0))
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def parse_selector(selector: str) -> ParsedSelector:
+    """Specificity and subject of one complex selector (no top-level commas)"""
+    counts = [0, 0, 0]
+    subject: List[str] = []
+    pseudo_element = None
+    for prefix, name, argument in _tokens(selector):
+        if prefix == ' ':
+            subject = []
+            pseudo_element = None
+            continue
+        lower = name.lower()
+        if prefix == '#':
+            counts[0] += 1
+        elif prefix in ('.', '['):
+            counts[1] += 1
+        elif prefix == '::' or (prefix == ':' and lower in _LEGACY_PSEUDO_ELEMENTS):
+            counts[2] += 1
+            if lower == 'slotted' and argument:
+                _add(counts, _max_specificity(argument))
+            pseudo_element = lower
+            continue
+        elif prefix == ':':
+            if lower in _ARGUMENT_PSEUDO_CLASSES and argument is not None:
+                _add(counts, _max_specificity(argument))
+            elif lower in ('nth-child', 'nth-last-child') and argument and ' of ' in argument:
+                counts[1] += 1
+                _add(counts, _max_specificity(argument.split(' of ', 1)[1]))
+            elif lower != 'where':
+                counts[1] += 1
+        elif prefix == '':
+            counts[2] += 1
+            name = lower
+        else:  # '*'
+            continue
+        subject.append(f"{prefix}{name}({argument})" if argument is not None else f"{prefix}{name}")
+    return ParsedSelector(tuple(counts), frozenset(subject), pseudo_element)
+
+def format_specificity(specificity: List[int]) -> str:
+    """(a, b, c) as written in the conflicts CSV, e.g. '0,2,1'"""
+    return ','.join(map(str, specificity))
+
+def is_important(value: str) -> bool:
+    return '!' in value and value.replace(' ', '').lower().endswith('!important')
+
+class _Entry(NamedTuple):
+    """One complex selector of a rule, with the rule's declarations"""
+    label: str
+    parsed: ParsedSelector
+    order: int
+    properties: Dict[str, str]
+    # Source position of each property's winning declaration, when the parser recorded them
+    positions: Optional[Dict[str, int]]
+
+    def position(self, prop_name: str) -> int:
+        return self.positions[prop_name] if self.positions else self.order
+
+def _describe(entry: _Entry, value: str) -> Dict[str, Any]:
+    return {'selector': entry.label, 'value': value, 'specificity': list(entry.parsed.specificity)}
+
+def find_cascade_conflicts(css_rules: Dict[str, Dict[str, str]],
+                           at_rules: Optional[Dict[str, List[str]]] = None,
+                           positions: Optional[Dict[str, Dict[str, int]]] = None) -> List[Dict[str, Any]]:
+    """Properties set by several selectors that can match the same element
+
+    One entry per (property, largest group of overlapping declarations):
+    {'property', 'winner': {...}, 'overridden': [{...}, ...]}, each
+    declaration as {'selector', 'value', 'specificity'}. Selectors carry the
+    at-rule context of their rule, like the css_rules keys.
+
+    positions (from css_parser.rules_to_dict) gives the source order of
+    each declaration. Without it, the order of css_rules is used, which
+    is wrong for selectors repeated later in the stylesheet: they are
+    merged into the slot of their first rule.
+    """
+    contexts: Dict[str, List[_Entry]] = {}
+    for order, (key, properties) in enumerate(css_rules.items()):
+        chain = at_rules.get(key) if at_rules else None
+        if chain:
+            if chain[-1].startswith(NON_SELECTOR_AT_RULES):
+                continue
+            prefix = ' '.join(chain)
+            selector = key[len(prefix) + 1:]
+        else:
+            prefix = ''
+            selector = key
+        if selector.startswith('@'):
+            continue
+        entries = contexts.setdefault(prefix, [])
+        for part in split_selector_list(selector):
+            entries.append(_Entry(f"{prefix} {part}" if prefix else part, parse_selector(part), order, properties,
+                                  positions.get(key) if positions else None))
+
+    conflicts = []
+    for entries in contexts.values():
+        if len(entries) > 1:
+            conflicts.extend(_context_conflicts(entries))
+    return conflicts
+
+def _overlap_groups(entries: List[_Entry]) -> List[List[int]]:
+    """Per entry, the entries whose subject is part of its subject (itself included), if any others"""
+    by_simple: Dict[str, List[int]] = {}
+    universal = []
+    for i, entry in enumerate(entries):
+        if not entry.parsed.subject:
+            universal.append(i)
+        for simple in entry.parsed.subject:
+            by_simple.setdefault(simple, []).append(i)
+
+    groups = []
+    for target in entries:
+        subject, pseudo_element = target.parsed.subject, target.parsed.pseudo_element
+        # Only entries sharing a simple selector with the target (or with no subject) can qualify
+        candidates = set(universal)
+        for simple in subject:
+            candidates.update(by_simple[simple])
+        if len(candidates) < 2:
+            continue
+        group = [i for i in sorted(candidates)
+                 if entries[i].parsed.pseudo_element == pseudo_element and entries[i].parsed.subject <= subject]
+        if len(group) > 1:
+            groups.append(group)
+    return groups
+
+def _context_conflicts(entries: List[_Entry]) -> Iterator[Dict[str, Any]]:
+    # Overlapping selectors first: most rules overlap with none, so most components stop here
+    groups = _overlap_groups(entries)
+    if not groups:
+        return
+
+    by_property: Dict[str, List[FrozenSet[int]]] = {}
+    for group in groups:
+        setters: Dict[str, List[int]] = {}
+        for i in group:
+            for prop_name in entries[i].properties:
+                setters.setdefault(prop_name, []).append(i)
+        for prop_name, members in setters.items():
+            if len(members) > 1:
+                member_set = frozenset(members)
+                seen = by_property.setdefault(prop_name, [])
+                if member_set not in seen:
+                    seen.append(member_set)
+
+    for prop_name, member_sets in by_property.items():
+        for members in member_sets:
+            if any(members < other for other in member_sets):
+                continue
+            ranked = sorted(members, reverse=True, key=lambda i: (
+                is_important(entries[i].properties[prop_name]), entries[i].parsed.specificity,
+                entries[i].position(prop_name)))
+            winner = ranked[0]
+            yield {
+                'property': prop_name,
+                'winner': _describe(entries[winner], entries[winner].properties[prop_name]),
+                'overridden': [_describe(entries[i], entries[i].properties[prop_name]) for i in ranked[1:]],
+            }
+
+def write_conflicts_csv(rows: List[List[Any]], output_path: str) -> None:
+    """Write CSSAggregates.conflict_rows, one row per overridden declaration"""
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Component', 'Property', 'Winning Selector', 'Winning Value', 'Winning Specificity',
+                         'Overridden Selector', 'Overridden Value', 'Overridden Specificity', 'File Path'])
+        writer.writerows(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report declarations overridden within each component")
+    parser.add_argument('results', help="Results from css_extractor.py (.json, .jsonl or snapshot)")
+    parser.add_argument('--csv', default="cascade_conflicts.csv", help="Where to write the overridden declarations")
+    args = parser.parse_args()
+    # Imported here: css_aggregates imports this module
+    from css_aggregates import CSSAggregates
+
+    data = load_results(args.results)
+    aggregates = CSSAggregates.collect(data['components'].items())
+    write_conflicts_csv(aggregates.conflict_rows, args.csv)
+    print(f"{len(aggregates.conflict_rows)} overridden declarations written to {args.csv}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Lazy .svelte file discovery with ignore rules.
+Walks the tree with os.scandir, honouring .gitignore files (those of the
+scanned directories and of their ancestors up to the git root) and extra
+exclude globs. Ignored directories are pruned without being entered, and
+paths are yielded as they are found, in the same order as
+Path.rglob("*.svelte").
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Pattern, Sequence
+
+SVELTE_SUFFIX = ".svelte"
+
+# Always pruned unless the caller passes its own list (gitignore syntax)
+DEFAULT_EXCLUDES = ('node_modules/', '.svelte-kit/', '.git/')
+
+class IgnoreRule(NamedTuple):
+    regex: Pattern
+    negate: bool
+    dir_only: bool
+    base: str          # directory the pattern is relative to, as a '/'-terminated posix path
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob ('*', '?', '[...]', '**') into a regex fragment"""
+    out = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i) and (i + 2 == length):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif char == '\\' and i + 1 < length:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+def parse_ignore_patterns(lines: Iterable[str], base: str) -> List[IgnoreRule]:
+    """Compile gitignore-style lines relative to the directory `base`"""
+    base = base.rstrip('/') + '/'
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to base
+        anchored = '/' in line
+        line = line.lstrip('/')
+        regex = _glob_to_regex(line)
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        rules.append(IgnoreRule(re.compile(regex + r'\Z'), negate, dir_only, base))
+    return rules
+
+def read_gitignore(directory: str) -> List[IgnoreRule]:
+    try:
+        with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8') as f:
+            return parse_ignore_patterns(f, Path(directory).as_posix())
+    except (OSError, UnicodeDecodeError):
+        return []
+
+def is_ignored(rules: Sequence[IgnoreRule], path: str, is_dir: bool) -> bool:
+    """Whether the posix path is ignored; the last matching rule wins, as in git"""
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if not path.startswith(rule.base):
+            continue
+        if rule.regex.match(path, len(rule.base)):
+            return not rule.negate
+    return False
+
+def ancestor_gitignore_rules(base_path: Path) -> List[IgnoreRule]:
+    """Rules from the .gitignore files above base_path, up to the enclosing git root"""
+    base_path = base_path.resolve()
+    ancestors = []
+    for directory in base_path.parents:
+        ancestors.append(directory)
+        if (directory / '.git').exists():
+            break
+    else:
+        # Not inside a git work tree: parent directories' ignore files do not apply
+        return []
+    rules: List[IgnoreRule] = []
+    for directory in reversed(ancestors):
+        rules.extend(read_gitignore(str(directory)))
+    return rules
+
+def iter_svelte_files(base_path: Path, excludes: Optional[Sequence[str]] = DEFAULT_EXCLUDES,
+                      use_gitignore: bool = True) -> Iterator[Path]:
+    """Yield the .svelte files under base_path lazily, pruning ignored directories
+
+    Files of a directory come before its subdirectories, each in scandir
+    order, which is the order Path.rglob uses. Symlinked directories are not
+    followed (rglob does not follow them either).
+    """
+    base_path = Path(base_path)
+    root = base_path.resolve().as_posix()
+    rules = parse_ignore_patterns(excludes or (), root)
+    if use_gitignore:
+        rules = ancestor_gitignore_rules(base_path) + rules
+    yield from _walk(str(base_path), root, rules, use_gitignore)
+
+def _walk(directory: str, resolved: str, rules: List[IgnoreRule], use_gitignore: bool) -> Iterator[Path]:
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    if use_gitignore and any(entry.name == '.gitignore' for entry in entries):
+        # Patterns of deeper .gitignore files override those of their parents
+        rules = rules + read_gitignore(directory)
+
+    subdirectories = []
+    for entry in entries:
+        if entry.name.endswith(SVELTE_SUFFIX):
+            if not rules or not is_ignored(rules, f"{resolved}/{entry.name}", False):
+                yield Path(entry.path)
+        try:
+            is_dir = entry.is_dir() and not entry.is_symlink()
+        except OSError:
+            continue
+        if is_dir:
+            subdirectories.append(entry)
+
+    for entry in subdirectories:
+        child = f"{resolved}/{entry.name}"
+        if rules and is_ignored(rules, child, True):
+            continue
+        yield from _walk(entry.path, child, rules, use_gitignore)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Duplicate and near-duplicate CSS rule detection.
+Exact duplicates (the same declarations under any selector) are grouped by a
+canonical declaration-set key. Near-duplicates are found with MinHash
+signatures over declaration shingles and locality-sensitive hashing, so each
+declaration set is only compared with the anchor of the LSH buckets it falls
+into instead of with every other rule.
+"""
+
+import argparse
+import csv
+import hashlib
+import random
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+from css_results import load_results
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_PERMUTATIONS = 128
+DEFAULT_BANDS = 32
+# Near-duplicate matching ignores tiny rules, which overlap by chance
+DEFAULT_MIN_DECLARATIONS = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Distinct declarations whose signatures are kept; bounded so large corpora cannot grow it without limit
+SHINGLE_CACHE_SIZE = 1 << 14
+
+# Canonical "property: value" strings of one rule
+DeclarationSet = FrozenSet[str]
+
+class RuleRef(NamedTuple):
+    component: str
+    selector: str
+    relative_path: str
+
+class DuplicateCluster(NamedTuple):
+    kind: str                       # 'exact' or 'near'
+    similarity: float               # lowest Jaccard similarity to the anchor it was matched against
+    # Each distinct declaration set in the cluster, with the rules that use it
+    members: List[Tuple[DeclarationSet, List[RuleRef]]]
+
+    @property
+    def rules(self) -> List[RuleRef]:
+        return [rule for _, rules in self.members for rule in rules]
+
+    @property
+    def components(self) -> List[str]:
+        return sorted({rule.component for _, rules in self.members for rule in rules})
+
+def canonical_declarations(properties: Dict[str, str]) -> DeclarationSet:
+    """Declarations normalised for comparison: lower-cased names, collapsed whitespace"""
+    return frozenset(f"{name.strip().lower()}: {' '.join(value.split())}" for name, value in properties.items())
+
+def jaccard(a: DeclarationSet, b: DeclarationSet) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class MinHasher:
+    """MinHash signatures with seeded universal hash permutations"""
+
+    def __init__(self, permutations: int = DEFAULT_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(permutations)]
+        # Signature of each single shingle; a set's signature is their element-wise minimum
+        self._shingle_signature = lru_cache(maxsize=SHINGLE_CACHE_SIZE)(self._compute_shingle_signature)
+
+    def _compute_shingle_signature(self, shingle: str) -> Tuple[int, ...]:
+        # blake2b rather than hash() so signatures are stable across runs
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        return tuple((a * value + b) % _MERSENNE_PRIME for a, b in self.params)
+
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(min(column) for column in zip(*(self._shingle_signature(s) for s in shingles)))
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def group_exact(components: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[DeclarationSet, List[RuleRef]]:
+    """Every distinct declaration set of the styled components, with the rules that use it"""
+    groups: Dict[DeclarationSet, List[RuleRef]] = {}
+    for comp_name, comp_data in components:
+        if not comp_data.get('has_styles', False):
+            continue
+        relative_path = comp_data.get('relative_path', '')
+        for selector, properties in comp_data.get('css_rules', {}).items():
+            if properties:
+                groups.setdefault(canonical_declarations(properties), []).append(
+                    RuleRef(comp_name, selector, relative_path))
+    return groups
+
+def find_duplicates(components: Iterable[Tuple[str, Dict[str, Any]]],
+                    threshold: float = DEFAULT_THRESHOLD,
+                    permutations: int = DEFAULT_PERMUTATIONS,
+                    bands: int = DEFAULT_BANDS,
+                    min_declarations: int = DEFAULT_MIN_DECLARATIONS,
+                    near: bool = True) -> List[DuplicateCluster]:
+    """Clusters of rules sharing all (exact) or most (near, Jaccard >= threshold) declarations
+
+    Exact groups are collapsed to one declaration set first. Each set's
+    MinHash signature is cut into `bands` bands; a set landing in a band
+    bucket that already has an anchor is compared with that anchor only and
+    joined to its cluster when similar enough. Clusters are sorted largest
+    first.
+    """
+    groups = group_exact(components)
+    sets = list(groups)
+    clusters = _DisjointSet(len(sets))
+    similarity = [1.0] * len(sets)
+
+    if near and sets:
+        rows = max(1, permutations // bands)
+        hasher = MinHasher(rows * bands)
+        anchors: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+        for set_id, declarations in enumerate(sets):
+            if len(declarations) < min_declarations:
+                continue
+            signature = hasher.signature(declarations)
+            checked = set()
+            for band in range(bands):
+                key = (band, signature[band * rows:(band + 1) * rows])
+                anchor = anchors.setdefault(key, set_id)
+                if anchor == set_id or anchor in checked:
+                    continue
+                checked.add(anchor)
+                score = jaccard(declarations, sets[anchor])
+                if score >= threshold:
+                    clusters.union(anchor, set_id)
+                    similarity[set_id] = min(similarity[set_id], score)
+
+    members: Dict[int, List[int]] = {}
+    for set_id in range(len(sets)):
+        members.setdefault(clusters.find(set_id), []).append(set_id)
+
+    result = []
+    for set_ids in members.values():
+        cluster_members = [(sets[i], groups[sets[i]]) for i in set_ids]
+        if sum(len(rules) for _, rules in cluster_members) < 2:
+            continue
+        kind = 'exact' if len(set_ids) == 1 else 'near'
+        result.append(DuplicateCluster(kind, min(similarity[i] for i in set_ids), cluster_members))
+    result.sort(key=lambda c: (-len(c.rules), -max(len(d) for d, _ in c.members), c.rules[0]))
+    return result
+
+def write_duplicates_csv(clusters: List[DuplicateCluster], csv_path: str) -> None:
+    """One row per clustered rule, with its cluster, the cluster kind and its declarations"""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Cluster', 'Kind', 'Similarity', 'Rules', 'Components', 'Component', 'Selector',
+                         'Declarations', 'File Path'])
+        for cluster_id, cluster in enumerate(clusters, 1):
+            shared = [cluster_id, cluster.kind, f"{cluster.similarity:.2f}",
+                      len(cluster.rules), len(cluster.components)]
+            for declarations, rules in cluster.members:
+                text = '; '.join(sorted(declarations))
+                for rule in rules:
+                    writer.writerow(shared + [rule.component, rule.selector, text, rule.relative_path])
+
+def print_duplicate_report(clusters: List[DuplicateCluster], top_n: int = 10) -> None:
+    exact = [c for c in clusters if c.kind == 'exact']
+    near = [c for c in clusters if c.kind == 'near']
+    print(f"\n=== DUPLICATE CSS RULES ===")
+    print(f"Exact duplicate clusters: {len(exact)} ({sum(len(c.rules) for c in exact)} rules)")
+    print(f"Near-duplicate clusters: {len(near)} ({sum(len(c.rules) for c in near)} rules)")
+    for cluster in clusters[:top_n]:
+        declarations = max((d for d, _ in cluster.members), key=len)
+        print(f"\n[{cluster.kind}, {len(cluster.rules)} rules, similarity >= {cluster.similarity:.2f}] "
+              f"{', '.join(cluster.components)}")
+        print(f"  {'; '.join(sorted(declarations))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate CSS rules across components")
+    parser.add_argument('results', help="Results from css_extractor.py (.json or .jsonl)")
+    parser.add_argument('--csv', help="Write every clustered rule to this CSV file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Jaccard similarity for near-duplicates (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--min-declarations', type=int, default=DEFAULT_MIN_DECLARATIONS,
+                        help=f"Smallest rule considered for near-duplicates (default: {DEFAULT_MIN_DECLARATIONS})")
+    parser.add_argument('--exact-only', action='store_true', help="Skip near-duplicate matching")
+    parser.add_argument('--top', type=int, default=10, help="Clusters shown in the report")
+    args = parser.parse_args()
+
+    data = load_results(args.results)
+    clusters = find_duplicates(data['components'].items(), threshold=args.threshold,
+                               min_declarations=args.min_declarations, near=not args.exact_only)
+    if args.csv:
+        write_duplicates_csv(clusters, args.csv)
+        print(f"Duplicate clusters written to {args.csv}")
+    print_duplicate_report(clusters, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -6,65 +6,108 @@ a structured mapping suitable for CSV conversion.
 """
 
 import os
-import re
 import json
+import argparse
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Any, Optional
+
+from css_cache import ExtractionCache
+from css_discovery import DEFAULT_EXCLUDES, iter_svelte_files
+from css_instrument import NO_INSTRUMENTATION, add_instrumentation_arguments, instrumentation_from_args
+from css_matrix import SparsePropertyIndex
+from css_parser import parse_stylesheet, rules_to_dict
+from css_model import ComponentRecord, json_default
+from css_patterns import STYLE_BLOCK
+from css_pipeline import run_pipeline
+from css_cascade import find_cascade_conflicts
+from css_markup import find_unused_selectors
+from css_output import write_json
+from css_shard import parse_shard, shard_of, write_partial
+from css_styles import read_component
+from css_snapshot import write_snapshot
+from css_watch import CSSWatcher
+
+DEFAULT_CHUNKSIZE = 16
+DEFAULT_CACHE_PATH = ".css_extractor_cache"
+# Per-component keys only written when non-empty
+OPTIONAL_REPORT_KEYS = ('at_rules', 'unused_selectors', 'cascade_conflicts')
 
 class SvelteCSSExtractor:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, excludes: Optional[Sequence[str]] = DEFAULT_EXCLUDES,
+                 use_gitignore: bool = True, compact: bool = True, keep_raw_css: bool = True):
         self.base_path = Path(base_path)
+        # Gitignore-style globs pruned during discovery, on top of any .gitignore files
+        self.excludes = excludes
+        self.use_gitignore = use_gitignore
+        # Store results as css_model records (interned, tuple-backed) instead of nested dicts
+        self.compact = compact
+        # Without raw_css the outputs simply lack that key
+        self.keep_raw_css = keep_raw_css
+        # (i, N): only extract the files whose relative path hashes to shard i of N
+        self.shard: Optional[Tuple[int, int]] = None
+        # Position of each shard file (by str path) in the discovery order of the whole tree
+        self.discovery_positions: Dict[str, int] = {}
         self.components_data = {}
         self.all_css_properties = set()
+        # Replaced by a css_instrument.Instrumentation to time phases and files
+        self.instrumentation = NO_INSTRUMENTATION
+        # Parser token and var() counts for the file being extracted, collected only when instrumented
+        self.parse_stats: Optional[Dict[str, int]] = None
         
     def extract_style_section(self, file_content: str) -> Optional[str]:
         """Extract the content between <style> tags"""
         # Look for <style> sections, handle both self-closing and regular tags
-        style_pattern = r'<style[^>]*>(.*?)</style>'
-        match = re.search(style_pattern, file_content, re.DOTALL)
+        match = STYLE_BLOCK.search(file_content)
         if match:
             return match.group(1).strip()
         return None
     
-    def parse_css_rules(self, css_content: str) -> Dict[str, Dict[str, str]]:
-        """Parse CSS content and extract rules"""
-        rules = {}
+    def parse_css_rules(self, css_content: str, at_rules: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict[str, str]]:
+        """Parse CSS content and extract rules
         
-        # Remove CSS comments
-        css_content = re.sub(r'/\*.*?\*/', '', css_content, flags=re.DOTALL)
-        
-        # Find CSS rules (selector { properties })
-        rule_pattern = r'([^{}]+)\s*{\s*([^{}]*)\s*}'
+        Rules nested in at-rules are keyed by their context-prefixed selector
+        (e.g. '@media (max-width: 600px) .card'); pass a dict as at_rules to
+        also collect the at-rule chain for each of those keys.
+        """
+        return self.parse_css_blocks([css_content], at_rules)
+    
+    def parse_css_blocks(self, css_blocks: List[str], at_rules: Optional[Dict[str, List[str]]] = None,
+                         positions: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, str]]:
+        """Parse several style blocks into one rule set, later blocks winning
         
-        for match in re.finditer(rule_pattern, css_content):
-            selector = match.group(1).strip()
-            properties_block = match.group(2).strip()
-            
-            # Parse individual properties
-            properties = {}
-            prop_pattern = r'([^:;]+)\s*:\s*([^:;]+)(?:;|$)'
-            
-            for prop_match in re.finditer(prop_pattern, properties_block):
-                property_name = prop_match.group(1).strip()
-                property_value = prop_match.group(2).strip()
-                
-                if property_name and property_value:
-                    properties[property_name] = property_value
-                    self.all_css_properties.add(property_name)
-            
-            if properties:
-                rules[selector] = properties
-                
+        Each block is parsed on its own, so an unclosed brace in one block
+        cannot swallow the next.
+        """
+        parsed = []
+        for css_content in css_blocks:
+            parsed.extend(parse_stylesheet(css_content, self.parse_stats))
+        rules = rules_to_dict(parsed, at_rules, positions)
+        for properties in rules.values():
+            self.all_css_properties.update(properties)
         return rules
     
-    def extract_component_css(self, file_path: Path) -> Dict[str, Any]:
-        """Extract CSS data from a single component file"""
+    def extract_component_css(self, file_path: Path) -> Mapping:
+        """Extract CSS data from a single component file
+        
+        Returns a css_model.ComponentRecord, which reads like the dict form,
+        or the dict itself when the extractor is not compact.
+        """
+        component_data = self._extract_component_dict(file_path)
+        if self.compact:
+            return ComponentRecord.from_dict(component_data, self.keep_raw_css)
+        if not self.keep_raw_css:
+            component_data.pop('raw_css', None)
+        return component_data
+    
+    def _extract_component_dict(self, file_path: Path) -> Dict[str, Any]:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            style_content = self.extract_style_section(content)
-            if not style_content:
+            # Every <style> block, located on the raw bytes; only their contents are decoded,
+            # and the markup around them is indexed in the same read
+            blocks, markup = read_component(file_path)
+            blocks = [(block, text) for block, text in blocks if text]
+            if not blocks:
                 return {
                     'file_path': str(file_path),
                     'relative_path': str(file_path.relative_to(self.base_path)),
@@ -73,16 +116,27 @@ class SvelteCSSExtractor:
                     'css_rules': {}
                 }
             
-            css_rules = self.parse_css_rules(style_content)
+            at_rules = {}
+            positions = {}
+            css_rules = self.parse_css_blocks([text for _, text in blocks], at_rules, positions)
             
-            return {
+            component_data = {
                 'file_path': str(file_path),
                 'relative_path': str(file_path.relative_to(self.base_path)),
                 'component_name': file_path.stem,
                 'has_styles': True,
                 'css_rules': css_rules,
-                'raw_css': style_content
+                'at_rules': at_rules,
+                'style_blocks': [block.describe() for block, _ in blocks],
+                'unused_selectors': find_unused_selectors(css_rules, markup, at_rules),
+                'cascade_conflicts': find_cascade_conflicts(css_rules, at_rules, positions),
+                'raw_css': '\n\n'.join(text for _, text in blocks)
             }
+            # Empty reports are left out rather than written as {} and [] for every component
+            for key in OPTIONAL_REPORT_KEYS:
+                if not component_data[key]:
+                    del component_data[key]
+            return component_data
             
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
@@ -95,155 +149,381 @@ class SvelteCSSExtractor:
                 'error': str(e)
             }
     
-    def process_all_components(self) -> None:
-        """Process all Svelte components in the base path"""
-        svelte_files = list(self.base_path.rglob("*.svelte"))
+    def add_component(self, component_data: Dict[str, Any], css_properties: Optional[Set[str]] = None) -> None:
+        """Merge a single extract_component_css result into the extractor state
+        
+        css_properties is the set of property names seen while parsing the file,
+        which can include properties from rules later overridden by a repeated
+        selector. It defaults to the properties left in css_rules.
+        """
+        if css_properties is None:
+            css_properties = set()
+            for properties in component_data.get('css_rules', {}).values():
+                css_properties.update(properties)
+        self.all_css_properties.update(css_properties)
+        self.components_data[component_data['component_name']] = component_data
+    
+    def process_all_components(self, workers: int = 1, chunksize: int = DEFAULT_CHUNKSIZE,
+                               cache: Optional[ExtractionCache] = None) -> None:
+        """Process all Svelte components in the base path
+        
+        With workers > 1 the files are parsed on a process pool. Results are
+        merged back in discovery order, so the output matches a serial run.
+        With a cache, only files that changed since the last run are parsed.
+        """
+        for component_data, css_properties in self.iter_component_results(workers, chunksize, cache):
+            self.add_component(component_data, css_properties)
+    
+    def discover_files(self) -> Iterator[Path]:
+        """Lazily yield the .svelte files to process, skipping ignored paths"""
+        svelte_files = iter_svelte_files(self.base_path, self.excludes, self.use_gitignore)
+        if self.shard is None:
+            return svelte_files
+        return self._shard_files(svelte_files, *self.shard)
+    
+    def _shard_files(self, svelte_files: Iterable[Path], index: int, count: int) -> Iterator[Path]:
+        for position, file_path in enumerate(svelte_files):
+            if shard_of(str(file_path.relative_to(self.base_path)), count) == index:
+                self.discovery_positions[str(file_path)] = position
+                yield file_path
+    
+    def iter_component_results(self, workers: int = 1, chunksize: int = DEFAULT_CHUNKSIZE,
+                               cache: Optional[ExtractionCache] = None) -> Iterator[Tuple[Dict[str, Any], Set[str]]]:
+        """Yield (component_data, css_properties) for every Svelte file in discovery order
+        
+        Without a cache, files are parsed (or handed to the pool) as discovery
+        finds them. With a cache, the file list is collected first so stale
+        entries can be pruned and only changed files sent to the workers.
+        """
+        if cache is None:
+            svelte_files = self.instrumentation.timed_iter('discover', self.discover_files())
+            yield from self._extract_files(svelte_files, workers, chunksize)
+            return
+        
+        with self.instrumentation.phase('discover'):
+            svelte_files = list(self.discover_files())
         print(f"Found {len(svelte_files)} Svelte files")
         
+        cache.prune(svelte_files)
+        cached_results: Dict[Path, Tuple[Dict[str, Any], Set[str]]] = {}
         for file_path in svelte_files:
-            component_data = self.extract_component_css(file_path)
-            self.components_data[component_data['component_name']] = component_data
-            
-    def create_property_matrix(self) -> Dict[str, Dict[str, str]]:
-        """Create a matrix where rows are CSS properties and columns are components"""
-        matrix = {}
+            cached = cache.lookup(file_path)
+            if cached is not None:
+                cached_results[file_path] = cached
         
-        # Initialize matrix with all properties
-        for prop in sorted(self.all_css_properties):
-            matrix[prop] = {}
-            
-        # Fill in the matrix
-        for comp_name, comp_data in self.components_data.items():
-            if not comp_data.get('has_styles', False):
+        stale_files = [f for f in svelte_files if f not in cached_results]
+        extracted = self._extract_files(stale_files, workers if len(stale_files) > 1 else 1, chunksize, report=False)
+        
+        for file_path in svelte_files:
+            if file_path in cached_results:
+                yield cached_results.pop(file_path)
                 continue
-                
-            # Collect all property values for this component across all selectors
-            component_properties = {}
-            
-            for selector, properties in comp_data.get('css_rules', {}).items():
-                for prop_name, prop_value in properties.items():
-                    if prop_name in component_properties:
-                        # If property appears multiple times, create a list
-                        if isinstance(component_properties[prop_name], list):
-                            component_properties[prop_name].append(f"{selector}: {prop_value}")
-                        else:
-                            component_properties[prop_name] = [
-                                component_properties[prop_name],
-                                f"{selector}: {prop_value}"
-                            ]
-                    else:
-                        component_properties[prop_name] = f"{selector}: {prop_value}"
+            component_data, css_properties = next(extracted)
+            if 'error' not in component_data:
+                cache.store(file_path, component_data, css_properties)
+            yield component_data, css_properties
+        
+        cache.save()
+        print(cache.stats_line())
+    
+    def _extract_files(self, svelte_files: Iterable[Path], workers: int, chunksize: int,
+                       report: bool = True) -> Iterator[Tuple[Dict[str, Any], Set[str]]]:
+        """Extract files in order, serially or on a process pool"""
+        count = 0
+        # Counted only for the files timed by this run, never carried over from an earlier one
+        self.parse_stats = {} if self.instrumentation.enabled and workers <= 1 else None
+        if workers > 1:
+            extracted = self._extract_parallel(svelte_files, workers, chunksize)
+        elif self.instrumentation.enabled:
+            extracted = (self.instrumentation.time_file(self._extract_with_properties, f, self.parse_stats)
+                         for f in svelte_files)
+        else:
+            extracted = map(self._extract_with_properties, svelte_files)
+        for result in extracted:
+            count += 1
+            yield result
+        if report:
+            print(f"Found {count} Svelte files")
+    
+    def _extract_with_properties(self, file_path: Path) -> Tuple[Dict[str, Any], Set[str]]:
+        """Extract one file, returning its data and the property names seen while parsing it"""
+        seen_properties = self.all_css_properties
+        self.all_css_properties = set()
+        try:
+            component_data = self.extract_component_css(file_path)
+            return component_data, self.all_css_properties
+        finally:
+            self.all_css_properties = seen_properties
+    
+    def _extract_parallel(self, svelte_files: Iterable[Path], workers: int, chunksize: int) -> Iterator[Tuple[Dict[str, Any], Set[str]]]:
+        """Run extract_component_css for every file on a process pool, preserving order"""
+        print(f"Using {workers} worker processes (chunksize {chunksize})")
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.base_path), self.compact, self.keep_raw_css)) as executor:
+            yield from executor.map(_extract_in_worker, svelte_files, chunksize=max(1, chunksize))
             
-            # Add to matrix
-            for prop in matrix:
-                if prop in component_properties:
-                    value = component_properties[prop]
-                    if isinstance(value, list):
-                        matrix[prop][comp_name] = " | ".join(value)
-                    else:
-                        matrix[prop][comp_name] = value
-                else:
-                    matrix[prop][comp_name] = ""
-                    
-        return matrix
+    def property_index(self) -> SparsePropertyIndex:
+        """Build the sparse property x component index behind both matrix views"""
+        return SparsePropertyIndex(
+            self.all_css_properties,
+            ((name, data.get('css_rules', {}) if data.get('has_styles', False) else None)
+             for name, data in self.components_data.items())
+        )
     
-    def create_component_matrix(self) -> Dict[str, Dict[str, str]]:
-        """Create a matrix where rows are components and columns are CSS properties"""
-        matrix = {}
+    def create_property_matrix(self, index: Optional[SparsePropertyIndex] = None) -> Dict[str, Dict[str, str]]:
+        """Create a matrix where rows are CSS properties and columns are components
         
-        for comp_name, comp_data in self.components_data.items():
-            if not comp_data.get('has_styles', False):
-                matrix[comp_name] = {}
-                continue
-                
-            component_row = {}
-            
-            # Collect all property values for this component across all selectors
-            for selector, properties in comp_data.get('css_rules', {}).items():
-                for prop_name, prop_value in properties.items():
-                    if prop_name in component_row:
-                        # If property appears multiple times, append
-                        component_row[prop_name] += f" | {selector}: {prop_value}"
-                    else:
-                        component_row[prop_name] = f"{selector}: {prop_value}"
-            
-            # Fill in missing properties with empty strings
-            for prop in sorted(self.all_css_properties):
-                if prop not in component_row:
-                    component_row[prop] = ""
-                    
-            matrix[comp_name] = component_row
-                    
-        return matrix
+        The matrix is sparse: empty cells are left out, so use .get(component, "").
+        """
+        index = index or self.property_index()
+        return {
+            prop: dict(index.property_cells(prop_id))
+            for prop_id, prop in enumerate(index.properties)
+        }
     
-    def generate_csv_data(self) -> Dict[str, Any]:
-        """Generate data suitable for CSV conversion"""
-        property_matrix = self.create_property_matrix()
-        component_matrix = self.create_component_matrix()
+    def create_component_matrix(self, index: Optional[SparsePropertyIndex] = None) -> Dict[str, Dict[str, str]]:
+        """Create a matrix where rows are components and columns are CSS properties
         
-        # Create CSV-friendly format
-        csv_data = {
+        The matrix is sparse: empty cells are left out, so use .get(property, "").
+        """
+        index = index or self.property_index()
+        return {
+            name: dict(index.component_cells(comp_id))
+            for comp_id, name in enumerate(index.components)
+        }
+    
+    def generate_csv_data(self, index: Optional[SparsePropertyIndex] = None) -> Dict[str, Any]:
+        """Generate data suitable for CSV conversion"""
+        index = index or self.property_index()
+        return {
             'property_rows': {
-                'headers': ['CSS Property'] + list(self.components_data.keys()),
-                'data': []
+                'headers': index.property_headers(),
+                'data': list(index.iter_property_rows())
             },
             'component_rows': {
-                'headers': ['Component'] + sorted(self.all_css_properties),
-                'data': []
+                'headers': index.component_headers(),
+                'data': list(index.iter_component_rows())
             }
         }
+    
+    def metadata(self) -> Dict[str, Any]:
+        return build_metadata(
+            len(self.components_data),
+            len([c for c in self.components_data.values() if c.get('has_styles', False)]),
+            self.all_css_properties
+        )
+    
+    def save_results(self, output_path: str, index: Optional[SparsePropertyIndex] = None,
+                     output_format: str = 'json', compress: bool = False) -> None:
+        """Save extraction results to JSON file
         
-        # Property-centric view (properties as rows)
-        for prop in sorted(self.all_css_properties):
-            row = [prop]
-            for comp_name in self.components_data.keys():
-                value = property_matrix.get(prop, {}).get(comp_name, "")
-                row.append(value)
-            csv_data['property_rows']['data'].append(row)
-            
-        # Component-centric view (components as rows)
-        for comp_name in sorted(self.components_data.keys()):
-            if not self.components_data[comp_name].get('has_styles', False):
-                continue
-            row = [comp_name]
-            for prop in sorted(self.all_css_properties):
-                value = component_matrix.get(comp_name, {}).get(prop, "")
-                row.append(value)
-            csv_data['component_rows']['data'].append(row)
+        With output_format='snapshot' a binary snapshot (see css_snapshot) is
+        written instead; its readers rebuild csv_data from the rules. With
+        compress, the JSON is gzipped and written to output_path + '.gz'.
+        """
+        if output_format == 'snapshot':
+            metadata = self.metadata()
+            write_snapshot(metadata, self.components_data.items(), output_path)
+            print(f"Snapshot saved to {output_path}")
+            print_metadata(metadata)
+            return
         
-        return csv_data
-    
-    def save_results(self, output_path: str) -> None:
-        """Save extraction results to JSON file"""
         results = {
-            'metadata': {
-                'total_components': len(self.components_data),
-                'components_with_styles': len([c for c in self.components_data.values() if c.get('has_styles', False)]),
-                'total_css_properties': len(self.all_css_properties),
-                'css_properties': sorted(list(self.all_css_properties))
-            },
+            'metadata': self.metadata(),
             'components': self.components_data,
-            'csv_data': self.generate_csv_data()
+            'csv_data': self.generate_csv_data(index)
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        output_path = write_json(output_path, results, compress)
         
         print(f"Results saved to {output_path}")
-        print(f"Total components: {results['metadata']['total_components']}")
-        print(f"Components with styles: {results['metadata']['components_with_styles']}")
-        print(f"Total CSS properties found: {results['metadata']['total_css_properties']}")
+        print_metadata(results['metadata'])
+    
+    def stream_results(self, output_path: str, workers: int = 1, chunksize: int = DEFAULT_CHUNKSIZE,
+                       cache: Optional[ExtractionCache] = None) -> None:
+        """Extract every component and write it to a JSONL file as soon as it is parsed
+        
+        Each line is a {"record": "component", "name": ..., "component": {...}}
+        record, in discovery order, followed by a single {"record": "metadata", ...}
+        trailer. The leading name lets readers index the file without decoding
+        every component. Only component names and property names are kept in memory,
+        so components_data stays empty. Readers resolve repeated component
+        names the same way save_results does (see css_results.JsonlResults).
+        """
+        has_styles: Dict[str, bool] = {}
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for component_data, css_properties in self.iter_component_results(workers, chunksize, cache):
+                self.all_css_properties.update(css_properties)
+                has_styles[component_data['component_name']] = component_data.get('has_styles', False)
+                record = {'record': 'component', 'name': component_data['component_name'],
+                          'component': component_data}
+                f.write(json.dumps(record, ensure_ascii=False, default=json_default))
+                f.write('\n')
+            
+            metadata = build_metadata(len(has_styles), sum(has_styles.values()), self.all_css_properties)
+            f.write(json.dumps({'record': 'metadata', 'metadata': metadata}, ensure_ascii=False))
+            f.write('\n')
+        
+        print(f"Results streamed to {output_path}")
+        print_metadata(metadata)
+
+def build_metadata(total_components: int, components_with_styles: int, css_properties: Set[str]) -> Dict[str, Any]:
+    """Build the metadata section shared by the JSON and JSONL outputs"""
+    return {
+        'total_components': total_components,
+        'components_with_styles': components_with_styles,
+        'total_css_properties': len(css_properties),
+        'css_properties': sorted(css_properties)
+    }
+
+def print_metadata(metadata: Dict[str, Any]) -> None:
+    print(f"Total components: {metadata['total_components']}")
+    print(f"Components with styles: {metadata['components_with_styles']}")
+    print(f"Total CSS properties found: {metadata['total_css_properties']}")
+
+# Per-process extractor used by the parallel scan mode
+_worker_extractor: Optional[SvelteCSSExtractor] = None
+
+def _init_worker(base_path: str, compact: bool = True, keep_raw_css: bool = True) -> None:
+    global _worker_extractor
+    _worker_extractor = SvelteCSSExtractor(base_path, compact=compact, keep_raw_css=keep_raw_css)
+
+def _extract_in_worker(file_path: Path) -> Tuple[Dict[str, Any], Set[str]]:
+    return _worker_extractor._extract_with_properties(file_path)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract CSS from Svelte components")
+    parser.add_argument('components_path', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/frontend/src/lib/components",
+                        help="Directory to scan for .svelte files")
+    parser.add_argument('output_path', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/css_extraction_results.json",
+                        help="Where to write the JSON results")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU, default: 1 = serial)")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Files handed to a worker at a time (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument('--format', choices=('json', 'jsonl', 'snapshot'), default='json',
+                        help="json: one indented document; jsonl: stream one record per component; "
+                             "snapshot: compact binary file for fast, memory-mapped loading")
+    parser.add_argument('--csv-dir',
+                        help="Also write the six CSV files here, straight from memory")
+    parser.add_argument('--summary',
+                        help="Also write the Markdown summary report to this file")
+    parser.add_argument('--sqlite',
+                        help="Also persist the results into a SQLite index (query it with css_index_db.py)")
+    parser.add_argument('--token-index',
+                        help="Also write the design-token index (definitions, usages, unused/undefined) to this CSV")
+    parser.add_argument('--duplicates',
+                        help="Also write exact and near-duplicate rule clusters to this CSV")
+    parser.add_argument('--token-suggestions',
+                        help="Also write design-token suggestions for hard-coded values to this CSV")
+    parser.add_argument('--cascade-conflicts',
+                        help="Also write declarations overridden by more specific or later selectors to this CSV")
+    parser.add_argument('--gzip', action='store_true',
+                        help="gzip the JSON results and CSV files (written as .json.gz / .csv.gz)")
+    parser.add_argument('--writers', type=int, default=1,
+                        help="Threads writing independent CSV files concurrently (default: 1)")
+    parser.add_argument('--no-json', action='store_true',
+                        help="Skip writing the JSON results (only with --csv-dir/--summary)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and update --csv-dir, --summary and --token-index as .svelte files "
+                             "change (needs --csv-dir; the results file is not written)")
+    parser.add_argument('--poll-interval', type=float, default=0.5,
+                        help="Seconds between change scans in --watch mode (default: 0.5)")
+    parser.add_argument('--debounce', type=float, default=0.2,
+                        help="Quiet period before applying a burst of changes (default: 0.2)")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help=f"Reuse per-file results from a cache file (default when given: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="Skip paths matching this gitignore-style glob (repeatable; "
+                             f"always skipped: {' '.join(DEFAULT_EXCLUDES)})")
+    parser.add_argument('--no-gitignore', action='store_true',
+                        help="Do not apply .gitignore files during discovery")
+    parser.add_argument('--drop-raw-css', action='store_true',
+                        help="Do not keep (or write) the raw style text of each component")
+    parser.add_argument('--shard', type=_shard_argument, metavar='I/N',
+                        help="Only extract shard I of N (by relative path hash) and write a partial "
+                             ".jsonl result; combine partials with css_merge.py")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    pipeline_outputs = (args.csv_dir or args.summary or args.sqlite or args.token_index
+                        or args.duplicates or args.token_suggestions or args.cascade_conflicts)
+    if args.format == 'jsonl' and pipeline_outputs:
+        parser.error("pipeline outputs (--csv-dir, --summary, ...) need the in-memory results; use --format json")
+    if args.no_json and not pipeline_outputs:
+        parser.error("--no-json needs a pipeline output (--csv-dir, --summary, --sqlite, --token-index, "
+                     "--duplicates, --token-suggestions or --cascade-conflicts)")
+    if args.watch and not args.csv_dir:
+        parser.error("--watch needs --csv-dir")
+    if args.watch and (args.format != 'json' or args.sqlite or args.duplicates or args.token_suggestions
+                       or args.cascade_conflicts or args.writers != 1):
+        parser.error("--watch only updates --csv-dir, --summary and --token-index; --format, --sqlite, "
+                     "--duplicates, --token-suggestions, --cascade-conflicts and --writers do not apply")
+    if args.gzip and (args.format != 'json' or args.watch or args.shard):
+        parser.error("--gzip applies to the json format and the one-shot CSV outputs")
+    if args.shard and (pipeline_outputs or args.watch or args.no_json or args.format == 'snapshot'):
+        parser.error("--shard writes a partial result only; build the other outputs with css_merge.py")
+    return args
+
+def _shard_argument(text: str) -> Tuple[int, int]:
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 def main():
-    # Path to the components directory
-    components_path = "/Users/peterabbott/folio/svelte-folio/frontend/src/lib/components"
-    output_path = "/Users/peterabbott/folio/svelte-folio/css_extraction_results.json"
+    args = parse_args()
+    components_path = args.components_path
+    output_path = args.output_path
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
     
-    extractor = SvelteCSSExtractor(components_path)
+    extractor = SvelteCSSExtractor(components_path, excludes=list(DEFAULT_EXCLUDES) + args.exclude,
+                                   use_gitignore=not args.no_gitignore, keep_raw_css=not args.drop_raw_css)
+    extractor.shard = args.shard
+    extractor.instrumentation = instrumentation_from_args(args)
     print(f"Starting CSS extraction from: {components_path}")
+    if extractor.instrumentation.enabled and workers > 1:
+        print("Per-file timings are only recorded with --workers 1")
     
-    extractor.process_all_components()
-    extractor.save_results(output_path)
+    cache = (ExtractionCache(args.cache, components_path, compact=extractor.compact,
+                             keep_raw_css=extractor.keep_raw_css) if args.cache else None)
+    instrumentation = extractor.instrumentation
+    instrumentation.start()
+    try:
+        if args.watch:
+            watcher = CSSWatcher(extractor, args.csv_dir, summary_file=args.summary, token_csv=args.token_index,
+                                 interval=args.poll_interval, debounce=args.debounce)
+            watcher.run(workers=workers, chunksize=args.chunksize, cache=cache)
+            return
+        
+        if args.shard:
+            with instrumentation.phase('extract+write'):
+                write_partial(extractor, output_path, args.shard,
+                              workers=workers, chunksize=args.chunksize, cache=cache)
+            return
+        
+        if args.format == 'jsonl':
+            with instrumentation.phase('extract+write'):
+                extractor.stream_results(output_path, workers=workers, chunksize=args.chunksize, cache=cache)
+            return
+        
+        with instrumentation.phase('extract'):
+            extractor.process_all_components(workers=workers, chunksize=args.chunksize, cache=cache)
+        if (args.csv_dir or args.summary or args.sqlite or args.token_index or args.duplicates
+                or args.token_suggestions or args.cascade_conflicts):
+            run_pipeline(extractor, csv_dir=args.csv_dir, summary_file=args.summary,
+                         json_path=None if args.no_json else output_path, sqlite_path=args.sqlite,
+                         token_csv=args.token_index, duplicates_csv=args.duplicates,
+                         suggestions_csv=args.token_suggestions, cascade_csv=args.cascade_conflicts,
+                         output_format=args.format, compress=args.gzip, csv_workers=args.writers,
+                         instrumentation=instrumentation)
+        else:
+            with instrumentation.phase(args.format):
+                extractor.save_results(output_path, output_format=args.format, compress=args.gzip)
+    finally:
+        instrumentation.finish()
     
     # Print summary of most common properties
     if extractor.all_css_properties:
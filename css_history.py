@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+CSS evolution across git history, without checkouts.
+Commits, trees and .svelte blobs are read straight from the object store
+through one long-lived `git cat-file --batch` process. Tree listings are
+memoized by tree SHA and parse results by blob SHA, so a revision only costs
+the directories and files that changed since the ones already seen. Writes a
+per-commit metrics time series (oldest first) as CSV.
+"""
+
+import argparse
+import csv
+import subprocess
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from css_parser import parse_stylesheet, rules_to_dict
+from css_patterns import VAR_REFERENCE
+from css_styles import decode_block, locate_style_blocks
+
+SVELTE_SUFFIX = ".svelte"
+TREE_MODE = b'40000'
+
+class BlobMetrics(NamedTuple):
+    has_styles: bool
+    rule_count: int
+    declaration_count: int
+    var_declaration_count: int
+    properties: FrozenSet[str]      # every property name seen, as in all_css_properties
+    tokens: FrozenSet[str]          # custom properties referenced through var()
+
+class CommitInfo(NamedTuple):
+    sha: str
+    timestamp: int
+    subject: str
+    tree: str
+
+class CommitMetrics(NamedTuple):
+    commit: str
+    timestamp: int
+    subject: str
+    files: int
+    styled_files: int
+    rules: int
+    declarations: int
+    var_declarations: int
+    token_adoption: float           # share of declarations whose value uses var()
+    unique_properties: int
+    unique_tokens: int
+    parsed_blobs: int               # blobs first seen (and parsed) at this commit
+
+HEADERS = ['Commit', 'Timestamp', 'Subject', 'Files', 'Styled Files', 'Rules', 'Declarations',
+           'var() Declarations', 'Token Adoption', 'Unique Properties', 'Unique Tokens', 'Parsed Blobs']
+
+class GitCatFile:
+    """A single `git cat-file --batch` process serving object reads by SHA"""
+
+    def __init__(self, repo: Path):
+        self.process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=repo,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def read(self, sha: str) -> Tuple[str, bytes]:
+        self.process.stdin.write(sha.encode('ascii') + b'\n')
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(f"git object {sha} is missing")
+        size = int(header[2])
+        data = self.process.stdout.read(size + 1)[:size]
+        return header[1].decode('ascii'), data
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self) -> 'GitCatFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def parse_tree(data: bytes) -> List[Tuple[bytes, str, str]]:
+    """(mode, name, sha) entries of a raw tree object"""
+    entries = []
+    pos = 0
+    while pos < len(data):
+        space = data.index(b' ', pos)
+        nul = data.index(b'\0', space)
+        sha = data[nul + 1:nul + 21].hex()
+        entries.append((data[pos:space], data[space + 1:nul].decode('utf-8', 'surrogateescape'), sha))
+        pos = nul + 21
+    return entries
+
+def parse_commit(sha: str, data: bytes) -> CommitInfo:
+    headers, _, message = data.partition(b'\n\n')
+    tree = ''
+    timestamp = 0
+    for line in headers.split(b'\n'):
+        if line.startswith(b'tree '):
+            tree = line[5:].decode('ascii')
+        elif line.startswith(b'committer '):
+            timestamp = int(line.rsplit(b' ', 2)[1])
+    subject = message.split(b'\n', 1)[0].decode('utf-8', 'replace')
+    return CommitInfo(sha, timestamp, subject, tree)
+
+def blob_metrics(data: bytes) -> BlobMetrics:
+    """Parse one .svelte blob the way the extractor does and keep only its metrics"""
+    texts = [text for text in (decode_block(data, block) for block in locate_style_blocks(data)) if text]
+    if not texts:
+        return BlobMetrics(False, 0, 0, 0, frozenset(), frozenset())
+    parsed = []
+    for text in texts:
+        parsed.extend(parse_stylesheet(text))
+    properties = set()
+    for rule in parsed:
+        properties.update(name for name, _ in rule.declarations)
+    css_rules = rules_to_dict(parsed)
+    declarations = var_declarations = 0
+    tokens = set()
+    for rule_properties in css_rules.values():
+        for prop_value in rule_properties.values():
+            declarations += 1
+            if 'var(' in prop_value:
+                var_declarations += 1
+                tokens.update(token.strip() for token in VAR_REFERENCE.findall(prop_value))
+    return BlobMetrics(True, len(css_rules), declarations, var_declarations, frozenset(properties), frozenset(tokens))
+
+class HistoryAnalyzer:
+    def __init__(self, repo: Path, subdirectory: str = ''):
+        self.repo = repo
+        # Path of the scanned directory inside the repository, '' for the root
+        self.subdirectory = [part for part in Path(subdirectory).parts if part not in ('', '.')]
+        self.git = GitCatFile(repo)
+        self.tree_files: Dict[str, List[str]] = {}   # tree SHA -> SHAs of the .svelte blobs below it
+        self.blobs: Dict[str, BlobMetrics] = {}
+
+    def close(self) -> None:
+        self.git.close()
+
+    def _svelte_blobs(self, tree_sha: str) -> List[str]:
+        cached = self.tree_files.get(tree_sha)
+        if cached is not None:
+            return cached
+        blobs = []
+        for mode, name, sha in parse_tree(self.git.read(tree_sha)[1]):
+            if mode == TREE_MODE:
+                blobs.extend(self._svelte_blobs(sha))
+            elif name.endswith(SVELTE_SUFFIX) and mode.startswith(b'100'):
+                blobs.append(sha)
+        self.tree_files[tree_sha] = blobs
+        return blobs
+
+    def _subdirectory_tree(self, root_tree: str) -> Optional[str]:
+        tree = root_tree
+        for part in self.subdirectory:
+            entries = parse_tree(self.git.read(tree)[1])
+            tree = next((sha for mode, name, sha in entries if name == part and mode == TREE_MODE), None)
+            if tree is None:
+                return None
+        return tree
+
+    def commit_metrics(self, sha: str) -> CommitMetrics:
+        commit = parse_commit(sha, self.git.read(sha)[1])
+        tree = self._subdirectory_tree(commit.tree)
+        blob_shas = self._svelte_blobs(tree) if tree is not None else []
+
+        parsed = 0
+        files = styled = rules = declarations = var_declarations = 0
+        properties = set()
+        tokens = set()
+        for blob_sha in blob_shas:
+            metrics = self.blobs.get(blob_sha)
+            if metrics is None:
+                metrics = self.blobs[blob_sha] = blob_metrics(self.git.read(blob_sha)[1])
+                parsed += 1
+            files += 1
+            if metrics.has_styles:
+                styled += 1
+                rules += metrics.rule_count
+                declarations += metrics.declaration_count
+                var_declarations += metrics.var_declaration_count
+                properties |= metrics.properties
+                tokens |= metrics.tokens
+        return CommitMetrics(commit.sha, commit.timestamp, commit.subject, files, styled, rules, declarations,
+                             var_declarations, round(var_declarations / declarations, 4) if declarations else 0.0,
+                             len(properties), len(tokens), parsed)
+
+def list_commits(repo: Path, revision: str, count: int, first_parent: bool) -> List[str]:
+    """SHAs of the last `count` commits reachable from revision, oldest first"""
+    command = ['git', 'rev-list', f'--max-count={count}']
+    if first_parent:
+        command.append('--first-parent')
+    command.append(revision)
+    output = subprocess.run(command, cwd=repo, check=True, capture_output=True, text=True).stdout
+    return list(reversed(output.split()))
+
+def locate_repository(components_path: Path) -> Tuple[Path, str]:
+    """The repository root containing components_path and the path inside it"""
+    components_path = components_path.resolve()
+    root = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=components_path, check=True,
+                          capture_output=True, text=True).stdout.strip()
+    repo = Path(root).resolve()
+    return repo, components_path.relative_to(repo).as_posix()
+
+def analyze_history(components_path: str, revision: str = 'HEAD', count: int = 100,
+                    first_parent: bool = False) -> List[CommitMetrics]:
+    repo, subdirectory = locate_repository(Path(components_path))
+    analyzer = HistoryAnalyzer(repo, subdirectory)
+    try:
+        return [analyzer.commit_metrics(sha) for sha in list_commits(repo, revision, count, first_parent)]
+    finally:
+        analyzer.close()
+
+def write_history_csv(series: List[CommitMetrics], csv_path: str) -> None:
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADERS)
+        for metrics in series:
+            writer.writerow(list(metrics))
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-commit CSS metrics from git history, without checkouts")
+    parser.add_argument('components_path', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/frontend/src/lib/components",
+                        help="Directory (inside a git work tree) whose .svelte files are analysed")
+    parser.add_argument('-n', '--commits', type=int, default=100, help="Number of commits to analyse")
+    parser.add_argument('--rev', default='HEAD', help="Revision to walk back from")
+    parser.add_argument('--first-parent', action='store_true', help="Follow only the first parent of merges")
+    parser.add_argument('--output', default="css_history.csv", help="Where to write the time series")
+    args = parser.parse_args()
+
+    series = analyze_history(args.components_path, args.rev, args.commits, args.first_parent)
+    write_history_csv(series, args.output)
+    parsed = sum(m.parsed_blobs for m in series)
+    files = sum(m.files for m in series)
+    print(f"Analysed {len(series)} commits: parsed {parsed} distinct blobs for {files} file versions")
+    print(f"Time series written to {args.output}")
+
+if __name__ == "__main__":
+    main()
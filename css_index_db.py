@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed CSS index.
+Persists extraction results into components / selectors / declarations /
+var_refs tables with indexes on the lookup columns, and provides a small
+query API and CLI so questions like "which components set z-index above 10"
+are answered from an index instead of re-grepping detailed_css_rules.csv.
+"""
+
+import argparse
+import re
+import sqlite3
+from urllib.parse import quote
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from css_patterns import VAR_REFERENCE
+from css_results import load_results
+
+SCHEMA = """
+CREATE TABLE components (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    relative_path TEXT NOT NULL,
+    has_styles INTEGER NOT NULL
+);
+CREATE TABLE selectors (
+    id INTEGER PRIMARY KEY,
+    component_id INTEGER NOT NULL REFERENCES components(id),
+    selector TEXT NOT NULL,
+    at_rules TEXT NOT NULL
+);
+CREATE TABLE declarations (
+    id INTEGER PRIMARY KEY,
+    component_id INTEGER NOT NULL REFERENCES components(id),
+    selector_id INTEGER NOT NULL REFERENCES selectors(id),
+    property TEXT NOT NULL,
+    value TEXT NOT NULL,
+    numeric_value REAL,
+    unit TEXT
+);
+CREATE TABLE var_refs (
+    declaration_id INTEGER NOT NULL REFERENCES declarations(id),
+    component_id INTEGER NOT NULL REFERENCES components(id),
+    token TEXT NOT NULL
+);
+CREATE INDEX idx_components_name ON components(name);
+CREATE INDEX idx_selectors_component ON selectors(component_id);
+CREATE INDEX idx_declarations_property ON declarations(property, numeric_value);
+CREATE INDEX idx_declarations_component ON declarations(component_id);
+CREATE INDEX idx_var_refs_token ON var_refs(token);
+"""
+# executescript() commits before running, so the schema is executed statement by statement
+SCHEMA_STATEMENTS = [statement.strip() for statement in SCHEMA.split(';') if statement.strip()]
+
+# A plain number with an optional unit, e.g. "10", "-1.5rem", "100%"
+NUMERIC_VALUE = re.compile(r'^(-?(?:\d+\.?\d*|\.\d+))([a-zA-Z%]*)(?:\s*!important)?$')
+
+COMPARISONS = {'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<=', 'eq': '='}
+
+def parse_numeric(value: str) -> Tuple[Optional[float], Optional[str]]:
+    match = NUMERIC_VALUE.match(value.strip())
+    if not match:
+        return None, None
+    return float(match.group(1)), match.group(2) or None
+
+def build_database(components: Iterable[Tuple[str, Dict[str, Any]]], db_path: str) -> Dict[str, int]:
+    """(Re)create the index at db_path from (name, component_data) pairs
+
+    Rows are assigned ids up front and written with one executemany per
+    table inside a single transaction. Returns the row count per table.
+    """
+    component_rows, selector_rows, declaration_rows, var_rows = [], [], [], []
+    for comp_name, comp_data in components:
+        component_id = len(component_rows) + 1
+        component_rows.append((component_id, comp_name, comp_data.get('relative_path', ''),
+                               int(comp_data.get('has_styles', False))))
+        at_rules = comp_data.get('at_rules', {})
+        for selector, properties in comp_data.get('css_rules', {}).items():
+            selector_id = len(selector_rows) + 1
+            selector_rows.append((selector_id, component_id, selector, ' '.join(at_rules.get(selector, []))))
+            for prop_name, prop_value in properties.items():
+                declaration_id = len(declaration_rows) + 1
+                numeric_value, unit = parse_numeric(prop_value)
+                declaration_rows.append((declaration_id, component_id, selector_id,
+                                         prop_name, prop_value, numeric_value, unit))
+                if 'var(' in prop_value:
+                    for token in VAR_REFERENCE.findall(prop_value):
+                        var_rows.append((declaration_id, component_id, token.strip()))
+
+    # Autocommit mode with an explicit BEGIN: the sqlite3 module does not open a transaction
+    # for DROP/CREATE, so a failed rebuild would otherwise leave the old tables dropped
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        connection.execute("BEGIN")
+        try:
+            for table in ('var_refs', 'declarations', 'selectors', 'components'):
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in SCHEMA_STATEMENTS:
+                connection.execute(statement)
+            connection.executemany("INSERT INTO components VALUES (?, ?, ?, ?)", component_rows)
+            connection.executemany("INSERT INTO selectors VALUES (?, ?, ?, ?)", selector_rows)
+            connection.executemany("INSERT INTO declarations VALUES (?, ?, ?, ?, ?, ?, ?)", declaration_rows)
+            connection.executemany("INSERT INTO var_refs VALUES (?, ?, ?)", var_rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+
+    return {
+        'components': len(component_rows),
+        'selectors': len(selector_rows),
+        'declarations': len(declaration_rows),
+        'var_refs': len(var_rows)
+    }
+
+class CSSIndexDB:
+    """Index-backed lookups over a database written by build_database"""
+
+    def __init__(self, db_path: str):
+        # Quoted so '?' or '#' in the path are not read as URI query or fragment
+        self.connection = sqlite3.connect(f"file:{quote(db_path)}?mode=ro", uri=True)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'CSSIndexDB':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def property_usages(self, property_name: str,
+                        comparisons: Optional[Dict[str, float]] = None) -> List[Tuple[str, str, str]]:
+        """(component, selector, value) for every declaration of a property
+
+        comparisons maps 'gt', 'ge', 'lt', 'le' or 'eq' to a number; only
+        declarations whose numeric value passes every test are returned,
+        e.g. {'gt': 1, 'lt': 100}.
+        """
+        sql = """
+            SELECT c.name, s.selector, d.value
+            FROM declarations d
+            JOIN selectors s ON s.id = d.selector_id
+            JOIN components c ON c.id = d.component_id
+            WHERE d.property = ?
+        """
+        params: List[Any] = [property_name]
+        for comparison, number in (comparisons or {}).items():
+            sql += f" AND d.numeric_value {COMPARISONS[comparison]} ?"
+            params.append(number)
+        return self.connection.execute(sql + " ORDER BY c.name, s.id", params).fetchall()
+
+    def token_usages(self, token: str) -> List[Tuple[str, str, str, str]]:
+        """(component, selector, property, value) for every declaration referencing var(token)"""
+        return self.connection.execute("""
+            SELECT c.name, s.selector, d.property, d.value
+            FROM var_refs v
+            JOIN declarations d ON d.id = v.declaration_id
+            JOIN selectors s ON s.id = d.selector_id
+            JOIN components c ON c.id = v.component_id
+            WHERE v.token = ?
+            ORDER BY c.name, d.id
+        """, (token,)).fetchall()
+
+    def component_declarations(self, component_name: str) -> List[Tuple[str, str, str]]:
+        """(selector, property, value) for every declaration of a component"""
+        return self.connection.execute("""
+            SELECT s.selector, d.property, d.value
+            FROM components c
+            JOIN declarations d ON d.component_id = c.id
+            JOIN selectors s ON s.id = d.selector_id
+            WHERE c.name = ?
+            ORDER BY d.id
+        """, (component_name,)).fetchall()
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        """Run an arbitrary read-only query"""
+        return self.connection.execute(sql, tuple(params)).fetchall()
+
+def print_rows(rows: List[Tuple[Any, ...]]) -> None:
+    for row in rows:
+        print(" | ".join(str(value) for value in row))
+    print(f"({len(rows)} rows)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a SQLite index of extracted CSS")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build the index from extraction results")
+    build.add_argument('results', help="Results from css_extractor.py (.json or .jsonl)")
+    build.add_argument('db', help="SQLite database to (re)create")
+
+    prop = commands.add_parser('property', help="Declarations of a property")
+    prop.add_argument('db')
+    prop.add_argument('name', help="e.g. z-index")
+    for key in COMPARISONS:
+        prop.add_argument(f'--{key}', type=float, metavar='N',
+                          help=f"numeric value {COMPARISONS[key]} N (tests combine with AND)")
+
+    token = commands.add_parser('token', help="Declarations referencing var(--token)")
+    token.add_argument('db')
+    token.add_argument('name', help="e.g. fg-primary (the leading -- is optional)")
+
+    component = commands.add_parser('component', help="Declarations of a component")
+    component.add_argument('db')
+    component.add_argument('name')
+
+    sql = commands.add_parser('sql', help="Run a read-only SQL query")
+    sql.add_argument('db')
+    sql.add_argument('statement')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        counts = build_database(load_results(args.results)['components'].items(), args.db)
+        print(f"Index written to {args.db}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+        return
+
+    with CSSIndexDB(args.db) as db:
+        if args.command == 'property':
+            comparisons = {key: getattr(args, key) for key in COMPARISONS if getattr(args, key) is not None}
+            print_rows(db.property_usages(args.name, comparisons))
+        elif args.command == 'token':
+            print_rows(db.token_usages('--' + args.name.lstrip('-')))
+        elif args.command == 'component':
+            print_rows(db.component_declarations(args.name))
+        else:
+            print_rows(db.query(args.statement))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Opt-in instrumentation for the extractor, CSV and summary scripts.
+Records wall/CPU time and peak memory per phase and per parsed file, counts
+pattern matches per file, reports the slowest files and the biggest style
+blocks, and can dump cProfile stats and a tracemalloc snapshot. When it is
+off, the scripts hold NO_INSTRUMENTATION, whose phases are a shared
+nullcontext and whose files are never wrapped.
+"""
+
+import argparse
+import cProfile
+import contextlib
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # POSIX only: without it (Windows) max RSS is reported as unavailable
+    resource = None
+
+DEFAULT_TOP_N = 10
+
+class PhaseStats(NamedTuple):
+    name: str
+    wall: float
+    cpu: float
+    # Traced heap peak with tracemalloc on, otherwise the process max RSS so far (None if unavailable)
+    peak_bytes: Optional[int]
+
+class FileStats(NamedTuple):
+    path: str
+    wall: float
+    cpu: float
+    peak_bytes: Optional[int]
+    file_bytes: int
+    style_bytes: int
+    style_blocks: int
+    css_tokens: int
+    var_refs: int
+    rules: int
+
+def max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+class NullInstrumentation:
+    """Instrumentation that records nothing"""
+    enabled = False
+    _null_phase = contextlib.nullcontext()
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        return self._null_phase
+
+    def timed_iter(self, name: str, iterable: Iterable[Any]) -> Iterable[Any]:
+        return iterable
+
+    def start(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+NO_INSTRUMENTATION = NullInstrumentation()
+
+class Instrumentation:
+    enabled = True
+
+    def __init__(self, top_n: int = DEFAULT_TOP_N, trace_memory: bool = False,
+                 profile_path: Optional[str] = None, snapshot_path: Optional[str] = None):
+        self.top_n = top_n
+        self.trace_memory = trace_memory or snapshot_path is not None
+        self.profile_path = profile_path
+        self.snapshot_path = snapshot_path
+        self.phases: List[PhaseStats] = []
+        self.files: List[FileStats] = []
+        self._profiler: Optional[cProfile.Profile] = None
+        # Traced peak of the current phase from before a per-file reset_peak()
+        self._carried_peak = 0
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def finish(self) -> None:
+        """Stop profiling, write the dumps and print the report"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            print(f"cProfile stats written to {self.profile_path}")
+        if self.snapshot_path and tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(self.snapshot_path)
+            print(f"tracemalloc snapshot written to {self.snapshot_path}")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.print_report()
+
+    def _peak(self) -> Optional[int]:
+        if tracemalloc.is_tracing():
+            return max(tracemalloc.get_traced_memory()[1], self._carried_peak)
+        return max_rss_bytes()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time a phase; phases may nest (the outer peak then includes the inner one)"""
+        outer_peak = self._peak() if tracemalloc.is_tracing() else 0
+        self._carried_peak = 0
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            peak = self._peak()
+            self.phases.append(PhaseStats(name, time.perf_counter() - wall, time.process_time() - cpu, peak))
+            self._carried_peak = max(outer_peak, peak or 0)
+
+    def timed_iter(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Pass items through, recording the time spent producing them as a phase"""
+        wall = cpu = 0.0
+        iterator = iter(iterable)
+        while True:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                wall += time.perf_counter() - wall_start
+                cpu += time.process_time() - cpu_start
+            yield item
+        self.phases.append(PhaseStats(name, wall, cpu, self._peak()))
+
+    def time_file(self, extract: Callable[[Path], Tuple[Dict[str, Any], Any]], file_path: Path,
+                  parse_stats: Optional[Dict[str, int]] = None) -> Tuple[Dict[str, Any], Any]:
+        """Run extract(file_path) and record its timings and match counts
+
+        parse_stats is the dict the parser adds its token and var() counts to
+        while extract runs; it is cleared before each file.
+        """
+        if parse_stats is None:
+            parse_stats = {}
+        parse_stats.clear()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            self._carried_peak = max(self._carried_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = extract(file_path)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = tracemalloc.get_traced_memory()[1] if tracing else None
+        self.files.append(self._file_stats(file_path, result[0], parse_stats, wall, cpu, peak))
+        return result
+
+    def _file_stats(self, file_path: Path, component_data: Dict[str, Any], parse_stats: Dict[str, int],
+                    wall: float, cpu: float, peak: Optional[int]) -> FileStats:
+        try:
+            file_bytes = file_path.stat().st_size
+        except OSError:
+            file_bytes = 0
+        return FileStats(
+            str(file_path), wall, cpu, peak,
+            file_bytes,
+            sum(block['length'] for block in component_data.get('style_blocks', ())),
+            len(component_data.get('style_blocks', ())),
+            parse_stats.get('tokens', 0),
+            parse_stats.get('var_refs', 0),
+            len(component_data.get('css_rules', {}))
+        )
+
+    def print_report(self) -> None:
+        print(f"\n=== INSTRUMENTATION ===")
+        memory_label = "traced peak" if self.trace_memory else "max RSS"
+        for stats in self.phases:
+            memory = f"{stats.peak_bytes / 1e6:8.1f} MB" if stats.peak_bytes is not None else "     n/a"
+            print(f"{stats.name:<12} wall {stats.wall:8.3f}s  cpu {stats.cpu:8.3f}s  {memory_label} {memory}")
+        if not self.files:
+            return
+
+        total_wall = sum(f.wall for f in self.files)
+        print(f"\nParsed {len(self.files)} files in {total_wall:.3f}s "
+              f"({total_wall / len(self.files) * 1000:.2f} ms/file)")
+        print(f"\nSlowest {self.top_n} files:")
+        for stats in sorted(self.files, key=lambda f: f.wall, reverse=True)[:self.top_n]:
+            memory = f", peak {stats.peak_bytes / 1e3:.0f} kB" if stats.peak_bytes is not None else ""
+            print(f"  {stats.wall * 1000:8.2f} ms (cpu {stats.cpu * 1000:.2f} ms{memory})  {stats.path}  "
+                  f"[{stats.style_blocks} style block(s), {stats.css_tokens} tokens, "
+                  f"{stats.var_refs} var(), {stats.rules} rules]")
+        print(f"\nBiggest {self.top_n} style blocks:")
+        for stats in sorted(self.files, key=lambda f: f.style_bytes, reverse=True)[:self.top_n]:
+            print(f"  {stats.style_bytes / 1e3:8.1f} kB  {stats.path}  ({stats.rules} rules)")
+
+def add_instrumentation_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument('--instrument', action='store_true',
+                       help="Report wall/CPU time and memory per phase and per file")
+    group.add_argument('--slowest', type=int, default=DEFAULT_TOP_N, metavar='N',
+                       help=f"Files listed in the slowest/biggest reports (default: {DEFAULT_TOP_N})")
+    group.add_argument('--trace-memory', action='store_true',
+                       help="Measure peaks with tracemalloc instead of max RSS (slower; implies --instrument)")
+    group.add_argument('--cprofile', metavar='PATH',
+                       help="Dump cProfile stats for the whole run (implies --instrument)")
+    group.add_argument('--tracemalloc', metavar='PATH',
+                       help="Dump a tracemalloc snapshot at the end of the run (implies --instrument)")
+
+def instrumentation_from_args(args: argparse.Namespace):
+    """Instrumentation for the parsed arguments, or NO_INSTRUMENTATION when not requested"""
+    if not (args.instrument or args.trace_memory or args.cprofile or args.tracemalloc):
+        return NO_INSTRUMENTATION
+    return Instrumentation(top_n=args.slowest, trace_memory=args.trace_memory,
+                           profile_path=args.cprofile, snapshot_path=args.tracemalloc)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Markup index for Svelte components and unused selector detection.
+The bytes outside the style blocks are scanned once for element names,
+class and id attributes and class: directives; each extracted selector is
+then checked against the resulting sets, so the cost is linear in the file
+size plus the number of selectors.
+
+Class names that can only be known at runtime (class="btn {variant}",
+class={...}, spreads, strings in <script>) are tracked as candidate words and
+prefixes; a selector is only reported when no element, class or id it needs
+could possibly be present. <script> contents are only scanned for strings
+once a class or id is not found in the markup itself, so components whose
+selectors all match static markup never pay for large script literals.
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Set
+
+from css_parser import split_selector_list
+from css_patterns import (MARKUP_TOKEN, MARKUP_WORD, SCRIPT_STRING, SELECTOR_FUNCTIONAL_PSEUDO,
+                          SELECTOR_IGNORED, SELECTOR_SIMPLE)
+
+# Selectors inside these at-rules are not matched against elements
+NON_SELECTOR_AT_RULES = ('@keyframes', '@-webkit-keyframes', '@-moz-keyframes', '@font-face', '@page')
+
+class MarkupIndex:
+    __slots__ = ('elements', 'classes', 'ids', 'candidates', 'class_prefixes', 'dynamic_elements', 'scripts',
+                 '_prefix_pattern')
+
+    def __init__(self):
+        self.elements: Set[str] = set()
+        self.classes: Set[str] = set()
+        self.ids: Set[str] = set()
+        # Words from expressions and <script> strings that may end up in class or id attributes
+        self.candidates: Set[str] = set()
+        # Static text directly before an expression, e.g. 'btn-' in class="btn-{size}"
+        self.class_prefixes: Set[str] = set()
+        # <svelte:element this={...}> can render any element
+        self.dynamic_elements = False
+        # <script> contents not yet scanned for string candidates
+        self.scripts: List[bytes] = []
+        # class_prefixes as one alternation, compiled on the first prefix lookup
+        self._prefix_pattern: Optional[Pattern[str]] = None
+
+    def has_class(self, name: str) -> bool:
+        if name in self.classes or self._has_candidate(name):
+            return True
+        if self.scripts:
+            self._scan_scripts()
+            return self._has_candidate(name)
+        return False
+
+    def has_id(self, name: str) -> bool:
+        if name in self.ids or name in self.candidates:
+            return True
+        if self.scripts:
+            self._scan_scripts()
+            return name in self.candidates
+        return False
+
+    def has_element(self, name: str) -> bool:
+        return self.dynamic_elements or name in self.elements
+
+    def _has_candidate(self, name: str) -> bool:
+        if name in self.candidates:
+            return True
+        if not self.class_prefixes:
+            return False
+        if self._prefix_pattern is None:
+            self._prefix_pattern = re.compile('|'.join(map(re.escape, self.class_prefixes)))
+        return self._prefix_pattern.match(name) is not None
+
+    def _scan_scripts(self) -> None:
+        scripts, self.scripts = self.scripts, []
+        for script in scripts:
+            for string in SCRIPT_STRING.findall(script):
+                self._add_candidates(string)
+
+    def _add_attribute(self, names: Set[str], value: bytes) -> None:
+        """Split an attribute value into static names and {expression} candidates"""
+        pos = 0
+        while True:
+            open_brace = value.find(b'{', pos)
+            static = value[pos:] if open_brace < 0 else value[pos:open_brace]
+            words = static.decode('utf-8', 'replace').split()
+            names.update(words)
+            if open_brace < 0:
+                return
+            if words and not static[-1:].isspace():
+                # The last word continues into the expression: a prefix, not a full name
+                names.discard(words[-1])
+                self._add_prefix(words[-1])
+            close_brace = value.find(b'}', open_brace)
+            close_brace = len(value) if close_brace < 0 else close_brace
+            self._add_candidates(value[open_brace:close_brace])
+            pos = close_brace + 1
+
+    def _add_candidates(self, expression: bytes) -> None:
+        for word in set(MARKUP_WORD.findall(expression)):
+            word = word.decode('utf-8', 'replace')
+            if word[-1] in '-_':
+                # 'avatar-' in `avatar-${size}` or 'avatar-' + size
+                self._add_prefix(word)
+            else:
+                self.candidates.add(word)
+
+    def _add_prefix(self, prefix: str) -> None:
+        if prefix not in self.class_prefixes:
+            self.class_prefixes.add(prefix)
+            self._prefix_pattern = None
+
+def index_markup(data, blocks) -> MarkupIndex:
+    """Index the bytes (or mmap) of a component outside the given style blocks"""
+    index = MarkupIndex()
+    pos = 0
+    for block in blocks:
+        _scan(index, data, pos, block.start)
+        pos = block.end
+    _scan(index, data, pos, len(data))
+    return index
+
+def _scan(index: MarkupIndex, data, start: int, end: int) -> None:
+    for match in MARKUP_TOKEN.finditer(data, start, end):
+        script, directive, attribute, quoted, single_quoted, expression, tag, spread = match.groups()
+        if script is not None:
+            index.scripts.append(script)
+        elif directive is not None:
+            index.classes.add(directive.decode('utf-8', 'replace'))
+        elif attribute is not None:
+            names = index.classes if attribute == b'class' else index.ids
+            if expression is not None:
+                index._add_candidates(expression)
+            else:
+                index._add_attribute(names, quoted if quoted is not None else single_quoted)
+        elif tag is not None:
+            if tag == b'svelte:element':
+                index.dynamic_elements = True
+            elif tag[:1].islower() and b':' not in tag and b'.' not in tag:
+                # Capitalised and dotted tags are components, svelte:* tags are special elements
+                index.elements.add(tag.decode('utf-8', 'replace').lower())
+        elif spread is not None:
+            index._add_candidates(spread)
+
+def selector_can_match(selector: str, index: MarkupIndex) -> bool:
+    """Whether one complex selector (no commas) could match the indexed markup"""
+    global_at = selector.find(':global')
+    if global_at >= 0:
+        # :global(...) and everything after a bare :global is outside the component's scope
+        selector = selector[:global_at]
+    selector = SELECTOR_IGNORED.sub(' ', SELECTOR_FUNCTIONAL_PSEUDO.sub('', selector))
+    for kind, name in SELECTOR_SIMPLE.findall(selector):
+        name = name.replace('\\', '')
+        if kind == '.':
+            if not index.has_class(name):
+                return False
+        elif kind == '#':
+            if not index.has_id(name):
+                return False
+        elif name != '*' and not index.has_element(name.lower()):
+            return False
+    return True
+
+def find_unused_selectors(css_rules: Dict[str, Dict[str, str]], index: MarkupIndex,
+                          at_rules: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Selectors of css_rules that cannot match any element of the component
+
+    Each complex selector of a selector list is checked on its own and
+    reported with the at-rule context of its rule, like the css_rules keys.
+    """
+    unused = []
+    for key in css_rules:
+        chain = at_rules.get(key) if at_rules else None
+        if chain:
+            if chain[-1].startswith(NON_SELECTOR_AT_RULES):
+                continue
+            prefix = ' '.join(chain)
+            selector = key[len(prefix) + 1:]
+        else:
+            prefix = ''
+            selector = key
+        if selector.startswith('@'):
+            # Declarations directly inside an at-rule, e.g. @font-face
+            continue
+        for part in split_selector_list(selector):
+            if not selector_can_match(part, index):
+                unused.append(f"{prefix} {part}" if prefix else part)
+    return unused
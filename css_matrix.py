@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Sparse property x component index used to produce the two matrix CSV views.
+Only populated cells are stored, once, in compressed-row (by component) and
+compressed-column (by property) form; dense rows are streamed on demand.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+def component_property_values(css_rules: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+    """Collect each property's "selector: value" entries for one component, joined with a pipe"""
+    values = {}
+    for selector, properties in css_rules.items():
+        for prop_name, prop_value in properties.items():
+            if prop_name in values:
+                values[prop_name] += f" | {selector}: {prop_value}"
+            else:
+                values[prop_name] = f"{selector}: {prop_value}"
+    return values
+
+class SparsePropertyIndex:
+    def __init__(self, properties: Iterable[str],
+                 components: Iterable[Tuple[str, Optional[Dict[str, Dict[str, str]]]]]):
+        """Build the index from all property names and (name, css_rules) pairs
+
+        css_rules is None for components without styles; they keep a column in
+        the property view but get no row in the component view.
+        """
+        self.properties: List[str] = sorted(properties)
+        self.property_ids: Dict[str, int] = {prop: i for i, prop in enumerate(self.properties)}
+        self.components: List[str] = []
+        self.styled: List[bool] = []
+
+        # CSR: cells of component c are row_cols/row_values[row_ptr[c]:row_ptr[c + 1]]
+        self.row_ptr = array('l', [0])
+        self.row_cols = array('l')
+        self.row_values: List[str] = []
+
+        property_ids = self.property_ids
+        for name, css_rules in components:
+            self.components.append(name)
+            self.styled.append(css_rules is not None)
+            if css_rules:
+                cells = component_property_values(css_rules)
+                prop_ids = sorted(property_ids[p] for p in cells)
+                self.row_cols.extend(prop_ids)
+                self.row_values.extend(cells[self.properties[i]] for i in prop_ids)
+            self.row_ptr.append(len(self.row_cols))
+
+        self._build_columns()
+
+    def _build_columns(self) -> None:
+        """Derive the CSC view from the CSR view with a counting sort"""
+        counts = array('l', [0]) * (len(self.properties) + 1)
+        for prop_id in self.row_cols:
+            counts[prop_id + 1] += 1
+        for i in range(len(self.properties)):
+            counts[i + 1] += counts[i]
+        self.col_ptr = array('l', counts)
+
+        nnz = len(self.row_cols)
+        self.col_rows = array('l', [0]) * nnz
+        self.col_values: List[str] = [""] * nnz
+        cursor = counts.tolist()[:-1]
+        col_rows, col_values = self.col_rows, self.col_values
+        row_cols, row_values, row_ptr = self.row_cols, self.row_values, self.row_ptr
+        for comp_id in range(len(self.components)):
+            for k in range(row_ptr[comp_id], row_ptr[comp_id + 1]):
+                prop_id = row_cols[k]
+                slot = cursor[prop_id]
+                col_rows[slot] = comp_id
+                col_values[slot] = row_values[k]
+                cursor[prop_id] = slot + 1
+
+    @property
+    def nnz(self) -> int:
+        """Number of populated cells"""
+        return len(self.row_cols)
+
+    def component_cells(self, comp_id: int) -> Iterator[Tuple[str, str]]:
+        for k in range(self.row_ptr[comp_id], self.row_ptr[comp_id + 1]):
+            yield self.properties[self.row_cols[k]], self.row_values[k]
+
+    def property_cells(self, prop_id: int) -> Iterator[Tuple[str, str]]:
+        for k in range(self.col_ptr[prop_id], self.col_ptr[prop_id + 1]):
+            yield self.components[self.col_rows[k]], self.col_values[k]
+
+    def property_headers(self) -> List[str]:
+        return ['CSS Property'] + self.components
+
+    def component_headers(self) -> List[str]:
+        return ['Component'] + self.properties
+
+    def iter_property_rows(self) -> Iterator[List[str]]:
+        """Properties as rows, every component as a column"""
+        width = len(self.components)
+        for prop_id, prop in enumerate(self.properties):
+            row = [prop] + [""] * width
+            for k in range(self.col_ptr[prop_id], self.col_ptr[prop_id + 1]):
+                row[self.col_rows[k] + 1] = self.col_values[k]
+            yield row
+
+    def iter_component_rows(self) -> Iterator[List[str]]:
+        """Styled components as rows in name order, every property as a column"""
+        for comp_id in sorted(range(len(self.components)), key=self.components.__getitem__):
+            if not self.styled[comp_id]:
+                continue
+            row = [self.components[comp_id]] + [""] * len(self.properties)
+            for k in range(self.row_ptr[comp_id], self.row_ptr[comp_id + 1]):
+                row[self.row_cols[k] + 1] = self.row_values[k]
+            yield row
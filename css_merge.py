@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Merge partial results written by `css_extractor.py --shard i/N`.
+With --output the partials are reduced to one partial (streaming, so merges
+can be chained across nodes); otherwise the merged components feed the same
+pipeline as a single extraction to write the JSON, CSVs and summary.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from css_extractor import SvelteCSSExtractor
+from css_pipeline import run_pipeline
+from css_shard import PartialMergeError, is_complete, load_partials, merge_partials
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge sharded CSS extraction partials")
+    parser.add_argument('partials', nargs='+', help="Partial .jsonl results from css_extractor.py --shard")
+    parser.add_argument('--output', help="Write the merged partial here instead of the final outputs")
+    parser.add_argument('--json', help="Write the merged results (json or snapshot, see --format)")
+    parser.add_argument('--format', choices=('json', 'snapshot'), default='json')
+    parser.add_argument('--csv-dir', help="Write the six CSV files here")
+    parser.add_argument('--summary', help="Write the Markdown summary report to this file")
+    parser.add_argument('--allow-incomplete', action='store_true',
+                        help="Build final outputs even if some shards are missing")
+    args = parser.parse_args()
+    if not (args.output or args.json or args.csv_dir or args.summary):
+        parser.error("nothing to write: give --output, --json, --csv-dir or --summary")
+
+    try:
+        if args.output:
+            merge_partials(args.partials, args.output)
+            return
+        extractor = SvelteCSSExtractor('.')
+        header = load_partials(extractor, args.partials)
+    except PartialMergeError as e:
+        sys.exit(f"Error: {e}")
+
+    if not is_complete(header):
+        missing = sorted(set(range(1, header['shard_count'] + 1)) - set(header['shards']))
+        message = f"missing shards {', '.join(map(str, missing))} of {header['shard_count']}"
+        if not args.allow_incomplete:
+            sys.exit(f"Error: {message} (use --allow-incomplete to merge anyway)")
+        print(f"Warning: {message}")
+
+    extractor.base_path = Path(header['base_path'])
+    run_pipeline(extractor, csv_dir=args.csv_dir, summary_file=args.summary,
+                 json_path=args.json, output_format=args.format)
+
+if __name__ == "__main__":
+    main()
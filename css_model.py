@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory model for extracted components.
+Components, rule sets and declaration lists are slotted, read-only Mapping
+types backed by tuples, with property names and values interned, so
+thousands of rules repeating "display: flex" share the same string objects
+and no per-rule dict is kept. They read exactly like the dicts returned by
+earlier versions (comp['css_rules'][selector][prop], .get(), .items()), and
+json_default() serialises them to identical JSON.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_intern = sys.intern
+
+class Declarations(Mapping):
+    """Property -> value pairs of one rule, stored as a flat (prop, value, prop, value, ...) tuple
+
+    Rules hold a handful of properties and rarely share the same name
+    sequence, so a per-rule or shared name -> position dict costs more memory
+    than it saves; lookups search the tuple in C instead (about 0.1-0.2 us up
+    to 8 properties, see benchmarks/bench_memory_model.py --lookups).
+    """
+    __slots__ = ('_flat',)
+
+    def __init__(self, properties: Dict[str, str]):
+        flat = []
+        for prop_name, prop_value in properties.items():
+            flat.append(_intern(prop_name))
+            flat.append(_intern(prop_value))
+        self._flat: Tuple[str, ...] = tuple(flat)
+
+    def __getitem__(self, prop_name: str) -> str:
+        flat = self._flat
+        start = 0
+        try:
+            while True:
+                i = flat.index(prop_name, start)
+                if not i & 1:
+                    return flat[i + 1]
+                # A value equal to the name, e.g. 'transition-property: opacity'
+                start = i + 1
+        except ValueError:
+            raise KeyError(prop_name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._flat[::2])
+
+    def __len__(self) -> int:
+        return len(self._flat) // 2
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        flat = self._flat
+        return zip(flat[::2], flat[1::2])
+
+    def values(self) -> Iterator[str]:
+        return iter(self._flat[1::2])
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+def _restore_rule_set(selectors: Tuple[str, ...], declarations: Tuple[Declarations, ...]) -> 'RuleSet':
+    rule_set = RuleSet.__new__(RuleSet)
+    rule_set._selectors = selectors
+    rule_set._declarations = declarations
+    rule_set._positions = None
+    return rule_set
+
+class RuleSet(Mapping):
+    """Selector -> Declarations of one component, in source order
+
+    The selector -> position dict is built on the first lookup, so runs that
+    only iterate (aggregates, CSV and JSON output) never allocate it.
+    """
+    __slots__ = ('_selectors', '_declarations', '_positions')
+
+    def __init__(self, css_rules: Dict[str, Dict[str, str]]):
+        self._selectors: Tuple[str, ...] = tuple(_intern(selector) for selector in css_rules)
+        self._declarations: Tuple[Declarations, ...] = tuple(Declarations(p) for p in css_rules.values())
+        self._positions: Optional[Dict[str, int]] = None
+
+    def __reduce__(self):
+        return _restore_rule_set, (self._selectors, self._declarations)
+
+    def _position_map(self) -> Dict[str, int]:
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = {selector: i for i, selector in enumerate(self._selectors)}
+        return positions
+
+    def __getitem__(self, selector: str) -> Declarations:
+        return self._declarations[self._position_map()[selector]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._selectors)
+
+    def __len__(self) -> int:
+        return len(self._selectors)
+
+    def __contains__(self, selector: object) -> bool:
+        return selector in self._position_map()
+
+    def items(self) -> Iterator[Tuple[str, Declarations]]:
+        return zip(self._selectors, self._declarations)
+
+    def values(self) -> Iterator[Declarations]:
+        return iter(self._declarations)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+class ComponentRecord(Mapping):
+    """One extract_component_css result
+
+    Keys appear in the same order, and only when set, as in the dict form:
+    file_path, relative_path, component_name, has_styles, css_rules, then
+    at_rules, style_blocks, unused_selectors, cascade_conflicts and raw_css
+    for styled components (the at_rules and report keys only when
+    non-empty), or error. An
+    unset optional field is None (a plain sentinel, so records pickle).
+    """
+    __slots__ = ('file_path', 'relative_path', 'component_name', 'has_styles', 'css_rules',
+                 'at_rules', 'style_blocks', 'unused_selectors', 'cascade_conflicts', 'raw_css', 'error')
+
+    def __init__(self, file_path: str, relative_path: str, component_name: str, has_styles: bool,
+                 css_rules: RuleSet, at_rules: Optional[Dict[str, List[str]]] = None,
+                 style_blocks: Optional[List[Dict[str, Any]]] = None,
+                 unused_selectors: Optional[List[str]] = None,
+                 cascade_conflicts: Optional[List[Dict[str, Any]]] = None, raw_css: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.file_path = file_path
+        self.relative_path = relative_path
+        self.component_name = component_name
+        self.has_styles = has_styles
+        self.css_rules = css_rules
+        self.at_rules = at_rules
+        self.style_blocks = style_blocks
+        self.unused_selectors = unused_selectors
+        self.cascade_conflicts = cascade_conflicts
+        self.raw_css = raw_css
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, component_data: Dict[str, Any], keep_raw_css: bool = True) -> 'ComponentRecord':
+        at_rules = component_data.get('at_rules')
+        if at_rules is not None:
+            at_rules = {_intern(key): [_intern(a) for a in chain] for key, chain in at_rules.items()}
+        return cls(
+            component_data['file_path'],
+            component_data['relative_path'],
+            component_data['component_name'],
+            component_data['has_styles'],
+            RuleSet(component_data['css_rules']),
+            at_rules,
+            component_data.get('style_blocks'),
+            component_data.get('unused_selectors'),
+            component_data.get('cascade_conflicts'),
+            component_data.get('raw_css') if keep_raw_css else None,
+            component_data.get('error'),
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.__slots__:
+            if getattr(self, key) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+def json_default(value: Any) -> Any:
+    """json.dump(..., default=json_default) support for the compact model"""
+    if isinstance(value, Mapping):
+        return dict(value.items())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
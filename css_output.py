@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Output layer for the CSV and JSON exports.
+Files are written through large buffers, optionally gzip-compressed; CSV
+rows go to csv.writer.writerows in batches rather than one call per row,
+and independent CSV files can be written concurrently on a thread pool
+(compression and file I/O release the GIL).
+"""
+
+import csv
+import gzip
+import io
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, TextIO
+
+from css_model import json_default
+
+GZIP_SUFFIX = '.gz'
+GZIP_MAGIC = b'\x1f\x8b'
+# Level 6 is zlib's usual trade-off; 9 costs far more time for a few percent
+GZIP_LEVEL = 6
+OUTPUT_BUFFER_SIZE = 1 << 20
+# Rows collected before each writerows call, and JSON chunks before each write
+ROW_BATCH = 4096
+JSON_CHUNK_BATCH = 8192
+
+def output_path(path: Path, compress: bool = False) -> Path:
+    """The path actually written: compressed outputs get a .gz suffix"""
+    path = Path(path)
+    if compress and path.suffix != GZIP_SUFFIX:
+        return path.with_name(path.name + GZIP_SUFFIX)
+    return path
+
+def open_output(path: Path, compress: bool = False) -> TextIO:
+    """Open a UTF-8 text file for writing (newline='' for csv), gzip-compressed if asked"""
+    raw = open(path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+    if not compress:
+        return io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    # mtime=0 keeps compressed outputs byte-identical between runs
+    binary = gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0)
+    return _ClosingTextWrapper(binary, raw)
+
+class _ClosingTextWrapper(io.TextIOWrapper):
+    """Text wrapper over a GzipFile that also closes the underlying file"""
+
+    def __init__(self, binary: gzip.GzipFile, raw):
+        super().__init__(binary, encoding='utf-8', newline='')
+        self._raw = raw
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+def open_input(path: str) -> TextIO:
+    """Open a UTF-8 text file for reading, transparently decompressing gzip"""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+class BatchedRowWriter:
+    """csv.writer that hands rows to writerows in batches of ROW_BATCH"""
+
+    def __init__(self, f: TextIO, batch: int = ROW_BATCH):
+        self.writer = csv.writer(f)
+        self.batch = batch
+        self.pending: List[Iterable[Any]] = []
+
+    def writerow(self, row: Iterable[Any]) -> None:
+        self.pending.append(row)
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.writer.writerows(self.pending)
+            self.pending = []
+
+def write_rows(csv_path: Path, headers: List[str], rows: Iterable[List[Any]], compress: bool = False) -> Path:
+    """Write a CSV file in one writerows pass; returns the path written"""
+    csv_path = output_path(csv_path, compress)
+    with open_output(csv_path, compress) as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    return csv_path
+
+def write_json(path: Path, document: Any, compress: bool = False) -> Path:
+    """Write an indent-2 JSON document (as json.dump would) in batched chunks"""
+    path = output_path(path, compress)
+    encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=json_default)
+    with open_output(path, compress) as f:
+        chunks: List[str] = []
+        for chunk in encoder.iterencode(document):
+            chunks.append(chunk)
+            if len(chunks) >= JSON_CHUNK_BATCH:
+                f.write(''.join(chunks))
+                chunks = []
+        f.write(''.join(chunks))
+    return path
+
+class OutputWriterPool:
+    """Runs independent file writers on threads, or inline with workers=1"""
+
+    def __init__(self, workers: int = 1):
+        self.executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(workers) if workers > 1 else None
+        self.futures: List[Future] = []
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> None:
+        if self.executor is None:
+            func(*args, **kwargs)
+        else:
+            self.futures.append(self.executor.submit(func, *args, **kwargs))
+
+    def wait(self) -> None:
+        """Wait for every submitted writer, re-raising the first failure"""
+        if self.executor is None:
+            return
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.executor.shutdown()
+
+    def __enter__(self) -> 'OutputWriterPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wait()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Single-pass CSS parser for Svelte style blocks.
+Walks the stylesheet once, jumping between structurally significant characters,
+and understands comments, strings, parentheses, at-rules (@media, @supports,
+@keyframes, ...) and nested rules (CSS nesting, Svelte's :global { } blocks).
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from css_patterns import CSS_PAREN_SIGNIFICANT, CSS_SIGNIFICANT, CSS_STRINGS
+
+class CSSRule(NamedTuple):
+    selector: str
+    at_rules: Tuple[str, ...]
+    declarations: List[Tuple[str, str]]
+
+    @property
+    def key(self) -> str:
+        """Selector prefixed with its at-rule context, e.g. '@media (max-width: 600px) .card'"""
+        if self.at_rules:
+            return ' '.join(self.at_rules + (self.selector,))
+        return self.selector
+
+class _Block:
+    __slots__ = ('selector', 'at_rules', 'declarations', 'slot')
+
+    def __init__(self, selector: Optional[str], at_rules: Tuple[str, ...], slot: int):
+        self.selector = selector
+        self.at_rules = at_rules
+        self.declarations: List[Tuple[str, str]] = []
+        # Position reserved in the output so rules come out in source order of their opening brace
+        self.slot = slot
+
+def split_selector_list(selector: str) -> List[str]:
+    """Split a selector list on commas that are not inside parentheses or brackets"""
+    if ',' not in selector:
+        selector = selector.strip()
+        return [selector] if selector else []
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(selector):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(0, depth - 1)
+        elif char == ',' and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return [p for p in parts if p]
+
+def resolve_nested_selector(parent: Optional[str], selector: str) -> str:
+    """Combine a nested selector with its parent, honouring the & nesting selector"""
+    if parent is None:
+        return selector
+    combined = []
+    for parent_part in split_selector_list(parent):
+        for part in split_selector_list(selector):
+            if '&' in part:
+                combined.append(part.replace('&', parent_part))
+            else:
+                combined.append(f"{parent_part} {part}")
+    return ', '.join(combined)
+
+def parse_stylesheet(css: str, stats: Optional[Dict[str, int]] = None) -> List[CSSRule]:
+    """Parse a stylesheet into rules (in source order) in a single linear pass
+
+    Pass a dict as stats to have the significant tokens the pass visited
+    ('tokens') and the var() references in its declarations ('var_refs')
+    added to it.
+    """
+    slots: List[Optional[CSSRule]] = []
+    stack: List[_Block] = []
+
+    chunks: List[str] = []   # text of the current segment, comments removed
+    chunks_len = 0
+    seg_pos = 0              # start of the not-yet-copied part of the segment
+    colon_at = -1            # first top-level ':' in the segment, relative to its text
+    paren_depth = 0
+    pos = 0
+    length = len(css)
+    tokens = 0
+
+    def take_segment(end: int) -> Tuple[str, int]:
+        nonlocal chunks, chunks_len, colon_at
+        if chunks:
+            chunks.append(css[seg_pos:end])
+            text = ''.join(chunks)
+            chunks = []
+            chunks_len = 0
+        else:
+            text = css[seg_pos:end]
+        colon = colon_at
+        colon_at = -1
+        return text, colon
+
+    def add_declaration(text: str, colon: int) -> None:
+        if not stack or colon < 0:
+            return
+        name = text[:colon].strip()
+        value = text[colon + 1:].strip()
+        if name and value:
+            stack[-1].declarations.append((name, value))
+            if stats is not None and 'var(' in value:
+                stats['var_refs'] = stats.get('var_refs', 0) + value.count('var(')
+
+    def close_block(block: _Block) -> None:
+        if block.declarations:
+            if block.selector is not None:
+                slots[block.slot] = CSSRule(block.selector, block.at_rules, block.declarations)
+            else:
+                # Declarations directly inside an at-rule, e.g. @font-face { ... }
+                slots[block.slot] = CSSRule(block.at_rules[-1], block.at_rules[:-1], block.declarations)
+
+    while pos < length:
+        # Inside url(...), :is(...) etc. only nesting, strings and comments matter
+        match = (CSS_PAREN_SIGNIFICANT if paren_depth else CSS_SIGNIFICANT).search(css, pos)
+        if match is None:
+            break
+        tokens += 1
+        token = match.group()
+        start = match.start()
+
+        if token == '/*':
+            end = css.find('*/', start + 2)
+            end = length if end < 0 else end + 2
+            chunks.append(css[seg_pos:start])
+            chunks_len += start - seg_pos
+            seg_pos = pos = end
+            continue
+        if token in CSS_STRINGS:
+            pos = CSS_STRINGS[token].match(css, start).end()
+            continue
+        if token == '(':
+            paren_depth += 1
+            pos = start + 1
+            continue
+        if token == ')':
+            paren_depth = max(0, paren_depth - 1)
+            pos = start + 1
+            continue
+
+        if token == ':':
+            if colon_at < 0:
+                colon_at = chunks_len + (start - seg_pos)
+        elif token == ';':
+            text, colon = take_segment(start)
+            add_declaration(text, colon)
+        elif token == '{':
+            text, _ = take_segment(start)
+            prelude = text.strip()
+            parent = stack[-1] if stack else None
+            parent_selector = parent.selector if parent else None
+            parent_at_rules = parent.at_rules if parent else ()
+            if prelude.startswith('@'):
+                block = _Block(parent_selector, parent_at_rules + (prelude,), len(slots))
+            else:
+                block = _Block(resolve_nested_selector(parent_selector, prelude), parent_at_rules, len(slots))
+            slots.append(None)
+            stack.append(block)
+        else:  # '}'
+            text, colon = take_segment(start)
+            add_declaration(text, colon)
+            if stack:
+                close_block(stack.pop())
+        pos = start + 1
+        if token != ':':
+            seg_pos = pos
+
+    # Tolerate unterminated blocks at the end of the stylesheet
+    if stack:
+        text, colon = take_segment(length)
+        add_declaration(text, colon)
+        while stack:
+            close_block(stack.pop())
+
+    if stats is not None:
+        stats['tokens'] = stats.get('tokens', 0) + tokens
+    return [rule for rule in slots if rule is not None]
+
+def rules_to_dict(rules: List[CSSRule], at_rules: Optional[Dict[str, List[str]]] = None,
+                  positions: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, str]]:
+    """Fold parsed rules into the extractor's {selector: {property: value}} structure
+
+    Rules inside at-rules are keyed by their context-prefixed selector; the
+    at-rule chain for each such key is recorded in at_rules when given.
+    Repeated selectors are merged, later declarations winning, in the slot
+    of their first rule; pass a dict as positions to also collect, per key
+    and property, the index of the rule the winning value came from (its
+    source order for the cascade).
+    """
+    result: Dict[str, Dict[str, str]] = {}
+    for index, rule in enumerate(rules):
+        key = rule.key
+        properties = result.setdefault(key, {})
+        properties.update(rule.declarations)
+        if at_rules is not None and rule.at_rules:
+            at_rules[key] = list(rule.at_rules)
+        if positions is not None:
+            positions.setdefault(key, {}).update((name, index) for name, _ in rule.declarations)
+    return result
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Precompiled regular expressions shared by the extractor, the CSV export and
+the summary report. Compile once here; never pass pattern strings to re.*
+in per-file or per-rule loops.
+"""
+
+import re
+
+# <style ...>...</style> section of a Svelte component
+STYLE_BLOCK = re.compile(r'<style[^>]*>(.*?)</style>', re.DOTALL)
+
+# Byte patterns used to locate every style block without decoding the file (css_styles)
+STYLE_OPEN_TAG = re.compile(rb'<style(?=[\s>/])([^>]*)>')
+STYLE_CLOSE_TAG = b'</style>'
+# name, name="value", name='value' or name=value inside an opening tag
+STYLE_ATTRIBUTE = re.compile(rb'([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+
+# One token of component markup (css_markup), by group: <script> content, class:name directive,
+# class/id attribute name with its "value", 'value' or {expression}, element name, {...spread}.
+# HTML comments match without a group so their contents are skipped.
+MARKUP_TOKEN = re.compile(
+    rb'<script\b[^>]*>(.*?)</script>'
+    rb'|<!--.*?-->'
+    rb'|(?<![\w-])class:([\w-]+)'
+    rb'|(?<![\w-])(class|id)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|\{([^}]*)\})'
+    rb'|<([A-Za-z][\w:.-]*)'
+    rb'|\{\s*\.\.\.([^}]*)\}',
+    re.DOTALL)
+# Identifier-like words in markup expressions and script strings
+MARKUP_WORD = re.compile(rb'-?[A-Za-z_][\w-]*')
+# String and template literals in <script> content
+# (unrolled, so long literals are matched in runs rather than one character at a time)
+SCRIPT_STRING = re.compile(rb'"[^"\\\n]*(?:\\.[^"\\\n]*)*"|\'[^\'\\\n]*(?:\\.[^\'\\\n]*)*\'|`[^`\\]*(?:\\.[^`\\]*)*`')
+
+# Selector parts ignored when matching against markup: functional pseudo-classes
+# such as :not(...) (one level of nesting inside), then attribute selectors and
+# other pseudo-classes and pseudo-elements
+SELECTOR_FUNCTIONAL_PSEUDO = re.compile(r'(?<!\\)::?[\w-]+\([^()]*(?:\([^()]*\)[^()]*)*\)')
+SELECTOR_IGNORED = re.compile(r'\[[^\]]*\]|(?<!\\)::?[\w-]+')
+# Type, .class and #id selectors, with backslash escapes in names
+SELECTOR_SIMPLE = re.compile(r'([.#]?)((?:-?[A-Za-z_]|\\.)(?:[\w-]|\\.)*)')
+# One token of a selector for specificity: [.#:]/::-prefixed or type name, attribute
+# selector, universal selector, combinator (with its surrounding space) or descendant space
+SELECTOR_TOKEN = re.compile(r'(::?|[.#])?((?:-?[A-Za-z_]|-?\\.)(?:[\w-]|\\.)*)|(\[[^\]]*\])|(\*)|\s*([>+~])\s*|(\s+)')
+# The same tokens without groups, for selectors with no escapes or parentheses
+PLAIN_SELECTOR_TOKEN = re.compile(r'(?:::?|[.#])?-?[A-Za-z_][\w-]*|\[[^\]]*\]|\*|\s*[>+~]\s*|\s+')
+
+# Characters that can change the CSS parser state outside parentheses...
+CSS_SIGNIFICANT = re.compile(r'/\*|[{};:()"\']')
+# ...and inside them, where only nesting, strings and comments matter
+CSS_PAREN_SIGNIFICANT = re.compile(r'/\*|[()"\']')
+
+# Quoted strings, starting at the opening quote; an unterminated string runs to the end of the line
+CSS_STRINGS = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.)*"?', re.DOTALL),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.)*'?", re.DOTALL),
+}
+
+# Custom property names referenced through var(--name) or var(--name, fallback)
+VAR_REFERENCE = re.compile(r'var\((--[^,)]+)')
+
+# Colour and dimension literals normalised by css_suggestions (matched against lowercased text)
+HEX_COLOR = re.compile(r'#([0-9a-f]{3,4}|[0-9a-f]{6}|[0-9a-f]{8})')
+COLOR_FUNCTION = re.compile(r'(rgba?|hsla?)\(([^()]*)\)')
+LENGTH = re.compile(r'([+-]?(?:\d+\.?\d*|\.\d+))(px|rem)')
+NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)')
+
+# Start of a var() call, capturing the token; the caller balances the parentheses
+VAR_CALL = re.compile(r'var\(\s*(--[\w-]+)\s*')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+In-process pipeline from a live SvelteCSSExtractor to the CSV exports and the
+Markdown summary, without the JSON round-trip. The shared aggregates (property
+usage, per-component counts, var() references) are computed once, in the same
+pass that writes the detailed rules CSV.
+"""
+
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from create_clean_summary import write_summary_report
+from css_aggregates import CSSAggregates
+from css_cascade import write_conflicts_csv
+from css_duplicates import find_duplicates, write_duplicates_csv
+from css_index_db import build_database
+from css_instrument import NO_INSTRUMENTATION
+from css_matrix import SparsePropertyIndex
+from css_suggestions import TokenValueIndex, suggest_tokens, write_suggestions_csv
+from css_tokens import TokenIndex, default_stylesheets
+from json_to_csv import write_csv_files
+
+if TYPE_CHECKING:
+    from css_extractor import SvelteCSSExtractor
+
+def live_results(extractor: 'SvelteCSSExtractor', index: Optional[SparsePropertyIndex] = None) -> Dict[str, Any]:
+    """Expose an extractor's state in the load_results() shape, with streamed matrix rows"""
+    index = index or extractor.property_index()
+    return {
+        'metadata': extractor.metadata(),
+        'components': extractor.components_data,
+        'csv_data': {
+            'property_rows': {
+                'headers': index.property_headers(),
+                'data': index.iter_property_rows()
+            },
+            'component_rows': {
+                'headers': index.component_headers(),
+                'data': index.iter_component_rows()
+            }
+        }
+    }
+
+def write_token_index(extractor: 'SvelteCSSExtractor', token_csv: str) -> TokenIndex:
+    """Index the extractor's tokens against the global stylesheets and write the CSV"""
+    tokens = TokenIndex.build(extractor.components_data.items(), default_stylesheets(str(extractor.base_path)))
+    tokens.write_csv(token_csv)
+    print(f"Token index written to {token_csv} ({len(tokens.unused_tokens())} unused, "
+          f"{len(tokens.undefined_tokens())} undefined)")
+    return tokens
+
+def run_pipeline(extractor: 'SvelteCSSExtractor', csv_dir: Optional[str] = None,
+                 summary_file: Optional[str] = None, json_path: Optional[str] = None,
+                 sqlite_path: Optional[str] = None, token_csv: Optional[str] = None,
+                 duplicates_csv: Optional[str] = None, suggestions_csv: Optional[str] = None,
+                 cascade_csv: Optional[str] = None,
+                 output_format: str = 'json', compress: bool = False, csv_workers: int = 1,
+                 instrumentation=NO_INSTRUMENTATION) -> CSSAggregates:
+    """Write any of the CSV files, the summary report, the JSON results, the
+    SQLite index, the design-token index, the duplicate rules, the token
+    suggestions and the cascade conflicts from one extraction
+
+    compress gzips the JSON results and the six CSV files; csv_workers > 1
+    writes independent CSV files on threads (see css_output).
+    """
+    with instrumentation.phase('matrix'):
+        index = extractor.property_index()
+    
+    if json_path:
+        with instrumentation.phase(output_format):
+            extractor.save_results(json_path, index=index, output_format=output_format, compress=compress)
+    if sqlite_path:
+        with instrumentation.phase('sqlite'):
+            counts = build_database(extractor.components_data.items(), sqlite_path)
+        print(f"SQLite index written to {sqlite_path} ({counts['declarations']} declarations)")
+    if token_csv:
+        with instrumentation.phase('tokens'):
+            write_token_index(extractor, token_csv)
+    if duplicates_csv:
+        with instrumentation.phase('duplicates'):
+            clusters = find_duplicates(extractor.components_data.items())
+            write_duplicates_csv(clusters, duplicates_csv)
+        print(f"Duplicate rules written to {duplicates_csv} ({len(clusters)} clusters)")
+    if suggestions_csv:
+        with instrumentation.phase('suggestions'):
+            token_values = TokenValueIndex.from_stylesheets(default_stylesheets(str(extractor.base_path)))
+            suggestions = suggest_tokens(extractor.components_data.items(), token_values)
+            write_suggestions_csv(suggestions, suggestions_csv)
+        print(f"Token suggestions written to {suggestions_csv} ({len(suggestions)} declarations)")
+    
+    data = live_results(extractor, index)
+    with instrumentation.phase('csv' if csv_dir else 'aggregate'):
+        if csv_dir:
+            _, aggregates = write_csv_files(data, csv_dir, compress=compress, workers=csv_workers)
+        else:
+            aggregates = CSSAggregates.collect(data['components'].items())
+    
+    if cascade_csv:
+        with instrumentation.phase('cascade'):
+            write_conflicts_csv(aggregates.conflict_rows, cascade_csv)
+        print(f"Cascade conflicts written to {cascade_csv} ({len(aggregates.conflict_rows)} overridden declarations)")
+    
+    if summary_file:
+        with instrumentation.phase('summary'):
+            write_summary_report(data['metadata'], aggregates, summary_file)
+    
+    return aggregates
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Readers for CSS extraction results.
+load_results() returns the same {'metadata', 'components', 'csv_data'} shape
+for the indented JSON written by save_results (plain or gzipped), the JSONL stream written by
+stream_results and the binary snapshot (css_snapshot). For JSONL and
+snapshots, components are decoded lazily, one at a time, straight from the
+file.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from css_matrix import SparsePropertyIndex
+from css_output import open_input
+from css_snapshot import SnapshotResults, is_snapshot
+
+# How stream_results (and css_shard partials) start a component line, ahead of its name
+COMPONENT_LINE_PREFIX = b'{"record": "component", "name": '
+
+class JsonlResults(Mapping):
+    """Lazy, read-only {component_name: component_data} view over a JSONL results file
+
+    A first pass records the byte offset of each component's last record, so
+    repeated component names resolve exactly as in save_results: first-seen
+    order, last-seen data. That pass only decodes the name leading each
+    record (older files without it are decoded in full); records are only
+    decoded when accessed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata: Dict[str, Any] = {}
+        self._offsets: Dict[str, int] = {}
+        self._index()
+
+    def _index(self) -> None:
+        decoder = json.JSONDecoder()
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.startswith(COMPONENT_LINE_PREFIX):
+                    name, _ = decoder.raw_decode(line.decode('utf-8'), len(COMPONENT_LINE_PREFIX))
+                    self._offsets[name] = offset
+                    offset += len(line)
+                    continue
+                record = json.loads(line)
+                if record.get('record') == 'component':
+                    self._offsets[record['component']['component_name']] = offset
+                elif record.get('record') == 'metadata':
+                    self.metadata = record['metadata']
+                offset += len(line)
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        with open(self.path, 'rb') as f:
+            f.seek(self._offsets[name])
+            return json.loads(f.readline())['component']
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Decode every component in order through a single open file handle"""
+        with open(self.path, 'rb') as f:
+            for name, offset in self._offsets.items():
+                f.seek(offset)
+                yield name, json.loads(f.readline())['component']
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return (component for _, component in self.items())
+
+    def csv_data(self) -> Dict[str, Any]:
+        """The csv_data section of save_results, with rows produced by generators"""
+        return build_csv_data(self.metadata, self)
+
+class LazyCSVData(Mapping):
+    """csv_data section built on first access, so readers that only need the
+    components or the metadata never pay for the matrix index"""
+
+    def __init__(self, metadata: Dict[str, Any], components: Mapping):
+        self._metadata = metadata
+        self._components = components
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _build(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = build_csv_data(self._metadata, self._components)
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._build()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('property_rows', 'component_rows'))
+
+    def __len__(self) -> int:
+        return 2
+
+def build_csv_data(metadata: Dict[str, Any], components: Mapping) -> Dict[str, Any]:
+    """Build the csv_data section for a lazily decoded components mapping"""
+    index = SparsePropertyIndex(
+        metadata.get('css_properties', []),
+        ((name, component.get('css_rules', {}) if component.get('has_styles', False) else None)
+         for name, component in components.items())
+    )
+    return {
+        'property_rows': {
+            'headers': index.property_headers(),
+            'data': index.iter_property_rows()
+        },
+        'component_rows': {
+            'headers': index.component_headers(),
+            'data': index.iter_component_rows()
+        }
+    }
+
+def is_jsonl(path: str) -> bool:
+    return str(path).endswith('.jsonl')
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load extraction results from a .json document, a .jsonl stream or a snapshot"""
+    if is_snapshot(path):
+        components = SnapshotResults(path)
+        return {
+            'metadata': components.metadata,
+            'components': components,
+            'csv_data': LazyCSVData(components.metadata, components)
+        }
+    if is_jsonl(path):
+        components = JsonlResults(path)
+        return {
+            'metadata': components.metadata,
+            'components': components,
+            'csv_data': LazyCSVData(components.metadata, components)
+        }
+    with open_input(path) as f:
+        return json.load(f)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Long-running CSS index server.
+Extracts the components once, keeps the state current with the watch-mode
+poller (css_watch) and answers queries over localhost HTTP or a Unix socket,
+so editor integrations and hooks get answers from memory instead of paying
+for a rescan and a JSON reload on every call.
+
+    GET  /status                          counts and last update
+    GET  /components                      component names
+    GET  /components/<name>               one component's extraction result
+    GET  /components/<name>/properties    property -> {selector: value}
+    GET  /properties/<property>           component -> {selector: value}
+    GET  /tokens/<--token>                definitions, usages and fallbacks
+    GET  /tokens/unused | /tokens/undefined
+    POST /regenerate/<output>             write a CSV (see IncrementalCSVOutputs.FILE_NAMES),
+                                          'csv' (all six), 'report' (Markdown summary),
+                                          'token-index' or 'json'
+
+Responses are JSON. With --socket, query with e.g.
+`curl --unix-socket css.sock http://localhost/components/Button`, or use
+`css_server.py --socket css.sock --query /components/Button`.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from css_cache import ExtractionCache
+from css_discovery import DEFAULT_EXCLUDES
+from css_extractor import DEFAULT_CACHE_PATH, SvelteCSSExtractor
+from css_model import json_default
+from css_watch import CSSWatcher, IncrementalCSVOutputs
+
+DEFAULT_PORT = 8765
+
+class NotFound(Exception):
+    pass
+
+class CSSIndexService:
+    """Query and regeneration handlers over a CSSWatcher's live state
+
+    Every handler runs under one lock shared with the poller thread, so a
+    query never sees a half-applied update.
+    """
+
+    def __init__(self, watcher: CSSWatcher, json_path: Optional[str] = None):
+        self.watcher = watcher
+        self.extractor = watcher.extractor
+        self.json_path = json_path
+        self.lock = threading.RLock()
+        self.updated_at = time.time()
+        self.updates = 0
+        # property -> component -> {selector: value}, rebuilt on the first query after an update
+        self._property_index: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None
+
+    def poll_forever(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            stamps = self.watcher.wait_for_changes()
+            if stamps is None:
+                continue
+            with self.lock:
+                start = time.perf_counter()
+                changed = self.watcher.apply_changes(stamps)
+                self._property_index = None
+                self.updates += 1
+                self.updated_at = time.time()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Updated {len(changed)} component(s) in {elapsed:.1f} ms: {', '.join(sorted(changed))}")
+
+    def handle(self, method: str, path: str) -> Any:
+        """Route a request path to its handler and return the JSON-able answer"""
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        with self.lock:
+            if method == 'POST':
+                if len(parts) == 2 and parts[0] == 'regenerate':
+                    return self.regenerate(parts[1])
+                raise NotFound(path)
+            if parts == ['status']:
+                return self.status()
+            if parts == ['components']:
+                return list(self.extractor.components_data)
+            if len(parts) == 2 and parts[0] == 'components':
+                return self._component(parts[1])
+            if len(parts) == 3 and parts[0] == 'components' and parts[2] == 'properties':
+                return self.component_properties(parts[1])
+            if len(parts) == 2 and parts[0] == 'properties':
+                return self.property_usages(parts[1])
+            if parts == ['tokens', 'unused']:
+                return self._tokens().unused_tokens()
+            if parts == ['tokens', 'undefined']:
+                return self._tokens().undefined_tokens()
+            if len(parts) == 2 and parts[0] == 'tokens':
+                return self.token(parts[1])
+        raise NotFound(path)
+
+    def status(self) -> Dict[str, Any]:
+        metadata = self.extractor.metadata()
+        return {
+            'base_path': str(self.extractor.base_path),
+            'files': len(self.watcher.files),
+            'total_components': metadata['total_components'],
+            'components_with_styles': metadata['components_with_styles'],
+            'total_css_properties': metadata['total_css_properties'],
+            'updates': self.updates,
+            'updated_at': self.updated_at,
+        }
+
+    def _component(self, name: str) -> Any:
+        try:
+            return self.extractor.components_data[name]
+        except KeyError:
+            raise NotFound(f"component {name}") from None
+
+    def component_properties(self, name: str) -> Dict[str, Dict[str, str]]:
+        properties: Dict[str, Dict[str, str]] = {}
+        for selector, declarations in self._component(name).get('css_rules', {}).items():
+            for prop_name, prop_value in declarations.items():
+                properties.setdefault(prop_name, {})[selector] = prop_value
+        return dict(sorted(properties.items()))
+
+    def property_usages(self, prop: str) -> Dict[str, Dict[str, str]]:
+        if self._property_index is None:
+            index: Dict[str, Dict[str, Dict[str, str]]] = {}
+            for comp_name, comp_data in self.extractor.components_data.items():
+                for selector, declarations in comp_data.get('css_rules', {}).items():
+                    for prop_name, prop_value in declarations.items():
+                        index.setdefault(prop_name, {}).setdefault(comp_name, {})[selector] = prop_value
+            self._property_index = index
+        try:
+            return self._property_index[prop]
+        except KeyError:
+            raise NotFound(f"property {prop}") from None
+
+    def _tokens(self):
+        if self.watcher.tokens is None:
+            raise NotFound("token index (start the server with --token-index)")
+        return self.watcher.tokens
+
+    def token(self, token: str) -> Dict[str, Any]:
+        tokens = self._tokens()
+        definitions = tokens.definitions_of(token)
+        usages = tokens.usages_of(token)
+        if not definitions and not usages:
+            raise NotFound(f"token {token}")
+        return {
+            'definitions': [d._asdict() for d in definitions],
+            'usages': [u._asdict() for u in usages],
+            'fallbacks': sorted(tokens.fallbacks_of(token)),
+        }
+
+    def regenerate(self, output: str) -> Dict[str, List[str]]:
+        """Write one output from the in-memory state"""
+        outputs = self.watcher.outputs
+        if output in IncrementalCSVOutputs.FILE_NAMES:
+            written = outputs.write([output])
+        elif output == 'csv':
+            written = outputs.write()
+        elif output == 'report' and self.watcher.summary_file:
+            self.watcher.write_summary()
+            written = [self.watcher.summary_file]
+        elif output == 'token-index' and self.watcher.token_csv:
+            self._tokens().write_csv(self.watcher.token_csv)
+            written = [self.watcher.token_csv]
+        elif output == 'json' and self.json_path:
+            self.extractor.save_results(self.json_path)
+            written = [self.json_path]
+        else:
+            raise NotFound(f"output {output}")
+        return {'written': [str(path) for path in written]}
+
+class CSSRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CSSIndex/1'
+
+    def do_GET(self) -> None:
+        self._respond('GET')
+
+    def do_POST(self) -> None:
+        # Request bodies are not used; drain one if sent so the connection stays usable
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self._respond('POST')
+
+    def _respond(self, method: str) -> None:
+        try:
+            status, payload = 200, self.server.service.handle(method, urlsplit(self.path).path)
+        except NotFound as e:
+            status, payload = 404, {'error': f"not found: {e}"}
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+        body = json.dumps(payload, default=json_default, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class CSSHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+class CSSUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def make_server(service: CSSIndexService, port: int = DEFAULT_PORT, socket_path: Optional[str] = None,
+                verbose: bool = False) -> socketserver.BaseServer:
+    """HTTP on 127.0.0.1:port, or on a Unix socket when socket_path is given"""
+    if socket_path:
+        _remove_stale_socket(socket_path)
+        server = CSSUnixHTTPServer(socket_path, CSSRequestHandler)
+    else:
+        server = CSSHTTPServer(('127.0.0.1', port), CSSRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+class SocketPathError(OSError):
+    pass
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Unlink socket_path only if it is a Unix socket that nothing listens on any more"""
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise SocketPathError(f"{socket_path} exists and is not a socket; refusing to replace it")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        # Left behind by a server that did not shut down cleanly
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise SocketPathError(f"{socket_path} is in use by another server")
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+def request(path: str, method: str = 'GET', port: int = DEFAULT_PORT,
+            socket_path: Optional[str] = None) -> Tuple[int, Any]:
+    """Send one query to a running server; returns (HTTP status, decoded JSON)"""
+    connection = UnixHTTPConnection(socket_path) if socket_path else http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request(method, quote(path))
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve live CSS extraction queries over HTTP or a Unix socket")
+    parser.add_argument('components_path', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/frontend/src/lib/components",
+                        help="Directory to scan for .svelte files")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Localhost port (default: {DEFAULT_PORT})")
+    parser.add_argument('--socket', help="Serve on this Unix socket instead of a TCP port")
+    parser.add_argument('--query', metavar='PATH',
+                        help="Client mode: send this query to a running server and print the JSON answer")
+    parser.add_argument('--regenerate', metavar='OUTPUT',
+                        help="Client mode: ask a running server to rewrite an output (e.g. csv, report, token-index)")
+    parser.add_argument('--csv-dir', default="csv_output", help="Where regenerated CSV files are written")
+    parser.add_argument('--summary', default="CSS_Analysis_Summary.md", help="Where the regenerated summary is written")
+    parser.add_argument('--token-index', default="css_token_index.csv",
+                        help="Where the regenerated token index is written")
+    parser.add_argument('--json', default="css_extraction_results.json", help="Where regenerated JSON results are written")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Worker processes for the initial extraction")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help="Reuse per-file results from a cache file for the initial extraction")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="Skip paths matching this gitignore-style glob (repeatable)")
+    parser.add_argument('--poll-interval', type=float, default=0.5, help="Seconds between change scans")
+    parser.add_argument('--debounce', type=float, default=0.2, help="Quiet period before applying a burst of changes")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    if args.query or args.regenerate:
+        method, path = ('POST', f"/regenerate/{args.regenerate}") if args.regenerate else ('GET', args.query)
+        status, payload = request(path, method, args.port, args.socket)
+        print(json.dumps(payload, indent=2, ensure_ascii=False))
+        raise SystemExit(0 if status == 200 else 1)
+
+    extractor = SvelteCSSExtractor(args.components_path, excludes=list(DEFAULT_EXCLUDES) + args.exclude)
+    watcher = CSSWatcher(extractor, args.csv_dir, summary_file=args.summary, token_csv=args.token_index,
+                         interval=args.poll_interval, debounce=args.debounce, write_outputs=False)
+    cache = (ExtractionCache(args.cache, args.components_path, compact=extractor.compact,
+                             keep_raw_css=extractor.keep_raw_css) if args.cache else None)
+    start = time.perf_counter()
+    watcher.initial_build(workers=args.workers if args.workers > 0 else (os.cpu_count() or 1), cache=cache)
+    print(f"Indexed {len(extractor.components_data)} components in {time.perf_counter() - start:.2f}s")
+
+    service = CSSIndexService(watcher, json_path=args.json)
+    try:
+        server = make_server(service, args.port, args.socket, args.verbose)
+    except SocketPathError as e:
+        sys.exit(f"Error: {e}")
+    stop = threading.Event()
+    poller = threading.Thread(target=service.poll_forever, args=(stop,), daemon=True)
+    poller.start()
+    where = args.socket or f"http://127.0.0.1:{args.port}"
+    print(f"Serving CSS queries on {where} (Ctrl+C to stop)")
+    # Stop (and remove the socket) on `kill` as on Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped serving")
+    finally:
+        stop.set()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Sharded extraction and mergeable partial results.
+`css_extractor.py --shard i/N` extracts only the files whose relative path
+hashes to shard i and writes a partial: a JSONL results file (readable by
+load_results) whose component records carry their position in the discovery
+order of the whole tree and the property names seen while parsing each
+file. A shard's files are discovered in that order, so partials are written
+as they are extracted, already sorted. Merging partials is a streaming k-way
+merge on the position, and a merge of partials is itself a partial, so
+shards can be reduced in any grouping (a tree across nodes) with the same
+result. The final JSON, CSVs and summary are produced from a merged partial
+with css_merge.py.
+
+Components come out in the order an unsharded run extracts them, so
+repeated names resolve as save_results does (first-seen order, last-seen
+data), given every node walks the same checkout.
+"""
+
+import hashlib
+import heapq
+import json
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from css_model import ComponentRecord, json_default
+
+if TYPE_CHECKING:
+    from css_extractor import SvelteCSSExtractor
+
+PARTIAL_VERSION = 2
+
+class PartialMergeError(ValueError):
+    pass
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """'i/N' (1-based) -> (i, N); also usable as an argparse type"""
+    index, sep, count = text.partition('/')
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not sep or shard[1] < 1 or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"shard must be i/N with 1 <= i <= N, got {text!r}")
+    return shard
+
+def path_key(relative_path: str) -> str:
+    """Platform-independent sort and hash key of a relative path"""
+    return PurePath(relative_path).as_posix()
+
+def shard_of(relative_path: str, count: int) -> int:
+    """Stable 1-based shard of a path: the same on every node and Python run"""
+    digest = hashlib.blake2b(path_key(relative_path).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+def _component_line(component_data: Dict[str, Any], css_properties: Set[str], position: int) -> bytes:
+    record = {'record': 'component', 'name': component_data['component_name'], 'position': position,
+              'path': path_key(component_data['relative_path']), 'css_properties': sorted(css_properties),
+              'component': component_data}
+    return json.dumps(record, ensure_ascii=False, default=json_default).encode('utf-8') + b'\n'
+
+class _PartialWriter:
+    """Writes header, ordered component lines and the metadata trailer, tracking what the trailer needs"""
+
+    def __init__(self, output_path: str, header: Dict[str, Any]):
+        self.file = open(output_path, 'wb')
+        self.file.write(json.dumps({'record': 'partial', 'partial': header}, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.properties: Set[str] = set()
+        # Last-seen has_styles per component name, as save_results resolves names
+        self.has_styles: Dict[str, bool] = {}
+        self.files = 0
+
+    def write(self, line: bytes, css_properties: Iterable[str], component_name: str, has_styles: bool) -> None:
+        self.file.write(line)
+        self.properties.update(css_properties)
+        self.has_styles[component_name] = has_styles
+        self.files += 1
+
+    def close(self) -> Dict[str, Any]:
+        # Imported here: css_extractor imports this module
+        from css_extractor import build_metadata
+        metadata = build_metadata(len(self.has_styles), sum(self.has_styles.values()), self.properties)
+        self.file.write(json.dumps({'record': 'metadata', 'metadata': metadata}, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.file.close()
+        return metadata
+
+def write_partial(extractor: 'SvelteCSSExtractor', output_path: str, shard: Tuple[int, int],
+                  **extract_options) -> Dict[str, Any]:
+    """Extract the extractor's shard of the tree and write it as a partial
+
+    Results arrive in discovery order, so each is written as soon as it is
+    extracted.
+    """
+    header = {'version': PARTIAL_VERSION, 'base_path': str(extractor.base_path),
+              'shard_count': shard[1], 'shards': [shard[0]]}
+    writer = _PartialWriter(output_path, header)
+    positions = extractor.discovery_positions
+    for component_data, css_properties in extractor.iter_component_results(**extract_options):
+        position = positions.pop(component_data['file_path'])
+        writer.write(_component_line(component_data, css_properties, position), css_properties,
+                     component_data['component_name'], component_data.get('has_styles', False))
+    metadata = writer.close()
+    print(f"Shard {shard[0]}/{shard[1]}: {writer.files} files written to {output_path}")
+    return metadata
+
+def read_partial_header(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        record = json.loads(f.readline() or b'{}')
+    if record.get('record') != 'partial':
+        raise PartialMergeError(f"{path} is not a partial result (write one with css_extractor.py --shard i/N)")
+    header = record['partial']
+    if header.get('version') != PARTIAL_VERSION:
+        raise PartialMergeError(f"{path}: unsupported partial version {header.get('version')}")
+    return header
+
+def iter_partial_records(path: str) -> Iterator[Tuple[int, bytes, Dict[str, Any]]]:
+    """(discovery position, raw line, decoded record) for every component record, in file order"""
+    with open(path, 'rb') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('record') == 'component':
+                yield record['position'], line, record
+
+def merge_headers(headers: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Combine partial headers; shards must agree on N and must not overlap"""
+    counts = {header['shard_count'] for _, header in headers}
+    if len(counts) != 1:
+        raise PartialMergeError(f"partials from different shard counts: {sorted(counts)}")
+    seen: Dict[int, str] = {}
+    for path, header in headers:
+        for shard in header['shards']:
+            if shard in seen:
+                raise PartialMergeError(f"shard {shard} is in both {seen[shard]} and {path}")
+            seen[shard] = path
+    return {'version': PARTIAL_VERSION, 'base_path': headers[0][1]['base_path'],
+            'shard_count': counts.pop(), 'shards': sorted(seen)}
+
+def is_complete(header: Dict[str, Any]) -> bool:
+    return len(header['shards']) == header['shard_count']
+
+def iter_merged_records(paths: List[str]) -> Iterator[Tuple[int, bytes, Dict[str, Any]]]:
+    """Stream the component records of several partials in the unsharded discovery order"""
+    previous: Optional[Tuple[int, str]] = None
+    for position, line, record in heapq.merge(*(iter_partial_records(path) for path in paths),
+                                              key=lambda r: r[0]):
+        if previous is not None and position == previous[0]:
+            raise PartialMergeError(f"{previous[1]} and {record['path']} share discovery position {position}; "
+                                    f"were the shards extracted from the same tree?")
+        previous = (position, record['path'])
+        yield position, line, record
+
+def merge_partials(paths: List[str], output_path: str) -> Dict[str, Any]:
+    """Merge partials into one partial file, streaming; returns the merged header"""
+    header = merge_headers([(path, read_partial_header(path)) for path in paths])
+    writer = _PartialWriter(output_path, header)
+    for _, line, record in iter_merged_records(paths):
+        component = record['component']
+        writer.write(line, record['css_properties'], component['component_name'], component.get('has_styles', False))
+    writer.close()
+    print(f"Merged {len(paths)} partials ({writer.files} files, shards {_shard_list(header)}) into {output_path}")
+    return header
+
+def load_partials(extractor: 'SvelteCSSExtractor', paths: List[str]) -> Dict[str, Any]:
+    """Fill an extractor's state from partials, as if it had extracted the whole tree"""
+    header = merge_headers([(path, read_partial_header(path)) for path in paths])
+    for _, _, record in iter_merged_records(paths):
+        component = record['component']
+        if extractor.compact:
+            component = ComponentRecord.from_dict(component, extractor.keep_raw_css)
+        elif not extractor.keep_raw_css:
+            component.pop('raw_css', None)
+        extractor.add_component(component, set(record['css_properties']))
+    return header
+
+def _shard_list(header: Dict[str, Any]) -> str:
+    return f"{','.join(map(str, header['shards']))} of {header['shard_count']}"
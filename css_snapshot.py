@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Compact binary snapshot of CSS extraction results.
+Every string is stored once in an interned string table; components, rules,
+declarations and at-rule chains are column arrays of uint32 string ids and
+offsets. Readers mmap the file and decode only the sections and rows they
+touch, so opening a snapshot costs a header read instead of a json.load of
+the whole document.
+
+Layout (little-endian): MAGIC, then a u32 section count and a directory of
+(8-byte name, u64 offset, u64 length) entries, then the 4-byte aligned
+sections themselves. Every section except meta (JSON) and s_blob (UTF-8)
+is a flat uint32 array.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'CSSSNAP1'
+NO_STRING = 0xFFFFFFFF
+
+# Component flags
+HAS_STYLES = 1
+HAS_AT_RULES = 2
+HAS_RAW_CSS = 4
+HAS_ERROR = 8
+HAS_STYLE_BLOCKS = 16
+HAS_UNUSED_SELECTORS = 32
+HAS_CASCADE_CONFLICTS = 64
+
+_DIRECTORY_ENTRY = struct.Struct('<8sQQ')
+
+# Column arrays, in file order
+COMPONENT_COLUMNS = ('c_name', 'c_file', 'c_rel', 'c_flags', 'c_rule0', 'c_rules', 'c_blocks', 'c_unused', 'c_casc',
+                     'c_raw', 'c_error')
+RULE_COLUMNS = ('r_sel', 'r_decl0', 'r_decls', 'r_at0', 'r_ats')
+DECLARATION_COLUMNS = ('d_prop', 'd_value')
+
+def _uint32_array() -> array:
+    # 'I' is 4 bytes on every platform CPython supports; checked once here
+    values = array('I')
+    assert values.itemsize == 4
+    return values
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def sections(self) -> Tuple[array, bytes]:
+        offsets = _uint32_array()
+        blob = bytearray()
+        offsets.append(0)
+        for value in self.strings:
+            blob += value.encode('utf-8')
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+def write_snapshot(metadata: Dict[str, Any], components: Iterable[Tuple[str, Dict[str, Any]]], output_path: str) -> None:
+    """Write metadata and (name, component_data) pairs as a snapshot"""
+    strings = _StringTable()
+    columns: Dict[str, array] = {name: _uint32_array()
+                                 for name in COMPONENT_COLUMNS + RULE_COLUMNS + DECLARATION_COLUMNS + ('at_rules',)}
+    intern = strings.intern
+
+    for comp_name, comp_data in components:
+        at_rules = comp_data.get('at_rules')
+        flags = ((HAS_STYLES if comp_data.get('has_styles', False) else 0)
+                 | (HAS_AT_RULES if at_rules is not None else 0)
+                 | (HAS_RAW_CSS if 'raw_css' in comp_data else 0)
+                 | (HAS_ERROR if 'error' in comp_data else 0)
+                 | (HAS_STYLE_BLOCKS if 'style_blocks' in comp_data else 0)
+                 | (HAS_UNUSED_SELECTORS if 'unused_selectors' in comp_data else 0)
+                 | (HAS_CASCADE_CONFLICTS if 'cascade_conflicts' in comp_data else 0))
+        css_rules = comp_data.get('css_rules', {})
+        columns['c_name'].append(intern(comp_name))
+        columns['c_file'].append(intern(comp_data.get('file_path', '')))
+        columns['c_rel'].append(intern(comp_data.get('relative_path', '')))
+        columns['c_flags'].append(flags)
+        columns['c_rule0'].append(len(columns['r_sel']))
+        columns['c_rules'].append(len(css_rules))
+        # Block locations, unused selectors and cascade conflicts are small and rarely read,
+        # so each is one JSON string
+        style_blocks = comp_data.get('style_blocks')
+        columns['c_blocks'].append(intern(None if style_blocks is None
+                                          else json.dumps(style_blocks, ensure_ascii=False)))
+        unused_selectors = comp_data.get('unused_selectors')
+        columns['c_unused'].append(intern(None if unused_selectors is None
+                                          else json.dumps(unused_selectors, ensure_ascii=False)))
+        cascade_conflicts = comp_data.get('cascade_conflicts')
+        columns['c_casc'].append(intern(None if cascade_conflicts is None
+                                        else json.dumps(cascade_conflicts, ensure_ascii=False)))
+        columns['c_raw'].append(intern(comp_data.get('raw_css')))
+        columns['c_error'].append(intern(comp_data.get('error')))
+
+        for selector, properties in css_rules.items():
+            chain = at_rules.get(selector, ()) if at_rules else ()
+            columns['r_sel'].append(intern(selector))
+            columns['r_decl0'].append(len(columns['d_prop']))
+            columns['r_decls'].append(len(properties))
+            columns['r_at0'].append(len(columns['at_rules']))
+            columns['r_ats'].append(len(chain))
+            columns['at_rules'].extend(intern(a) for a in chain)
+            for prop_name, prop_value in properties.items():
+                columns['d_prop'].append(intern(prop_name))
+                columns['d_value'].append(intern(prop_value))
+
+    string_offsets, string_blob = strings.sections()
+    sections: List[Tuple[str, bytes]] = [
+        ('meta', json.dumps(metadata, ensure_ascii=False).encode('utf-8')),
+        ('s_offset', _to_bytes(string_offsets)),
+        ('s_blob', string_blob),
+    ]
+    sections += [(name, _to_bytes(values)) for name, values in columns.items()]
+
+    header_size = len(MAGIC) + 4 + _DIRECTORY_ENTRY.size * len(sections)
+    directory = []
+    offset = _align(header_size)
+    for name, payload in sections:
+        directory.append(_DIRECTORY_ENTRY.pack(name.encode('ascii'), offset, len(payload)))
+        offset = _align(offset + len(payload))
+
+    with open(output_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(sections)) + b''.join(directory))
+        for name, payload in sections:
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(payload)
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array('I', values)
+        values.byteswap()
+    return values.tobytes()
+
+def is_snapshot(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+class SnapshotResults(Mapping):
+    """Lazy, read-only {component_name: component_data} view over a snapshot
+
+    Only the directory is read up front; the metadata and the string table
+    are decoded on first use, and a component's rules when it is accessed.
+    raw_css is left out unless include_raw_css is set, since none of the
+    readers (CSV export, summary, aggregates) use it.
+    """
+
+    def __init__(self, path: str, include_raw_css: bool = False):
+        self.path = path
+        self.include_raw_css = include_raw_css
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if self._view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a CSS snapshot")
+        count, = struct.unpack_from('<I', self._map, len(MAGIC))
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, length = _DIRECTORY_ENTRY.unpack_from(self._map, len(MAGIC) + 4 + i * _DIRECTORY_ENTRY.size)
+            self._sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        self._columns: Dict[str, memoryview] = {}
+        # Decoded strings by id, filled in on first use
+        self._strings: List[Optional[str]] = [None] * (self._sections['s_offset'][1] // 4 - 1)
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._positions: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        for column in self._columns.values():
+            column.release()
+        self._columns = {}
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> 'SnapshotResults':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def _column(self, name: str) -> memoryview:
+        column = self._columns.get(name)
+        if column is None:
+            column = self._section(name).cast('I')
+            if sys.byteorder != 'little':
+                swapped = array('I', column)
+                swapped.byteswap()
+                column = memoryview(swapped)
+            self._columns[name] = column
+        return column
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        value = self._strings[string_id]
+        if value is None:
+            offsets = self._column('s_offset')
+            blob_offset = self._sections['s_blob'][0]
+            value = str(self._map[blob_offset + offsets[string_id]:blob_offset + offsets[string_id + 1]], 'utf-8')
+            self._strings[string_id] = value
+        return value
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = json.loads(bytes(self._section('meta')))
+        return self._metadata
+
+    @property
+    def _index(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {self._string(string_id): i for i, string_id in enumerate(self._column('c_name'))}
+        return self._positions
+
+    def _component(self, position: int) -> Dict[str, Any]:
+        string, strings = self._string, self._strings
+        column = self._column
+        flags = column('c_flags')[position]
+        r_sel, r_decl0, r_decls = column('r_sel'), column('r_decl0'), column('r_decls')
+        d_prop, d_value = column('d_prop'), column('d_value')
+        first_rule = column('c_rule0')[position]
+
+        css_rules = {}
+        at_rules = {}
+        for rule in range(first_rule, first_rule + column('c_rules')[position]):
+            start = r_decl0[rule]
+            selector = string(r_sel[rule])
+            # Hot loop: hit the decoded-string cache directly, falling back to _string
+            css_rules[selector] = {
+                (strings[d_prop[d]] or string(d_prop[d])): (strings[d_value[d]] or string(d_value[d]))
+                for d in range(start, start + r_decls[rule])
+            }
+            if flags & HAS_AT_RULES:
+                chain_count = column('r_ats')[rule]
+                if chain_count:
+                    chain_start = column('r_at0')[rule]
+                    at_column = column('at_rules')
+                    at_rules[selector] = [string(at_column[a]) for a in range(chain_start, chain_start + chain_count)]
+
+        component = {
+            'file_path': string(column('c_file')[position]),
+            'relative_path': string(column('c_rel')[position]),
+            'component_name': string(column('c_name')[position]),
+            'has_styles': bool(flags & HAS_STYLES),
+            'css_rules': css_rules,
+        }
+        if flags & HAS_AT_RULES:
+            component['at_rules'] = at_rules
+        if flags & HAS_STYLE_BLOCKS:
+            component['style_blocks'] = json.loads(string(column('c_blocks')[position]))
+        if flags & HAS_UNUSED_SELECTORS:
+            component['unused_selectors'] = json.loads(string(column('c_unused')[position]))
+        if flags & HAS_CASCADE_CONFLICTS:
+            component['cascade_conflicts'] = json.loads(string(column('c_casc')[position]))
+        if flags & HAS_RAW_CSS and self.include_raw_css:
+            component['raw_css'] = string(column('c_raw')[position])
+        if flags & HAS_ERROR:
+            component['error'] = string(column('c_error')[position])
+        return component
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self._component(self._index[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._column('c_name'))
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for position in range(len(self)):
+            component = self._component(position)
+            yield component['component_name'], component
+
+    def values(self) -> Iterator[Dict[str, Any]]:
+        return (component for _, component in self.items())
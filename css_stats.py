@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Aggregate statistics for the summary report, computed on integer ids.
+Builds on the occurrence data CSSAggregates gathers (components and
+properties as integer ids, CSR property lists) and computes top-k lists,
+percentiles, per-property component counts, property co-occurrence and
+per-directory rollups. NumPy is used when it is installed; otherwise the
+same results come from a pure-Python fallback.
+"""
+
+import heapq
+from array import array
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from css_aggregates import CSSAggregates
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python paths give identical results
+    np = None
+
+# Rows of the dense block used for the co-occurrence product (NumPy backend)
+COOCCURRENCE_CHUNK = 8192
+
+class DirectoryRollup(NamedTuple):
+    directory: str
+    components: int
+    styled: int
+    rules: int
+
+def component_directory(relative_path: str) -> str:
+    """Directory a component is grouped under in the report ('root' for top-level files)"""
+    directory, sep, _ = relative_path.rpartition('/')
+    return directory if sep else 'root'
+
+class AggregateStats:
+    def __init__(self, aggregates: CSSAggregates, use_numpy: bool = True):
+        self.use_numpy = use_numpy and np is not None
+        self.property_names = aggregates.property_names
+        self.occurrence_ptr = aggregates.occurrence_ptr
+        self.occurrence_props = aggregates.occurrence_props
+
+        styled = aggregates.styled_components
+        self.styled_names = [c.name for c in styled]
+        self.rule_counts = array('l', (c.rule_count for c in styled))
+        self.unique_counts = array('l', (c.unique_properties for c in styled))
+
+        # Directory id of every component, in aggregates.components order
+        self.directories: List[str] = []
+        directory_ids: Dict[str, int] = {}
+        self.component_directories = array('l')
+        self.component_styled = array('l')
+        self.component_rules = array('l')
+        for c in aggregates.components:
+            directory = component_directory(c.relative_path)
+            directory_id = directory_ids.get(directory)
+            if directory_id is None:
+                directory_id = directory_ids[directory] = len(self.directories)
+                self.directories.append(directory)
+            self.component_directories.append(directory_id)
+            self.component_styled.append(c.has_styles)
+            self.component_rules.append(c.rule_count)
+
+    @property
+    def backend(self) -> str:
+        return 'numpy' if self.use_numpy else 'python'
+
+    def top_k(self, values: Sequence[int], k: int) -> List[int]:
+        """Indices of the k largest values, ties in index order (like a stable reverse sort)"""
+        if self.use_numpy:
+            return np.argsort(-np.asarray(values, dtype=np.int64), kind='stable')[:k].tolist()
+        return heapq.nlargest(k, range(len(values)), key=values.__getitem__)
+
+    def most_rules(self, k: int) -> List[Tuple[str, int]]:
+        """Styled components with the most CSS rules"""
+        return [(self.styled_names[i], self.rule_counts[i]) for i in self.top_k(self.rule_counts, k)]
+
+    def most_diverse(self, k: int) -> List[Tuple[str, int]]:
+        """Styled components with the most unique properties"""
+        return [(self.styled_names[i], self.unique_counts[i]) for i in self.top_k(self.unique_counts, k)]
+
+    def property_component_counts(self) -> Sequence[int]:
+        """Number of styled components using each property, by property id"""
+        if self.use_numpy:
+            return np.bincount(np.asarray(self.occurrence_props, dtype=np.int64),
+                               minlength=len(self.property_names)).tolist()
+        counts = [0] * len(self.property_names)
+        for prop_id in self.occurrence_props:
+            counts[prop_id] += 1
+        return counts
+
+    def percentiles(self, values: Sequence[int], percents: Sequence[float]) -> List[float]:
+        """Linearly interpolated percentiles (NumPy's default method); zeros when empty"""
+        if not len(values):
+            return [0.0] * len(percents)
+        if self.use_numpy:
+            return np.percentile(np.asarray(values, dtype=np.float64), percents).tolist()
+        ordered = sorted(values)
+        result = []
+        for percent in percents:
+            position = (len(ordered) - 1) * percent / 100
+            low = int(position)
+            high = min(low + 1, len(ordered) - 1)
+            result.append(ordered[low] + (ordered[high] - ordered[low]) * (position - low))
+        return result
+
+    def cooccurrence(self, k: int) -> List[Tuple[str, str, int]]:
+        """The k property pairs set together by the most styled components
+
+        Ties are broken by property id pair, so both backends agree.
+        """
+        names = self.property_names
+        count = len(names)
+        if count < 2:
+            return []
+        if self.use_numpy:
+            pairs = self._cooccurrence_numpy(count)
+            upper = np.triu_indices(count, 1)
+            pair_counts = pairs[upper]
+            order = np.argsort(-pair_counts, kind='stable')[:k]
+            return [(names[upper[0][i]], names[upper[1][i]], int(pair_counts[i]))
+                    for i in order.tolist() if pair_counts[i] > 0]
+
+        # One bitset of components per property; a pair's count is the popcount of their intersection
+        bits = [bytearray((len(self.occurrence_ptr) + 6) // 8) for _ in range(count)]
+        ptr, props = self.occurrence_ptr, self.occurrence_props
+        for c in range(len(ptr) - 1):
+            byte, bit = c >> 3, 1 << (c & 7)
+            for prop_id in props[ptr[c]:ptr[c + 1]]:
+                bits[prop_id][byte] |= bit
+        sets = [int.from_bytes(b, 'little') for b in bits]
+        pair_counts = ((low * count + high, (sets[low] & sets[high]).bit_count())
+                       for low in range(count) for high in range(low + 1, count))
+        top = heapq.nlargest(k, pair_counts, key=lambda item: (item[1], -item[0]))
+        return [(names[pair // count], names[pair % count], n) for pair, n in top if n]
+
+    def _cooccurrence_numpy(self, count: int):
+        """Property x property co-occurrence counts as X^T X over dense row blocks"""
+        ptr = np.asarray(self.occurrence_ptr, dtype=np.int64)
+        props = np.asarray(self.occurrence_props, dtype=np.int64)
+        rows = np.repeat(np.arange(len(ptr) - 1), np.diff(ptr))
+        pairs = np.zeros((count, count), dtype=np.float64)
+        for start in range(0, len(ptr) - 1, COOCCURRENCE_CHUNK):
+            lo, hi = ptr[start], ptr[min(start + COOCCURRENCE_CHUNK, len(ptr) - 1)]
+            if lo == hi:
+                continue
+            block = np.zeros((COOCCURRENCE_CHUNK, count), dtype=np.float32)
+            block[rows[lo:hi] - start, props[lo:hi]] = 1
+            pairs += block.T @ block
+        return pairs
+
+    def directory_rollups(self) -> Dict[str, DirectoryRollup]:
+        """Component, styled component and rule totals per directory"""
+        size = len(self.directories)
+        if self.use_numpy:
+            ids = np.asarray(self.component_directories, dtype=np.int64)
+            components = np.bincount(ids, minlength=size).tolist()
+            styled = np.bincount(ids, weights=np.asarray(self.component_styled), minlength=size).astype(np.int64).tolist()
+            rules = np.bincount(ids, weights=np.asarray(self.component_rules), minlength=size).astype(np.int64).tolist()
+        else:
+            components, styled, rules = [0] * size, [0] * size, [0] * size
+            for directory_id, has_styles, rule_count in zip(self.component_directories, self.component_styled,
+                                                            self.component_rules):
+                components[directory_id] += 1
+                styled[directory_id] += has_styles
+                rules[directory_id] += rule_count
+        return {directory: DirectoryRollup(directory, components[i], styled[i], rules[i])
+                for i, directory in enumerate(self.directories)}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Style block location for Svelte components.
+Files are scanned as bytes (memory-mapped when large) for every
+<style ...>...</style> block; only the byte ranges inside those blocks are
+decoded, so script and markup never become Python strings. read_component()
+also indexes the markup around the blocks (css_markup) from the same bytes.
+"""
+
+import mmap
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Tuple, TypeVar, Union
+
+from css_markup import MarkupIndex, index_markup
+from css_patterns import STYLE_ATTRIBUTE, STYLE_CLOSE_TAG, STYLE_OPEN_TAG
+
+# Files at least this big are memory-mapped instead of read
+MMAP_THRESHOLD = 1 << 20
+
+_ASCII_WHITESPACE = b' \t\n\r\f\v'
+
+AttributeValue = Union[str, bool]
+
+class StyleBlock(NamedTuple):
+    start: int                      # byte offset of the block's content (after the opening tag)
+    end: int                        # byte offset of the closing tag
+    line: int                       # 1-based line of the opening tag
+    attributes: Dict[str, AttributeValue]
+
+    def describe(self) -> Dict[str, object]:
+        """JSON-friendly form stored in the extractor output"""
+        return {'line': self.line, 'offset': self.start, 'length': self.end - self.start,
+                'attributes': self.attributes}
+
+def parse_style_attributes(raw: bytes) -> Dict[str, AttributeValue]:
+    """Attributes of an opening tag; bare attributes such as `global` map to True"""
+    attributes: Dict[str, AttributeValue] = {}
+    for match in STYLE_ATTRIBUTE.finditer(raw):
+        name = match.group(1).decode('utf-8', 'replace')
+        value = next((v for v in match.group(2, 3, 4) if v is not None), None)
+        attributes[name] = True if value is None else value.decode('utf-8', 'replace')
+    return attributes
+
+# Slice size used to count newlines in an mmap without copying the whole file
+_COUNT_CHUNK = 1 << 20
+
+def _count_newlines(data, start: int, end: int) -> int:
+    if isinstance(data, bytes):
+        return data.count(b'\n', start, end)
+    return sum(data[pos:min(pos + _COUNT_CHUNK, end)].count(b'\n') for pos in range(start, end, _COUNT_CHUNK))
+
+def locate_style_blocks(data) -> List[StyleBlock]:
+    """Find every terminated style block in bytes or an mmap, by offset"""
+    blocks = []
+    pos = 0
+    line = 1
+    line_pos = 0
+    while True:
+        match = STYLE_OPEN_TAG.search(data, pos)
+        if match is None:
+            break
+        end = data.find(STYLE_CLOSE_TAG, match.end())
+        if end < 0:
+            break
+        line += _count_newlines(data, line_pos, match.start())
+        line_pos = match.start()
+        blocks.append(StyleBlock(match.end(), end, line, parse_style_attributes(match.group(1))))
+        pos = end + len(STYLE_CLOSE_TAG)
+    return blocks
+
+def decode_block(data, block: StyleBlock) -> str:
+    """Decode a block's content with surrounding whitespace removed"""
+    start, end = block.start, block.end
+    # Trim ASCII whitespace on the bytes so the decoded string is not copied again
+    while start < end and data[start:start + 1] in _ASCII_WHITESPACE:
+        start += 1
+    while end > start and data[end - 1:end] in _ASCII_WHITESPACE:
+        end -= 1
+    text = data[start:end].decode('utf-8')
+    if text and (text[0].isspace() or text[-1].isspace()):
+        # Non-ASCII whitespace, which str.strip() also removes
+        text = text.strip()
+    return text
+
+_T = TypeVar('_T')
+
+def _with_file_data(file_path: Path, read: Callable[[object], _T]) -> _T:
+    """Call read() with the file's bytes, or an mmap of it when large"""
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size < MMAP_THRESHOLD:
+            return read(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return read(data)
+
+def _decode_blocks(data) -> List[Tuple[StyleBlock, str]]:
+    return [(block, decode_block(data, block)) for block in locate_style_blocks(data)]
+
+def read_style_blocks(file_path: Path) -> List[Tuple[StyleBlock, str]]:
+    """Every style block of a file with its decoded, stripped content"""
+    return _with_file_data(file_path, _decode_blocks)
+
+def _decode_blocks_and_markup(data) -> Tuple[List[Tuple[StyleBlock, str]], MarkupIndex]:
+    blocks = _decode_blocks(data)
+    return blocks, index_markup(data, [block for block, _ in blocks])
+
+def read_component(file_path: Path) -> Tuple[List[Tuple[StyleBlock, str]], MarkupIndex]:
+    """read_style_blocks() plus the index of the markup outside the blocks"""
+    return _with_file_data(file_path, _decode_blocks_and_markup)
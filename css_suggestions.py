@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Design-token suggestions for hard-coded values.
+Token definitions from the global stylesheets (app.css and css/*.css) are
+resolved through var() aliases and normalised: hex, rgb() and hsl() colours
+become one canonical rgba() form and px/rem lengths one px form. The result
+is a hash index from normalised value to tokens, so every literal in the
+extracted rules is matched with a dict lookup in one pass over the
+declarations. Suggestions are written as a CSV ranked by how many
+declarations each replacement would cover.
+"""
+
+import argparse
+import colorsys
+import csv
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from css_parser import parse_stylesheet
+from css_patterns import COLOR_FUNCTION, HEX_COLOR, LENGTH, NUMBER
+from css_results import load_results
+from css_tokens import default_stylesheets
+
+# 1rem in px, as with the browser default font size (app.css keeps html at 100%)
+REM_PX = 16.0
+
+NAMED_COLORS = {
+    'black': (0, 0, 0, 1.0),
+    'white': (255, 255, 255, 1.0),
+}
+
+FONT_WEIGHT_KEYWORDS = {'normal': '400', 'bold': '700'}
+
+# Unitless numbers are only matched for these properties; elsewhere (z-index, flex, opacity...)
+# an equal number is a coincidence rather than a missing token
+NUMBER_PROPERTIES = {'font-weight', 'line-height'}
+
+# Colour token prefixes preferred for a property (checked in order, by property prefix)
+COLOR_PREFIXES = (
+    ('background', ('--bg-',)),
+    ('border', ('--bdr-', '--border-')),
+    ('outline', ('--bdr-', '--border-')),
+    ('color', ('--fg-', '--text-')),
+    ('fill', ('--fg-',)),
+    ('stroke', ('--fg-',)),
+)
+
+# A length or number only gets a token of the same kind: 2px is a radius in border-radius and
+# a spacing step in padding. Kinds are recognised from token names...
+TOKEN_KINDS = (
+    ('radius', ('radius',)),
+    ('border-width', ('border-width', 'bdr-width', 'stroke-width')),
+    ('font-size', ('--fs-', 'font-size')),
+    ('font-weight', ('--fw-', 'font-weight')),
+    ('line-height', ('--lh-', 'line-height', 'leading')),
+    ('spacing', ('--spc-', 'space', 'spacing', 'gap')),
+)
+# ...and properties map to the kind they take (checked in order, by property prefix)
+PROPERTY_KINDS = (
+    ('border-radius', 'radius'),
+    ('border-top-left-radius', 'radius'),
+    ('border-top-right-radius', 'radius'),
+    ('border-bottom-left-radius', 'radius'),
+    ('border-bottom-right-radius', 'radius'),
+    ('border', 'border-width'),
+    ('outline', 'border-width'),
+    ('font-size', 'font-size'),
+    ('font-weight', 'font-weight'),
+    ('line-height', 'line-height'),
+    ('margin', 'spacing'),
+    ('padding', 'spacing'),
+    ('gap', 'spacing'),
+    ('row-gap', 'spacing'),
+    ('column-gap', 'spacing'),
+    ('inset', 'spacing'),
+    ('top', 'spacing'),
+    ('right', 'spacing'),
+    ('bottom', 'spacing'),
+    ('left', 'spacing'),
+)
+
+# Definitions in these rules apply by default; theme overrides rank below them
+BASE_SELECTORS = (':root', 'html')
+
+class TokenCandidate(NamedTuple):
+    token: str
+    value: str          # resolved definition value
+    selector: str       # rule that defines it, e.g. :root or [data-theme='dark']
+
+class Suggestion(NamedTuple):
+    component: str
+    selector: str
+    property: str
+    value: str
+    literal: str        # the part of the value a token would replace
+    token: str
+    token_value: str
+    defined_in: str
+    alternatives: Tuple[str, ...]
+    file_path: str
+
+def _clamp_byte(value: float) -> int:
+    return max(0, min(255, int(round(value))))
+
+def _format_color(r: float, g: float, b: float, a: float) -> str:
+    alpha = f"{max(0.0, min(1.0, a)):.3f}".rstrip('0').rstrip('.')
+    return f"rgba({_clamp_byte(r)},{_clamp_byte(g)},{_clamp_byte(b)},{alpha or '0'})"
+
+def _channel(text: str, scale: float) -> float:
+    """A colour channel or alpha: a number, or a percentage of scale"""
+    if text.endswith('%'):
+        return float(text[:-1]) * scale / 100
+    return float(text)
+
+def _hue(text: str) -> float:
+    for unit, factor in (('deg', 1.0), ('turn', 360.0), ('grad', 0.9), ('rad', 57.29577951308232)):
+        if text.endswith(unit):
+            return float(text[:-len(unit)]) * factor
+    return float(text)
+
+def normalize_color(text: str) -> Optional[str]:
+    """Canonical rgba(r,g,b,a) for a hex, rgb()/rgba(), hsl()/hsla() or basic named colour"""
+    text = text.strip().lower()
+    if text in NAMED_COLORS:
+        return _format_color(*NAMED_COLORS[text])
+    match = HEX_COLOR.fullmatch(text)
+    if match:
+        digits = match.group(1)
+        if len(digits) in (3, 4):
+            digits = ''.join(d * 2 for d in digits)
+        channels = [int(digits[i:i + 2], 16) for i in range(0, len(digits), 2)]
+        alpha = channels[3] / 255 if len(channels) == 4 else 1.0
+        return _format_color(channels[0], channels[1], channels[2], alpha)
+    match = COLOR_FUNCTION.fullmatch(text)
+    if not match:
+        return None
+    function, arguments = match.group(1), match.group(2)
+    color_part, _, alpha_part = arguments.partition('/')
+    parts = color_part.replace(',', ' ').split()
+    if alpha_part.strip():
+        parts.append(alpha_part.strip())
+    if len(parts) not in (3, 4):
+        return None
+    try:
+        alpha = _channel(parts[3], 1.0) if len(parts) == 4 else 1.0
+        if function.startswith('rgb'):
+            r, g, b = (_channel(p, 255.0) for p in parts[:3])
+        else:
+            hue = _hue(parts[0]) % 360
+            saturation = _channel(parts[1], 1.0) / (100 if not parts[1].endswith('%') else 1)
+            lightness = _channel(parts[2], 1.0) / (100 if not parts[2].endswith('%') else 1)
+            r, g, b = (c * 255 for c in colorsys.hls_to_rgb(hue / 360, lightness, saturation))
+    except ValueError:
+        return None
+    return _format_color(r, g, b, alpha)
+
+def normalize_length(text: str) -> Optional[str]:
+    """Canonical px form of a non-zero px or rem length"""
+    match = LENGTH.fullmatch(text.strip().lower())
+    if not match:
+        return None
+    number = float(match.group(1))
+    if number == 0:
+        return None
+    px = number * REM_PX if match.group(2) == 'rem' else number
+    return f"{px:g}px"
+
+def normalize_number(text: str, prop_name: Optional[str] = None) -> Optional[str]:
+    text = text.strip().lower()
+    if prop_name == 'font-weight':
+        text = FONT_WEIGHT_KEYWORDS.get(text, text)
+    if not NUMBER.fullmatch(text):
+        return None
+    return f"number:{float(text):g}"
+
+def normalize_component(text: str, prop_name: Optional[str] = None) -> Optional[str]:
+    """Hash key of one value component, or None when it is not a colour, length or number"""
+    return normalize_color(text) or normalize_length(text) or normalize_number(text, prop_name)
+
+def split_value(value: str) -> List[str]:
+    """Split a declaration value on top-level spaces, commas and slashes, keeping functions whole"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(value):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth = max(0, depth - 1)
+        elif depth == 0 and (char.isspace() or char in ',/'):
+            if i > start:
+                parts.append(value[start:i])
+            start = i + 1
+    if len(value) > start:
+        parts.append(value[start:])
+    return parts
+
+def normalize_value(value: str, prop_name: Optional[str] = None) -> str:
+    """Key of a whole value: its components normalised where possible, joined by single spaces"""
+    return ' '.join(normalize_component(part, prop_name) or part.lower() for part in split_value(value))
+
+def _color_prefixes(prop_name: str) -> Tuple[str, ...]:
+    for prefix, token_prefixes in COLOR_PREFIXES:
+        if prop_name.startswith(prefix):
+            return token_prefixes
+    return ()
+
+def token_kind(token: str) -> Optional[str]:
+    for kind, markers in TOKEN_KINDS:
+        if any(marker in token for marker in markers):
+            return kind
+    return None
+
+def _kind_prefixes(kind: Optional[str]) -> Tuple[str, ...]:
+    """Name prefixes of tokens that are primarily of a kind, e.g. --space-4 rather than --content-spacing"""
+    markers = dict(TOKEN_KINDS).get(kind, ())
+    return tuple('--' + marker.lstrip('-') for marker in markers)
+
+def property_kind(prop_name: str) -> Optional[str]:
+    for prefix, kind in PROPERTY_KINDS:
+        if prop_name.startswith(prefix):
+            return kind
+    return None
+
+class TokenValueIndex:
+    """Normalised value -> tokens defining it, from global stylesheets"""
+
+    def __init__(self):
+        self.by_value: Dict[str, List[TokenCandidate]] = defaultdict(list)
+        # (key, property, same_kind) -> ranked candidates, filled on first use
+        self._ranked: Dict[Tuple[str, str, bool], List[TokenCandidate]] = {}
+
+    @classmethod
+    def from_stylesheets(cls, stylesheets: Iterable[Path]) -> 'TokenValueIndex':
+        # token -> [(selector, value)] in source order
+        definitions: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        for path in stylesheets:
+            for rule in parse_stylesheet(Path(path).read_text(encoding='utf-8')):
+                for prop_name, prop_value in rule.declarations:
+                    if prop_name.startswith('--'):
+                        definitions[prop_name].append((rule.key, prop_value))
+        index = cls()
+        for token, entries in definitions.items():
+            for selector, value in entries:
+                resolved = _resolve(value, selector, definitions)
+                if resolved is not None:
+                    index.add(TokenCandidate(token, resolved, selector))
+        return index
+
+    def add(self, candidate: TokenCandidate) -> None:
+        candidates = self.by_value[normalize_value(candidate.value)]
+        if candidate not in candidates:
+            candidates.append(candidate)
+
+    def candidates(self, key: str, prop_name: str, same_kind: bool = False) -> List[TokenCandidate]:
+        """Tokens for a normalised value, best first for this property
+
+        With same_kind, only tokens whose name marks them as the kind of value
+        the property takes (radius, spacing, font size...) are returned.
+        """
+        ranked = self._ranked.get((key, prop_name, same_kind))
+        if ranked is None:
+            candidates = self.by_value.get(key, ())
+            kind = property_kind(prop_name)
+            if same_kind:
+                candidates = [c for c in candidates if kind is not None and token_kind(c.token) == kind]
+            prefixes = _color_prefixes(prop_name) + _kind_prefixes(kind)
+            ranked = sorted(candidates, key=lambda c: (
+                not any(c.token.startswith(p) for p in prefixes),
+                c.selector not in BASE_SELECTORS,
+                c.token,
+            ))
+            self._ranked[(key, prop_name, same_kind)] = ranked
+        return ranked
+
+def _resolve(value: str, selector: str, definitions: Dict[str, List[Tuple[str, str]]],
+             depth: int = 0) -> Optional[str]:
+    """Follow var(--alias) definitions to a literal value, preferring the same rule, then :root"""
+    value = value.strip()
+    if not value.startswith('var(') or not value.endswith(')'):
+        return None if 'var(' in value else value
+    if depth > 10:
+        return None
+    name, _, fallback = value[4:-1].partition(',')
+    entries = definitions.get(name.strip())
+    if not entries:
+        return _resolve(fallback, selector, definitions, depth + 1) if fallback.strip() else None
+    chosen = next((v for s, v in entries if s == selector), None)
+    if chosen is None:
+        chosen = next((v for s, v in entries if s in BASE_SELECTORS), entries[0][1])
+    return _resolve(chosen, selector, definitions, depth + 1)
+
+def suggest_tokens(components: Iterable[Tuple[str, Dict[str, Any]]], index: TokenValueIndex) -> List[Suggestion]:
+    """One pass over every declaration, matching the whole value, then each literal part"""
+    suggestions = []
+    # The same declarations recur across components; match each distinct one once
+    matched: Dict[Tuple[str, str], List[Tuple[str, List[TokenCandidate]]]] = {}
+    for comp_name, comp_data in components:
+        if not comp_data.get('has_styles', False):
+            continue
+        file_path = comp_data.get('relative_path', '')
+        for selector, properties in comp_data.get('css_rules', {}).items():
+            for prop_name, prop_value in properties.items():
+                if prop_name.startswith('--'):
+                    continue
+                matches = matched.get((prop_name, prop_value))
+                if matches is None:
+                    matches = matched[(prop_name, prop_value)] = _match_declaration(prop_name, prop_value, index)
+                for literal, candidates in matches:
+                    best = candidates[0]
+                    alternatives = tuple(c.token for c in candidates[1:] if c.token != best.token)
+                    suggestions.append(Suggestion(comp_name, selector, prop_name, prop_value, literal,
+                                                  best.token, best.value, best.selector,
+                                                  tuple(dict.fromkeys(alternatives)), file_path))
+    return suggestions
+
+def _match_declaration(prop_name: str, prop_value: str, index: TokenValueIndex) -> List[Tuple[str, List[TokenCandidate]]]:
+    parts = split_value(prop_value)
+    if len(parts) > 1:
+        whole = index.candidates(normalize_value(prop_value, prop_name), prop_name)
+        if whole:
+            return [(prop_value, whole)]
+    matches = []
+    for part in parts:
+        if part.startswith('var('):
+            continue
+        key = normalize_color(part)
+        if key is not None:
+            candidates = index.candidates(key, prop_name)
+        else:
+            key = normalize_length(part)
+            if key is None and prop_name in NUMBER_PROPERTIES:
+                key = normalize_number(part, prop_name)
+            if key is None:
+                continue
+            candidates = index.candidates(key, prop_name, same_kind=True)
+        if candidates:
+            matches.append((part, candidates))
+    return matches
+
+def rank_suggestions(suggestions: List[Suggestion]) -> List[Tuple[int, int, Suggestion]]:
+    """(rank, occurrences, suggestion), grouping by replacement (literal -> token), most common first"""
+    groups = Counter((s.literal, s.token) for s in suggestions)
+    ranks = {group: rank for rank, (group, _) in enumerate(
+        sorted(groups.items(), key=lambda item: (-item[1], item[0])), 1)}
+    ranked = sorted(suggestions, key=lambda s: (ranks[(s.literal, s.token)], s.component, s.selector, s.property))
+    return [(ranks[(s.literal, s.token)], groups[(s.literal, s.token)], s) for s in ranked]
+
+def write_suggestions_csv(suggestions: List[Suggestion], csv_path: str) -> None:
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Rank', 'Occurrences', 'Literal', 'Suggested Token', 'Token Value', 'Defined In',
+                         'Alternatives', 'Component', 'Selector', 'Property', 'Value', 'File Path'])
+        for rank, occurrences, s in rank_suggestions(suggestions):
+            writer.writerow([rank, occurrences, s.literal, s.token, s.token_value, s.defined_in,
+                             '; '.join(s.alternatives), s.component, s.selector, s.property, s.value, s.file_path])
+
+def print_top_suggestions(suggestions: List[Suggestion], top: int = 15) -> None:
+    groups = Counter((s.literal, s.token) for s in suggestions)
+    print(f"\n=== TOKEN SUGGESTIONS ({len(suggestions)} declarations, {len(groups)} replacements) ===")
+    for i, ((literal, token), count) in enumerate(sorted(groups.items(), key=lambda item: (-item[1], item[0]))[:top], 1):
+        print(f"{i:2d}. {literal} -> var({token}): {count} declarations")
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest design tokens for hard-coded values in extracted CSS")
+    parser.add_argument('results', help="Results from css_extractor.py (.json, .jsonl or snapshot)")
+    parser.add_argument('--css', nargs='*', type=Path,
+                        help="Global stylesheets with token definitions (default: app.css and css/*.css "
+                             "next to the components tree)")
+    parser.add_argument('--csv', default="token_suggestions.csv", help="Where to write the ranked suggestions")
+    parser.add_argument('--top', type=int, default=15, help="Replacements to print")
+    args = parser.parse_args()
+
+    data = load_results(args.results)
+    stylesheets = args.css
+    if stylesheets is None:
+        first = next(iter(data['components'].values()), None)
+        base = Path(first['file_path']).parent if first else Path('.')
+        stylesheets = default_stylesheets(str(base))
+    index = TokenValueIndex.from_stylesheets(stylesheets)
+    suggestions = suggest_tokens(data['components'].items(), index)
+    write_suggestions_csv(suggestions, args.csv)
+    print(f"Stylesheets indexed: {len(stylesheets)} ({len(index.by_value)} distinct token values)")
+    print_top_suggestions(suggestions, args.top)
+    print(f"\nSuggestions written to {args.csv}")
+
+if __name__ == "__main__":
+    main()
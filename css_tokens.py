@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Design-token (CSS custom property) index.
+Maps every custom property to its definitions (in components and in the
+global stylesheets such as frontend/src/app.css and frontend/src/css/*.css)
+and to its usages (component, selector, property, fallback), with O(1)
+reverse lookups, unused/undefined reports and per-component updates.
+"""
+
+import argparse
+import csv
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from css_parser import parse_stylesheet
+from css_patterns import VAR_CALL
+from css_results import load_results
+
+class TokenDefinition(NamedTuple):
+    token: str
+    value: str
+    source: str      # component name or stylesheet path
+    selector: str
+
+class TokenUsage(NamedTuple):
+    token: str
+    component: str
+    selector: str
+    property: str
+    value: str
+    fallback: Optional[str]
+
+def iter_var_references(value: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """Yield (token, fallback) for every var() in a value, including ones nested in fallbacks"""
+    pos = 0
+    while True:
+        match = VAR_CALL.search(value, pos)
+        if match is None:
+            return
+        depth = 1
+        fallback_start = None
+        i = match.end()
+        while i < len(value) and depth:
+            char = value[i]
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == ',' and depth == 1 and fallback_start is None:
+                fallback_start = i + 1
+            i += 1
+        end = i - 1 if depth == 0 else i
+        fallback = value[fallback_start:end].strip() if fallback_start is not None else None
+        yield match.group(1), fallback or None
+        # Continue inside the call so var()s in the fallback are reported too
+        pos = match.end()
+
+def default_stylesheets(base_path: str) -> List[Path]:
+    """Find app.css and css/*.css in the nearest ancestor of base_path that has an app.css"""
+    base = Path(base_path).resolve()
+    for directory in [base] + list(base.parents):
+        app_css = directory / "app.css"
+        if app_css.is_file():
+            return [app_css] + sorted((directory / "css").glob("*.css"))
+    return []
+
+class TokenIndex:
+    def __init__(self):
+        # token -> source -> entries, so a component can be replaced without a rescan
+        self.definitions: Dict[str, Dict[str, List[TokenDefinition]]] = defaultdict(dict)
+        self.usages: Dict[str, Dict[str, List[TokenUsage]]] = defaultdict(dict)
+        # source -> tokens it defines / uses
+        self._defined_by: Dict[str, Set[str]] = {}
+        self._used_by: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def build(cls, components: Iterable[Tuple[str, Dict[str, Any]]],
+              stylesheets: Iterable[Path] = ()) -> 'TokenIndex':
+        index = cls()
+        for path in stylesheets:
+            index.add_stylesheet(path)
+        for comp_name, comp_data in components:
+            index.add_component(comp_name, comp_data)
+        return index
+
+    def add_stylesheet(self, path: Path) -> None:
+        """Index custom property definitions and var() usages from a global stylesheet
+
+        Usages matter for aliases such as --text-primary: var(--color-neutral-900),
+        which keep the referenced token from being reported unused.
+        """
+        source = str(path)
+        self._remove_source(source)
+        definitions, usages = [], []
+        for rule in parse_stylesheet(Path(path).read_text(encoding='utf-8')):
+            selector = rule.key
+            for prop_name, prop_value in rule.declarations:
+                if prop_name.startswith('--'):
+                    definitions.append(TokenDefinition(prop_name, prop_value, source, selector))
+                if 'var(' in prop_value:
+                    for token, fallback in iter_var_references(prop_value):
+                        usages.append(TokenUsage(token, source, selector, prop_name, prop_value, fallback))
+        self._add_source(source, definitions, usages)
+
+    def add_component(self, comp_name: str, comp_data: Dict[str, Any]) -> None:
+        """Index (or re-index) one component's definitions and var() usages"""
+        self._remove_source(comp_name)
+        definitions, usages = [], []
+        for selector, properties in comp_data.get('css_rules', {}).items():
+            for prop_name, prop_value in properties.items():
+                if prop_name.startswith('--'):
+                    definitions.append(TokenDefinition(prop_name, prop_value, comp_name, selector))
+                if 'var(' in prop_value:
+                    for token, fallback in iter_var_references(prop_value):
+                        usages.append(TokenUsage(token, comp_name, selector, prop_name, prop_value, fallback))
+        self._add_source(comp_name, definitions, usages)
+
+    def remove_component(self, comp_name: str) -> None:
+        self._remove_source(comp_name)
+
+    def source_entries(self, source: str) -> Tuple[Counter, Counter]:
+        """The definitions and usages indexed for one source, as multisets for comparison"""
+        definitions = Counter(d for token in self._defined_by.get(source, ())
+                              for d in self.definitions[token][source])
+        usages = Counter(u for token in self._used_by.get(source, ()) for u in self.usages[token][source])
+        return definitions, usages
+
+    def _add_source(self, source: str, definitions: List[TokenDefinition], usages: List[TokenUsage]) -> None:
+        for definition in definitions:
+            self.definitions[definition.token].setdefault(source, []).append(definition)
+        for usage in usages:
+            self.usages[usage.token].setdefault(source, []).append(usage)
+        self._defined_by[source] = {d.token for d in definitions}
+        self._used_by[source] = {u.token for u in usages}
+
+    def _remove_source(self, source: str) -> None:
+        for token in self._defined_by.pop(source, ()):
+            self.definitions[token].pop(source, None)
+            if not self.definitions[token]:
+                del self.definitions[token]
+        for token in self._used_by.pop(source, ()):
+            self.usages[token].pop(source, None)
+            if not self.usages[token]:
+                del self.usages[token]
+
+    def definitions_of(self, token: str) -> List[TokenDefinition]:
+        return [d for entries in self.definitions.get(token, {}).values() for d in entries]
+
+    def usages_of(self, token: str) -> List[TokenUsage]:
+        return [u for entries in self.usages.get(token, {}).values() for u in entries]
+
+    def components_using(self, token: str) -> List[str]:
+        return list(self.usages.get(token, {}))
+
+    def tokens_used_by(self, comp_name: str) -> Set[str]:
+        return set(self._used_by.get(comp_name, ()))
+
+    def fallbacks_of(self, token: str) -> Set[str]:
+        return {u.fallback for u in self.usages_of(token) if u.fallback is not None}
+
+    def unused_tokens(self) -> List[str]:
+        """Tokens that are defined somewhere but never referenced through var()"""
+        return sorted(t for t in self.definitions if t not in self.usages)
+
+    def undefined_tokens(self) -> List[str]:
+        """Tokens referenced through var() but defined nowhere in the index"""
+        return sorted(t for t in self.usages if t not in self.definitions)
+
+    def write_csv(self, csv_path: str) -> None:
+        """One row per token: status, counts, fallbacks and where it is defined and used"""
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Token', 'Status', 'Definitions', 'Usages', 'Defined In', 'Used By', 'Fallbacks'])
+            for token in sorted(set(self.definitions) | set(self.usages)):
+                # Sorted so the file does not depend on the order components were (re)indexed in
+                defined_in = sorted(self.definitions.get(token, {}))
+                used_by = sorted(self.components_using(token))
+                if not used_by:
+                    status = 'unused'
+                elif not defined_in:
+                    status = 'undefined'
+                else:
+                    status = 'ok'
+                writer.writerow([
+                    token, status,
+                    len(self.definitions_of(token)), len(self.usages_of(token)),
+                    '; '.join(defined_in), '; '.join(used_by),
+                    '; '.join(sorted(self.fallbacks_of(token)))
+                ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Design-token usage index over CSS extraction results")
+    parser.add_argument('results', help="Results from css_extractor.py (.json or .jsonl)")
+    parser.add_argument('--css', nargs='*', type=Path,
+                        help="Global stylesheets with token definitions (default: app.css and css/*.css "
+                             "next to the components tree)")
+    parser.add_argument('--csv', help="Write the per-token index to this CSV file")
+    parser.add_argument('--token', help="Show definitions and usages of one token, e.g. fg-text-primary")
+    args = parser.parse_args()
+
+    data = load_results(args.results)
+    stylesheets = args.css
+    if stylesheets is None:
+        first = next(iter(data['components'].values()), None)
+        base = Path(first['file_path']).parent if first else Path('.')
+        stylesheets = default_stylesheets(str(base))
+    index = TokenIndex.build(data['components'].items(), stylesheets)
+
+    if args.token:
+        token = '--' + args.token.lstrip('-')
+        for definition in index.definitions_of(token):
+            print(f"defined  {definition.source} {definition.selector}: {definition.value}")
+        for usage in index.usages_of(token):
+            fallback = f" (fallback {usage.fallback})" if usage.fallback else ""
+            print(f"used     {usage.component} {usage.selector} {usage.property}: {usage.value}{fallback}")
+        return
+
+    if args.csv:
+        index.write_csv(args.csv)
+        print(f"Token index written to {args.csv}")
+    print(f"Stylesheets indexed: {len(stylesheets)}")
+    print(f"Tokens defined: {len(index.definitions)}, referenced: {len(index.usages)}")
+    undefined = index.undefined_tokens()
+    print(f"Undefined tokens ({len(undefined)}): {', '.join(undefined)}")
+    print(f"Unused tokens: {len(index.unused_tokens())}")
+
+if __name__ == "__main__":
+    main()
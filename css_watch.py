@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Watch mode for the CSS extractor.
+Polls the components tree for .svelte changes, re-runs extract_component_css
+only for the touched files and patches the extractor state and the CSV
+outputs. Rendered CSV rows are kept per component (and per property for the
+property matrix), so an update only re-renders the rows it affects, and only
+the files whose rows changed are rewritten from memory. The summary report's
+aggregates are kept per component too, with their totals patched by delta,
+and the report and token index are skipped when their inputs did not change.
+"""
+
+import csv
+import io
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from create_clean_summary import write_summary_report
+from css_aggregates import CSSAggregates
+from css_matrix import component_property_values
+from css_tokens import TokenIndex, default_stylesheets
+
+if TYPE_CHECKING:
+    from css_extractor import SvelteCSSExtractor
+
+# (size, mtime_ns) of a file when it was last extracted
+FileStamp = Tuple[int, int]
+
+def render_rows(rows: Iterable[List[Any]]) -> str:
+    """Render rows exactly as csv.writer writes them to a file"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+    return buffer.getvalue()
+
+class IncrementalAggregates:
+    """CSSAggregates of the summary report, kept per component with totals patched by delta"""
+
+    def __init__(self):
+        self.parts: Dict[str, CSSAggregates] = {}
+        self.property_usage: Counter = Counter()
+        # Number of components referencing each var(--token)
+        self.custom_property_refs: Counter = Counter()
+
+    def set(self, name: str, part: CSSAggregates) -> None:
+        self.discard(name)
+        self.parts[name] = part
+        self.property_usage.update(part.property_usage)
+        self.custom_property_refs.update(part.custom_properties)
+
+    def discard(self, name: str) -> None:
+        part = self.parts.pop(name, None)
+        if part is not None:
+            self.property_usage.subtract(part.property_usage)
+            self.custom_property_refs.subtract(part.custom_properties)
+
+    def aggregates(self, names: Iterable[str]) -> CSSAggregates:
+        """The aggregates CSSAggregates.collect would build for these components, in this order"""
+        aggregates = CSSAggregates()
+        for name in names:
+            part = self.parts[name]
+            aggregates.extend_components(part)
+            # Counts come from the running totals; only first-seen order (for most_common ties) is rebuilt
+            for prop_name in part.property_usage:
+                if prop_name not in aggregates.property_usage:
+                    aggregates.property_usage[prop_name] = self.property_usage[prop_name]
+        aggregates.custom_properties = {token for token, n in self.custom_property_refs.items() if n > 0}
+        return aggregates
+
+class IncrementalCSVOutputs:
+    """The six CSV exports, re-rendered per component instead of per run"""
+
+    HEADERS = {
+        'summary': ['Component', 'File Path', 'Has Styles', 'CSS Rules Count', 'Unique Properties Count'],
+        'detailed': ['Component', 'Selector', 'Property', 'Value', 'File Path'],
+        'tokens': ['Component', 'Selector', 'Property', 'Custom Property Used', 'Full Value', 'File Path'],
+        'unused_selectors': ['Component', 'Unused Selector', 'File Path'],
+    }
+    FILE_NAMES = {
+        'property_matrix': "css_properties_by_component.csv",
+        'component_matrix': "components_by_css_properties.csv",
+        'summary': "component_summary.csv",
+        'detailed': "detailed_css_rules.csv",
+        'tokens': "css_custom_properties.csv",
+        'unused_selectors': "unused_selectors.csv",
+    }
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.components: List[str] = []
+        self.properties: List[str] = []
+        self.cells: Dict[str, Dict[str, str]] = {}
+        self.styled: Dict[str, bool] = {}
+        # Rendered CSV text per component, and per property for the property matrix
+        self.blocks: Dict[str, Dict[str, str]] = {
+            kind: {} for kind in ('component_matrix', 'summary', 'detailed', 'tokens', 'unused_selectors')
+        }
+        self.property_lines: Dict[str, str] = {}
+        self.aggregates = IncrementalAggregates()
+        # Files whose rows changed since they were last written
+        self.stale: Set[str] = set(self.FILE_NAMES)
+
+    def update(self, components_data: Dict[str, Dict[str, Any]], css_properties: Set[str],
+               changed: Optional[Set[str]] = None, write: bool = True) -> Set[str]:
+        """Re-render the rows of the changed components (all of them when changed is None)
+
+        Returns the files whose content changed. With write=True those files
+        are rewritten; with write=False the rows are only kept for a later
+        write().
+        """
+        stale: Set[str] = set()
+        components = list(components_data)
+        properties = sorted(css_properties)
+        columns_changed = components != self.components
+        properties_changed = properties != self.properties
+        self.components, self.properties = components, properties
+
+        if changed is None:
+            changed = set(components)
+        for name in [n for n in self.styled if n not in components_data]:
+            changed.add(name)
+
+        affected_properties: Set[str] = set()
+        for name in changed:
+            affected_properties.update(self.cells.pop(name, {}))
+            self.styled.pop(name, None)
+            previous = {kind: blocks.pop(name, None) for kind, blocks in self.blocks.items()}
+            self.aggregates.discard(name)
+            if name in components_data:
+                affected_properties.update(self._render_component(name, components_data[name]))
+            for kind, blocks in self.blocks.items():
+                if blocks.get(name) != previous[kind]:
+                    stale.add(kind)
+
+        if properties_changed:
+            stale.update(('component_matrix', 'property_matrix'))
+            for name in components:
+                if self.styled[name]:
+                    self.blocks['component_matrix'][name] = self._component_matrix_line(name)
+        if columns_changed:
+            # Component order and membership are part of every file
+            stale.update(self.FILE_NAMES)
+
+        if columns_changed or properties_changed:
+            self.property_lines = {}
+            affected_properties = set(properties)
+        for prop in affected_properties:
+            previous_line = self.property_lines.pop(prop, None)
+            if prop in css_properties:
+                self.property_lines[prop] = self._property_matrix_line(prop)
+            if self.property_lines.get(prop) != previous_line:
+                stale.add('property_matrix')
+
+        self.stale.update(stale)
+        if write:
+            self.write(self.stale)
+        return stale
+
+    def _render_component(self, name: str, comp_data: Dict[str, Any]) -> Set[str]:
+        detailed_rows = []
+        aggregates = CSSAggregates.collect([(name, comp_data)],
+                                           on_declaration=lambda *row: detailed_rows.append(row))
+        self.aggregates.set(name, aggregates)
+        has_styles = comp_data.get('has_styles', False)
+        self.styled[name] = has_styles
+        self.cells[name] = component_property_values(comp_data.get('css_rules', {})) if has_styles else {}
+        self.blocks['summary'][name] = render_rows([list(aggregates.components[0])])
+        self.blocks['detailed'][name] = render_rows(detailed_rows)
+        self.blocks['tokens'][name] = render_rows(aggregates.token_rows)
+        self.blocks['unused_selectors'][name] = render_rows(aggregates.unused_selector_rows)
+        if has_styles:
+            self.blocks['component_matrix'][name] = self._component_matrix_line(name)
+        return set(self.cells[name])
+
+    def _component_matrix_line(self, name: str) -> str:
+        cells = self.cells[name]
+        return render_rows([[name] + [cells.get(prop, "") for prop in self.properties]])
+
+    def _property_matrix_line(self, prop: str) -> str:
+        return render_rows([[prop] + [self.cells.get(name, {}).get(prop, "") for name in self.components]])
+
+    def write(self, kinds: Optional[Iterable[str]] = None) -> List[Path]:
+        """Rewrite the given CSV files (all of them by default) from the rendered rows"""
+        sections = {
+            'property_matrix': (['CSS Property'] + self.components,
+                                (self.property_lines[prop] for prop in self.properties)),
+            'component_matrix': (['Component'] + self.properties,
+                                 (self.blocks['component_matrix'][name] for name in sorted(self.components)
+                                  if self.styled[name])),
+            'summary': (self.HEADERS['summary'], (self.blocks['summary'][n] for n in self.components)),
+            'detailed': (self.HEADERS['detailed'], (self.blocks['detailed'][n] for n in self.components)),
+            'tokens': (self.HEADERS['tokens'], (self.blocks['tokens'][n] for n in self.components)),
+            'unused_selectors': (self.HEADERS['unused_selectors'],
+                                 (self.blocks['unused_selectors'][n] for n in self.components)),
+        }
+        written = []
+        for kind in list(sections if kinds is None else kinds):
+            headers, lines = sections[kind]
+            path = self.output_dir / self.FILE_NAMES[kind]
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                f.write(render_rows([headers]))
+                f.writelines(lines)
+            os.replace(tmp_path, path)
+            self.stale.discard(kind)
+            written.append(path)
+        return written
+
+class CSSWatcher:
+    def __init__(self, extractor: 'SvelteCSSExtractor', csv_dir: str, summary_file: Optional[str] = None,
+                 interval: float = 0.5, debounce: float = 0.2, token_csv: Optional[str] = None,
+                 write_outputs: bool = True):
+        self.extractor = extractor
+        self.outputs = IncrementalCSVOutputs(csv_dir)
+        # False keeps the outputs up to date in memory only, to be written on request (css_server)
+        self.write_outputs = write_outputs
+        self.summary_file = summary_file
+        self.token_csv = token_csv
+        self.tokens: Optional[TokenIndex] = None
+        self.interval = interval
+        self.debounce = debounce
+        self.files: List[Path] = []
+        self.stamps: Dict[Path, FileStamp] = {}
+        self.results: Dict[Path, Tuple[Dict[str, Any], Set[str]]] = {}
+        # How many files saw each property; all_css_properties is the set of keys
+        self.property_refs: Counter = Counter()
+
+    def scan(self) -> Dict[Path, FileStamp]:
+        """Stat every .svelte file, in discovery order"""
+        stamps = {}
+        for file_path in self.extractor.discover_files():
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            stamps[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return stamps
+
+    def initial_build(self, **extract_options) -> None:
+        for component_data, css_properties in self.extractor.iter_component_results(**extract_options):
+            file_path = Path(component_data['file_path'])
+            self.results[file_path] = (component_data, css_properties)
+        # Anything that changed during the build is picked up by the first poll
+        self.stamps = {p: stamp for p, stamp in self.scan().items() if p in self.results}
+        for file_path in [p for p in self.results if p not in self.stamps]:
+            del self.results[file_path]
+        self.files = list(self.results)
+        for _, css_properties in self.results.values():
+            self.property_refs.update(css_properties)
+        self._sync_extractor()
+        self.outputs.update(self.extractor.components_data, self.extractor.all_css_properties,
+                            write=self.write_outputs)
+        if self.write_outputs:
+            self.write_summary()
+        if self.token_csv:
+            self.tokens = TokenIndex.build(self.extractor.components_data.items(),
+                                           default_stylesheets(str(self.extractor.base_path)))
+            if self.write_outputs:
+                self.tokens.write_csv(self.token_csv)
+
+    def apply_changes(self, stamps: Dict[Path, FileStamp]) -> Set[str]:
+        """Re-extract changed and new files, drop deleted ones, and patch the outputs
+
+        Returns the names of the components whose rows were updated.
+        """
+        touched = [p for p, stamp in stamps.items() if self.stamps.get(p) != stamp]
+        deleted = [p for p in self.stamps if p not in stamps]
+        changed_names: Set[str] = set()
+
+        for file_path in deleted:
+            component_data, css_properties = self.results.pop(file_path)
+            self.property_refs.subtract(css_properties)
+            changed_names.add(component_data['component_name'])
+        for file_path in touched:
+            if file_path in self.results:
+                old_data, old_properties = self.results[file_path]
+                self.property_refs.subtract(old_properties)
+                changed_names.add(old_data['component_name'])
+            component_data, css_properties = self.extractor._extract_with_properties(file_path)
+            self.results[file_path] = (component_data, css_properties)
+            self.property_refs.update(css_properties)
+            changed_names.add(component_data['component_name'])
+
+        self.stamps = stamps
+        self.files = list(stamps)
+        self._sync_extractor()
+        stale = self.outputs.update(self.extractor.components_data, self.extractor.all_css_properties,
+                                    set(changed_names), write=self.write_outputs)
+        # The report is built from the same rows as the CSVs: unchanged rows, unchanged report
+        if self.write_outputs and stale:
+            self.write_summary()
+        if self.tokens is not None:
+            tokens_changed = False
+            for name in changed_names:
+                before = self.tokens.source_entries(name)
+                if name in self.extractor.components_data:
+                    self.tokens.add_component(name, self.extractor.components_data[name])
+                else:
+                    self.tokens.remove_component(name)
+                tokens_changed = tokens_changed or self.tokens.source_entries(name) != before
+            if self.write_outputs and tokens_changed:
+                self.tokens.write_csv(self.token_csv)
+        return changed_names
+
+    def _sync_extractor(self) -> None:
+        """Patch all_css_properties from the reference counts and re-link components_data
+
+        components_data keeps the save_results semantics: discovery order of
+        each name's first file, data from its last file.
+        """
+        self.property_refs = +self.property_refs
+        properties = self.extractor.all_css_properties
+        properties.intersection_update(self.property_refs)
+        properties.update(self.property_refs)
+        components_data = {}
+        for file_path in self.files:
+            component_data = self.results[file_path][0]
+            components_data[component_data['component_name']] = component_data
+        self.extractor.components_data = components_data
+
+    def write_summary(self) -> None:
+        if self.summary_file:
+            aggregates = self.outputs.aggregates.aggregates(self.extractor.components_data)
+            write_summary_report(self.extractor.metadata(), aggregates, self.summary_file)
+
+    def wait_for_changes(self) -> Optional[Dict[Path, FileStamp]]:
+        """Sleep one poll interval; return the settled stamps if anything changed, else None"""
+        time.sleep(self.interval)
+        stamps = self.scan()
+        if stamps == self.stamps:
+            return None
+        # Debounce: wait for the tree to settle so a burst of saves is one update
+        while True:
+            time.sleep(self.debounce)
+            settled = self.scan()
+            if settled == stamps:
+                return stamps
+            stamps = settled
+
+    def run(self, **extract_options) -> None:
+        """Build once, then poll until interrupted"""
+        self.initial_build(**extract_options)
+        print(f"Watching {self.extractor.base_path} for .svelte changes (Ctrl+C to stop)")
+        try:
+            while True:
+                stamps = self.wait_for_changes()
+                if stamps is None:
+                    continue
+                start = time.perf_counter()
+                changed = self.apply_changes(stamps)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"Updated {len(changed)} component(s) in {elapsed:.1f} ms: {', '.join(sorted(changed))}")
+        except KeyboardInterrupt:
+            print("Stopped watching")
@@ -1,122 +1,78 @@
 #!/usr/bin/env python3
 """
-Convert extracted CSS data from JSON to CSV format
+Convert extracted CSS data from JSON (or a JSONL stream) to CSV format
 """
 
-import json
-import csv
+import argparse
 from pathlib import Path
+from typing import Any, Dict, Tuple
 
-def create_csv_from_json(json_file_path: str, output_dir: str = "."):
+from css_aggregates import CSSAggregates
+from css_instrument import add_instrumentation_arguments, instrumentation_from_args
+from css_output import BatchedRowWriter, OutputWriterPool, open_output, output_path, write_rows
+from css_results import load_results
+
+def create_csv_from_json(json_file_path: str, output_dir: str = ".", compress: bool = False, workers: int = 1):
     """Convert JSON data to CSV files"""
     
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+    data = load_results(json_file_path)
+    csv_files, _ = write_csv_files(data, output_dir, compress=compress, workers=workers)
+    return csv_files
+
+def write_csv_files(data: Dict[str, Any], output_dir: str = ".", compress: bool = False,
+                    workers: int = 1) -> Tuple[Dict[str, Path], CSSAggregates]:
+    """Write all six CSV files from loaded (or live) extraction results
+    
+    The components are walked once; the detailed rules CSV is written during
+    that pass and the aggregates it produces are returned for reuse by the
+    summary report. With compress, every file is gzipped (and named .csv.gz).
+    With workers > 1 the two matrix files are written on threads while the
+    detailed pass runs, and the three files it feeds are written in parallel.
+    """
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True)
     
-    # Create property-centric CSV (CSS properties as rows, components as columns)
-    property_csv_path = output_dir / "css_properties_by_component.csv"
-    
-    with open(property_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        # Write headers
-        headers = data['csv_data']['property_rows']['headers']
-        writer.writerow(headers)
-        
-        # Write data rows
-        for row in data['csv_data']['property_rows']['data']:
-            writer.writerow(row)
-    
-    # Create component-centric CSV (components as rows, CSS properties as columns)
-    component_csv_path = output_dir / "components_by_css_properties.csv"
-    
-    with open(component_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        # Write headers
-        headers = data['csv_data']['component_rows']['headers']
-        writer.writerow(headers)
-        
-        # Write data rows
-        for row in data['csv_data']['component_rows']['data']:
-            writer.writerow(row)
-    
-    # Create a summary CSV with component metadata
-    summary_csv_path = output_dir / "component_summary.csv"
-    
-    with open(summary_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
+    with OutputWriterPool(workers) as pool:
+        # Create property-centric CSV (CSS properties as rows, components as columns)
+        property_csv_path = output_path(output_dir / "css_properties_by_component.csv", compress)
+        pool.submit(write_rows, property_csv_path,
+                    data['csv_data']['property_rows']['headers'],
+                    data['csv_data']['property_rows']['data'], compress)
         
-        # Write headers
-        writer.writerow(['Component', 'File Path', 'Has Styles', 'CSS Rules Count', 'Unique Properties Count'])
+        # Create component-centric CSV (components as rows, CSS properties as columns)
+        component_csv_path = output_path(output_dir / "components_by_css_properties.csv", compress)
+        pool.submit(write_rows, component_csv_path,
+                    data['csv_data']['component_rows']['headers'],
+                    data['csv_data']['component_rows']['data'], compress)
         
-        # Write component data
-        for comp_name, comp_data in data['components'].items():
-            css_rules_count = len(comp_data.get('css_rules', {}))
-            unique_props = set()
-            
-            for selector, properties in comp_data.get('css_rules', {}).items():
-                unique_props.update(properties.keys())
-            
-            writer.writerow([
-                comp_name,
-                comp_data.get('relative_path', ''),
-                comp_data.get('has_styles', False),
-                css_rules_count,
-                len(unique_props)
-            ])
-    
-    # Create a detailed CSS rules CSV
-    detailed_csv_path = output_dir / "detailed_css_rules.csv"
-    
-    with open(detailed_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
+        # Create a detailed CSS rules CSV, gathering the shared aggregates in the same pass
+        detailed_csv_path = output_path(output_dir / "detailed_css_rules.csv", compress)
         
-        # Write headers
-        writer.writerow(['Component', 'Selector', 'Property', 'Value', 'File Path'])
+        with open_output(detailed_csv_path, compress) as csvfile:
+            writer = BatchedRowWriter(csvfile)
+            writer.writerow(['Component', 'Selector', 'Property', 'Value', 'File Path'])
+            aggregates = CSSAggregates.collect(
+                data['components'].items(),
+                on_declaration=lambda *row: writer.writerow(row)
+            )
+            writer.flush()
         
-        # Write detailed data
-        for comp_name, comp_data in data['components'].items():
-            if not comp_data.get('has_styles', False):
-                continue
-                
-            file_path = comp_data.get('relative_path', '')
-            
-            for selector, properties in comp_data.get('css_rules', {}).items():
-                for prop_name, prop_value in properties.items():
-                    writer.writerow([comp_name, selector, prop_name, prop_value, file_path])
-    
-    # Create CSS custom properties (tokens) analysis
-    tokens_csv_path = output_dir / "css_custom_properties.csv"
-    
-    with open(tokens_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
+        # Create a summary CSV with component metadata
+        summary_csv_path = output_path(output_dir / "component_summary.csv", compress)
+        pool.submit(write_rows, summary_csv_path,
+                    ['Component', 'File Path', 'Has Styles', 'CSS Rules Count', 'Unique Properties Count'],
+                    aggregates.components, compress)
         
-        # Write headers
-        writer.writerow(['Component', 'Selector', 'Property', 'Custom Property Used', 'Full Value', 'File Path'])
+        # Create CSS custom properties (tokens) analysis
+        tokens_csv_path = output_path(output_dir / "css_custom_properties.csv", compress)
+        pool.submit(write_rows, tokens_csv_path,
+                    ['Component', 'Selector', 'Property', 'Custom Property Used', 'Full Value', 'File Path'],
+                    aggregates.token_rows, compress)
         
-        # Extract custom properties (CSS variables)
-        for comp_name, comp_data in data['components'].items():
-            if not comp_data.get('has_styles', False):
-                continue
-                
-            file_path = comp_data.get('relative_path', '')
-            
-            for selector, properties in comp_data.get('css_rules', {}).items():
-                for prop_name, prop_value in properties.items():
-                    # Look for var() usage
-                    if 'var(' in prop_value:
-                        import re
-                        # Extract all var() references
-                        var_matches = re.findall(r'var\((--[^,)]+)', prop_value)
-                        for var_name in var_matches:
-                            writer.writerow([comp_name, selector, prop_name, var_name, prop_value, file_path])
-                    elif prop_value.startswith('--'):
-                        # CSS custom property definition
-                        writer.writerow([comp_name, selector, prop_name, prop_value, prop_value, file_path])
+        # Selectors that cannot match any element in their component's markup
+        unused_csv_path = output_path(output_dir / "unused_selectors.csv", compress)
+        pool.submit(write_rows, unused_csv_path, ['Component', 'Unused Selector', 'File Path'],
+                    aggregates.unused_selector_rows, compress)
     
     print(f"Created CSV files:")
     print(f"  1. {property_csv_path} - CSS properties as rows, components as columns")
@@ -124,42 +80,41 @@ def create_csv_from_json(json_file_path: str, output_dir: str = "."):
     print(f"  3. {summary_csv_path} - Component metadata summary")
     print(f"  4. {detailed_csv_path} - Detailed CSS rules breakdown")
     print(f"  5. {tokens_csv_path} - CSS custom properties/tokens analysis")
+    print(f"  6. {unused_csv_path} - Selectors matching nothing in their component")
     
-    return {
+    csv_files = {
         'property_matrix': property_csv_path,
         'component_matrix': component_csv_path,
         'summary': summary_csv_path,
         'detailed': detailed_csv_path,
-        'tokens': tokens_csv_path
+        'tokens': tokens_csv_path,
+        'unused_selectors': unused_csv_path
     }
+    return csv_files, aggregates
 
 def print_statistics(json_file_path: str):
     """Print useful statistics about the CSS data"""
     
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+    data = load_results(json_file_path)
+    print_aggregate_statistics(data['metadata'], CSSAggregates.collect(data['components'].items()))
+
+def print_aggregate_statistics(metadata: Dict[str, Any], aggregates: CSSAggregates) -> None:
     print(f"\n=== CSS EXTRACTION STATISTICS ===")
-    print(f"Total Components: {data['metadata']['total_components']}")
-    print(f"Components with Styles: {data['metadata']['components_with_styles']}")
-    print(f"Components without Styles: {data['metadata']['total_components'] - data['metadata']['components_with_styles']}")
-    print(f"Total CSS Properties Found: {data['metadata']['total_css_properties']}")
+    print(f"Total Components: {metadata['total_components']}")
+    print(f"Components with Styles: {metadata['components_with_styles']}")
+    print(f"Components without Styles: {metadata['total_components'] - metadata['components_with_styles']}")
+    print(f"Total CSS Properties Found: {metadata['total_css_properties']}")
     
     # Count CSS custom properties
-    custom_props = [prop for prop in data['metadata']['css_properties'] if prop.startswith('--')]
+    custom_props = [prop for prop in metadata['css_properties'] if prop.startswith('--')]
     print(f"CSS Custom Properties (tokens): {len(custom_props)}")
     
     # Count vendor prefixed properties
-    vendor_props = [prop for prop in data['metadata']['css_properties'] if prop.startswith(('-webkit-', '-moz-', '-ms-'))]
+    vendor_props = [prop for prop in metadata['css_properties'] if prop.startswith(('-webkit-', '-moz-', '-ms-'))]
     print(f"Vendor Prefixed Properties: {len(vendor_props)}")
     
     # Most complex components (by CSS rule count)
-    comp_complexity = []
-    for comp_name, comp_data in data['components'].items():
-        if comp_data.get('has_styles', False):
-            rule_count = len(comp_data.get('css_rules', {}))
-            comp_complexity.append((comp_name, rule_count))
-    
+    comp_complexity = [(c.name, c.rule_count) for c in aggregates.styled_components]
     comp_complexity.sort(key=lambda x: x[1], reverse=True)
     
     print(f"\nMost Complex Components (by CSS rule count):")
@@ -167,17 +122,35 @@ def print_statistics(json_file_path: str):
         print(f"{i:2d}. {comp_name}: {rule_count} CSS rules")
 
 def main():
-    json_file = "/Users/peterabbott/folio/svelte-folio/css_extraction_results.json"
-    output_directory = "/Users/peterabbott/folio/svelte-folio/csv_output"
+    parser = argparse.ArgumentParser(description="Convert CSS extraction results to CSV files")
+    parser.add_argument('json_file', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/css_extraction_results.json",
+                        help="Results from css_extractor.py (.json or .jsonl)")
+    parser.add_argument('output_directory', nargs='?',
+                        default="/Users/peterabbott/folio/svelte-folio/csv_output")
+    parser.add_argument('--gzip', action='store_true', help="Write gzip-compressed .csv.gz files")
+    parser.add_argument('--writers', type=int, default=1,
+                        help="Threads writing independent CSV files concurrently (default: 1)")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    json_file = args.json_file
+    output_directory = args.output_directory
+    instrumentation = instrumentation_from_args(args)
+    instrumentation.start()
     
     print("Converting JSON to CSV...")
-    csv_files = create_csv_from_json(json_file, output_directory)
+    with instrumentation.phase('load'):
+        data = load_results(json_file)
+    with instrumentation.phase('csv'):
+        csv_files, aggregates = write_csv_files(data, output_directory, compress=args.gzip, workers=args.writers)
     
-    print_statistics(json_file)
+    print_aggregate_statistics(data['metadata'], aggregates)
     
     print(f"\n=== FILES CREATED ===")
     for csv_type, file_path in csv_files.items():
         print(f"{csv_type}: {file_path}")
+    
+    instrumentation.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
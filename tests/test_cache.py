@@ -0,0 +1,78 @@
+"""
+The extraction cache must never hand back records shaped for another
+extractor mode (raw_css kept or dropped, compact records or plain dicts).
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_cache import ExtractionCache
+from css_extractor import SvelteCSSExtractor
+from css_model import ComponentRecord
+
+COMPONENT = """<div class="card"><p class="title">Hi</p></div>
+<style>
+.card { padding: 1rem; color: red; }
+.card .title { color: blue; }
+</style>
+"""
+
+class WarmCacheModeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.components = Path(self.tmp.name) / "components"
+        self.components.mkdir()
+        (self.components / "Card.svelte").write_text(COMPONENT, encoding='utf-8')
+        self.cache_path = Path(self.tmp.name) / "cache"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def extract(self, **options):
+        extractor = SvelteCSSExtractor(str(self.components), **options)
+        cache = ExtractionCache(str(self.cache_path), str(self.components), compact=extractor.compact,
+                                keep_raw_css=extractor.keep_raw_css)
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.process_all_components(cache=cache)
+        return extractor.components_data['Card'], cache
+
+    def test_drop_raw_css_after_warm_run(self):
+        record, cache = self.extract()
+        self.assertIn('raw_css', record)
+        record, cache = self.extract(keep_raw_css=False)
+        self.assertNotIn('raw_css', record)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        record, cache = self.extract(keep_raw_css=False)
+        self.assertNotIn('raw_css', record)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_compact_mode_after_warm_run(self):
+        record, _ = self.extract()
+        self.assertIsInstance(record, ComponentRecord)
+        record, cache = self.extract(compact=False)
+        self.assertIsInstance(record, dict)
+        self.assertEqual(cache.hits, 0)
+
+class StampTest(unittest.TestCase):
+    def test_edit_during_extraction_is_caught_on_the_next_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "Card.svelte"
+            path.write_text(COMPONENT, encoding='utf-8')
+            cache = ExtractionCache(str(Path(tmp) / "cache"), tmp)
+            self.assertIsNone(cache.lookup(path))
+            # Same size, new mtime: the edit lands after lookup() and before store()
+            path.write_text(COMPONENT.replace('red', 'tan'), encoding='utf-8')
+            mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+            cache.store(path, {'component_name': 'Card'}, set())
+            self.assertIsNone(cache.lookup(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Selector specificity and cascade conflict resolution (css_cascade).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_cascade import find_cascade_conflicts, parse_selector
+from css_parser import parse_stylesheet, rules_to_dict
+
+def conflicts_of(css):
+    at_rules, positions = {}, {}
+    css_rules = rules_to_dict(parse_stylesheet(css), at_rules, positions)
+    return find_cascade_conflicts(css_rules, at_rules, positions)
+
+def winner(conflict):
+    return conflict['winner']['selector'], conflict['winner']['value']
+
+@pytest.mark.parametrize('selector, specificity', [
+    ('p', (0, 0, 1)),
+    ('.btn', (0, 1, 0)),
+    ('#main', (1, 0, 0)),
+    ('*', (0, 0, 0)),
+    ('ul li.active > a:hover', (0, 2, 3)),
+    ('a[href^="http"]', (0, 1, 1)),
+    ('p::before', (0, 0, 2)),
+    ('p:after', (0, 0, 2)),
+    (':is(#a, .b) p', (1, 0, 1)),
+    (':not(.a.b)', (0, 2, 0)),
+    (':where(#a .b) p', (0, 0, 1)),
+    ('li:nth-child(2n of .item)', (0, 2, 1)),
+    (':global(.dark) .card', (0, 2, 0)),
+    (':global .card', (0, 1, 0)),
+])
+def test_specificity(selector, specificity):
+    assert parse_selector(selector).specificity == specificity
+
+def test_subject_is_the_last_compound():
+    parsed = parse_selector('.card > .title:hover::after')
+    assert parsed.subject == frozenset({'.title', ':hover'})
+    assert parsed.pseudo_element == 'after'
+
+def test_higher_specificity_wins_over_later_rule():
+    [conflict] = conflicts_of('.card .title { color: red; } .title { color: blue; }')
+    assert winner(conflict) == ('.card .title', 'red')
+    assert conflict['overridden'][0]['selector'] == '.title'
+
+def test_later_rule_wins_at_equal_specificity():
+    [conflict] = conflicts_of('.a p { color: red; } .b p { color: blue; }')
+    assert winner(conflict) == ('.b p', 'blue')
+
+def test_repeated_selector_takes_the_position_of_its_last_declaration():
+    [conflict] = conflicts_of('.a p { color: red; } .b p { color: blue; } .a p { color: green; }')
+    assert winner(conflict) == ('.a p', 'green')
+    assert [(o['selector'], o['value']) for o in conflict['overridden']] == [('.b p', 'blue')]
+
+def test_repeated_selector_keeps_earlier_position_for_properties_it_did_not_repeat():
+    css = '.a p { margin: 0; } .b p { margin: 1px; } .a p { color: green; }'
+    [conflict] = conflicts_of(css)
+    assert conflict['property'] == 'margin'
+    assert winner(conflict) == ('.b p', '1px')
+
+def test_important_beats_specificity():
+    [conflict] = conflicts_of('#x .t { color: red; } .t { color: blue !important; }')
+    assert winner(conflict) == ('.t', 'blue !important')
+
+def test_rules_in_other_at_rule_contexts_do_not_conflict():
+    assert conflicts_of('.t { color: red; } @media (max-width: 600px) { .t.u { color: blue; } }') == []
+
+def test_different_pseudo_elements_do_not_conflict():
+    assert conflicts_of('.t::before { color: red; } .t { color: blue; }') == []
+
+def test_disjoint_subjects_conflict_only_through_a_combining_rule():
+    assert conflicts_of('.a { color: red; } .b { color: blue; }') == []
+    [conflict] = conflicts_of('.a { color: red; } .b { color: blue; } .a.b { margin: 0; }')
+    assert winner(conflict) == ('.b', 'blue')
+
+def test_keyframes_are_skipped():
+    assert conflicts_of('@keyframes spin { from { opacity: 0; } to { opacity: 1; } }') == []
@@ -0,0 +1,46 @@
+"""
+SQLite index (css_index_db): build, queries and failed rebuilds.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_index_db import CSSIndexDB, build_database
+
+COMPONENTS = [
+    ('Modal', {'relative_path': 'Modal.svelte', 'has_styles': True,
+               'css_rules': {'.backdrop': {'z-index': '100', 'color': 'var(--fg, black)'},
+                             '@media (max-width: 600px) .backdrop': {'z-index': '5'}},
+               'at_rules': {'@media (max-width: 600px) .backdrop': ['@media (max-width: 600px)']}}),
+    ('Tooltip', {'relative_path': 'Tooltip.svelte', 'has_styles': True,
+                 'css_rules': {'.tip': {'z-index': '10 !important'}}}),
+    ('Plain', {'relative_path': 'Plain.svelte', 'has_styles': False, 'css_rules': {}}),
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "css #1?.db")
+    assert build_database(COMPONENTS, path) == {'components': 3, 'selectors': 3, 'declarations': 4, 'var_refs': 1}
+    return path
+
+def test_property_comparisons_combine(db_path):
+    with CSSIndexDB(db_path) as db:
+        assert [row[0] for row in db.property_usages('z-index', {'gt': 1})] == ['Modal', 'Modal', 'Tooltip']
+        assert db.property_usages('z-index', {'gt': 5, 'lt': 100}) == [('Tooltip', '.tip', '10 !important')]
+
+def test_token_and_component_lookups(db_path):
+    with CSSIndexDB(db_path) as db:
+        assert db.token_usages('--fg') == [('Modal', '.backdrop', 'color', 'var(--fg, black)')]
+        assert db.component_declarations('Tooltip') == [('.tip', 'z-index', '10 !important')]
+        assert db.query("SELECT at_rules FROM selectors WHERE at_rules != ''") == [('@media (max-width: 600px)',)]
+
+def test_failed_rebuild_keeps_the_previous_index(db_path):
+    broken = [('Broken', {'relative_path': {'not': 'bindable'}, 'has_styles': False, 'css_rules': {}})]
+    with pytest.raises(Exception):
+        build_database(broken, db_path)
+    with CSSIndexDB(db_path) as db:
+        assert db.query("SELECT COUNT(*) FROM components") == [(3,)]
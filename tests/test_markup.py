@@ -0,0 +1,44 @@
+"""
+Markup index and unused selector detection (css_markup).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_markup import find_unused_selectors, index_markup
+
+def unused(markup, css_rules, at_rules=None):
+    return find_unused_selectors(css_rules, index_markup(markup.encode('utf-8'), []), at_rules)
+
+def test_static_classes_ids_and_elements():
+    markup = '<div class="card wide" id="main"><p class:active={on}>Hi</p></div>'
+    css_rules = {'.card': {}, '.wide p': {}, '#main': {}, '.active': {}, 'span': {}, '.missing': {}, '#other': {}}
+    assert unused(markup, css_rules) == ['span', '.missing', '#other']
+
+def test_expression_prefixes_and_candidates():
+    markup = '<button class="btn-{size} {variant === \'ghost\' ? \'ghost\' : \'\'}">x</button>'
+    assert unused(markup, {'.btn-sm': {}, '.ghost': {}, '.btn': {}}) == ['.btn']
+
+def test_script_strings_are_candidates():
+    markup = "<script>const variants = { primary: 'primary', nav: `nav-${kind}` };</script><a class={cls}>x</a>"
+    index = index_markup(markup.encode('utf-8'), [])
+    assert index.scripts
+    assert index.has_class('primary') and index.has_class('nav-link')
+    assert not index.scripts
+    assert not index.has_class('inverse')
+
+def test_script_is_not_scanned_when_markup_resolves_every_selector():
+    markup = "<script>const svg = `<path d=\"M0 0\" />`;</script><svg class=\"icon\"></svg>"
+    index = index_markup(markup.encode('utf-8'), [])
+    assert find_unused_selectors({'.icon': {}, 'svg': {}}, index) == []
+    assert index.scripts and not index.candidates
+
+def test_global_and_keyframes_are_ignored():
+    css_rules = {':global(.dark) .card': {}, '@keyframes spin from': {}}
+    at_rules = {'@keyframes spin from': ['@keyframes spin']}
+    assert unused('<div class="card"></div>', css_rules, at_rules) == []
+
+def test_selector_lists_report_each_unmatched_part():
+    assert unused('<p></p>', {'p, .gone': {}}) == ['.gone']
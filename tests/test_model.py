@@ -0,0 +1,43 @@
+"""
+Compact records (css_model) read like the dicts they replace.
+"""
+
+import json
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_model import ComponentRecord, Declarations, RuleSet, json_default
+
+CSS_RULES = {
+    '.fade': {'opacity': '0', 'transition-property': 'opacity', 'transition': 'opacity 1s'},
+    '.fade.in': {'opacity': '1'},
+}
+
+def test_declarations_lookup_skips_values_equal_to_a_name():
+    declarations = Declarations({'transition-property': 'opacity', 'opacity': '0'})
+    assert declarations['opacity'] == '0'
+    assert 'opacity' in declarations and '0' not in declarations
+    with pytest.raises(KeyError):
+        declarations['color']
+
+def test_rule_set_reads_like_a_dict():
+    rules = RuleSet(CSS_RULES)
+    assert list(rules) == list(CSS_RULES)
+    assert rules['.fade.in']['opacity'] == '1'
+    assert rules.get('.missing') is None
+    assert '.fade' in rules and '.missing' not in rules
+    assert {selector: dict(properties) for selector, properties in rules.items()} == CSS_RULES
+
+def test_records_pickle_and_serialise_like_dicts():
+    component = {'file_path': '/c/Fade.svelte', 'relative_path': 'Fade.svelte', 'component_name': 'Fade',
+                 'has_styles': True, 'css_rules': CSS_RULES, 'raw_css': '.fade { opacity: 0 }'}
+    record = ComponentRecord.from_dict(component)
+    record['css_rules']['.fade']
+    restored = pickle.loads(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+    assert restored['css_rules']['.fade']['transition'] == 'opacity 1s'
+    assert json.dumps(restored, default=json_default) == json.dumps(component)
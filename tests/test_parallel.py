@@ -0,0 +1,34 @@
+"""
+The process-pool scan merges results in discovery order, so its output is
+byte-identical to a serial run.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_extractor import SvelteCSSExtractor
+
+def extract(root, output, **options):
+    extractor = SvelteCSSExtractor(str(root))
+    extractor.process_all_components(**options)
+    extractor.save_results(str(output))
+    return extractor, output.read_bytes()
+
+@pytest.mark.parametrize('chunksize', [1, 4])
+def test_parallel_scan_matches_serial(tmp_path, chunksize):
+    root = tmp_path / "components"
+    for i in range(20):
+        folder = root / f"section{i % 3}"
+        folder.mkdir(parents=True, exist_ok=True)
+        style = f"<style>\n.c{i} {{ padding: {i}px; }}\n.c{i}:hover {{ color: var(--accent-{i % 5}); }}\n</style>\n"
+        (folder / f"Card{i}.svelte").write_text(f'<div class="c{i}"></div>\n' + (style if i % 4 else ''),
+                                                encoding='utf-8')
+    serial, expected = extract(root, tmp_path / "serial.json")
+    parallel, output = extract(root, tmp_path / "parallel.json", workers=2, chunksize=chunksize)
+    assert output == expected
+    assert list(parallel.components_data) == list(serial.components_data)
+    assert parallel.all_css_properties == serial.all_css_properties
@@ -0,0 +1,68 @@
+"""
+Single-pass CSS parser (css_parser): rules, at-rule context, nesting and
+the selector list helpers.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_parser import parse_stylesheet, resolve_nested_selector, rules_to_dict, split_selector_list
+
+def parse(css):
+    at_rules, positions = {}, {}
+    return rules_to_dict(parse_stylesheet(css), at_rules, positions), at_rules, positions
+
+@pytest.mark.parametrize('css, expected', [
+    ('.a { color: red; background: url("x;y.png"); }', {'.a': {'color': 'red', 'background': 'url("x;y.png")'}}),
+    ('.a { background: url(data:image/png;base64,AAA) }', {'.a': {'background': 'url(data:image/png;base64,AAA)'}}),
+    ('/* .x { color: red } */ .a { content: "}"; color: blue }', {'.a': {'content': '"}"', 'color': 'blue'}}),
+    ('.a, .b { color: red }', {'.a, .b': {'color': 'red'}}),
+    ('.a { color: red !important }', {'.a': {'color': 'red !important'}}),
+])
+def test_declarations(css, expected):
+    assert parse(css)[0] == expected
+
+def test_at_rules_prefix_keys_and_record_their_chain():
+    css_rules, at_rules, _ = parse('@supports (display: grid) { @media print { .a { color: red } } }')
+    key = '@supports (display: grid) @media print .a'
+    assert css_rules == {key: {'color': 'red'}}
+    assert at_rules == {key: ['@supports (display: grid)', '@media print']}
+
+def test_declarations_directly_in_an_at_rule():
+    assert parse('@font-face { font-family: X; src: url(a.woff) }')[0] == {
+        '@font-face': {'font-family': 'X', 'src': 'url(a.woff)'}}
+
+def test_keyframe_steps_are_keyed_under_the_at_rule():
+    css_rules, at_rules, _ = parse('@keyframes spin { from { opacity: 0 } to { opacity: 1 } }')
+    assert list(css_rules) == ['@keyframes spin from', '@keyframes spin to']
+    assert at_rules['@keyframes spin to'] == ['@keyframes spin']
+
+def test_nested_rules_resolve_against_their_parent():
+    css_rules, _, _ = parse('.card { color: red; &:hover { color: blue } .title { margin: 0 } }')
+    assert css_rules == {'.card': {'color': 'red'}, '.card:hover': {'color': 'blue'}, '.card .title': {'margin': '0'}}
+    assert parse(':global { .x { color: red } }')[0] == {':global .x': {'color': 'red'}}
+
+def test_repeated_selector_merges_into_its_first_slot_and_records_positions():
+    css_rules, _, positions = parse('.a { color: red } .b { color: green } .a { margin: 0; color: blue }')
+    assert list(css_rules) == ['.a', '.b']
+    assert css_rules['.a'] == {'color': 'blue', 'margin': '0'}
+    # Rule index of the last declaration of each property
+    assert positions == {'.a': {'color': 2, 'margin': 2}, '.b': {'color': 1}}
+
+def test_unterminated_block_keeps_the_rules_before_it():
+    assert parse('.a { color: red; .b { unterminated')[0] == {'.a': {'color': 'red'}}
+
+def test_stats_count_var_references():
+    stats = {}
+    parse_stylesheet('.a { color: var(--x); margin: var(--y, var(--z)) }', stats)
+    assert stats['var_refs'] == 3
+
+def test_split_selector_list_respects_parentheses_and_strings():
+    assert split_selector_list('.a, :is(.b, .c) d, [x="1,2"]') == ['.a', ':is(.b, .c) d', '[x="1,2"]']
+
+def test_resolve_nested_selector_expands_both_lists():
+    assert resolve_nested_selector('.a, .b', '&:hover, .c') == '.a:hover, .a .c, .b:hover, .b .c'
@@ -0,0 +1,41 @@
+"""
+Unix socket handling of the CSS index server (css_server).
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_server import SocketPathError, make_server
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="needs Unix sockets")
+
+def test_regular_file_is_not_replaced(tmp_path):
+    path = tmp_path / "css.sock"
+    path.write_text("keep me")
+    with pytest.raises(SocketPathError, match="not a socket"):
+        make_server(None, socket_path=str(path))
+    assert path.read_text() == "keep me"
+
+def test_live_socket_is_not_replaced(tmp_path):
+    path = str(tmp_path / "css.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(path)
+        listener.listen(1)
+        with pytest.raises(SocketPathError, match="in use"):
+            make_server(None, socket_path=path)
+    finally:
+        listener.close()
+
+def test_stale_socket_is_replaced(tmp_path):
+    path = str(tmp_path / "css.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = make_server(None, socket_path=path)
+    server.server_close()
@@ -0,0 +1,83 @@
+"""
+Sharded extraction (css_shard): partials merged back, directly or through
+chained merges, give the same results as one unsharded run.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_extractor import SvelteCSSExtractor
+from css_shard import PartialMergeError, load_partials, merge_partials, write_partial
+
+SHARDS = 3
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "components"
+    for i in range(12):
+        folder = root / f"group{i % 4}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"Widget{i}.svelte").write_text(
+            f'<div class="w{i}"></div>\n<style>\n.w{i} {{ margin: {i}px; color: var(--fg); }}\n</style>\n',
+            encoding='utf-8')
+    # Same component name twice: whichever file is discovered last must win, as in a single run
+    (root / "a").mkdir()
+    (root / "a" / "Footer.svelte").write_text('<footer></footer>\n<style>footer { color: red; }</style>\n')
+    (root / "z").mkdir()
+    (root / "z" / "Footer.svelte").write_text('<footer></footer>\n<style>footer { color: blue; }</style>\n')
+    (root / "Plain.svelte").write_text('<p>no styles</p>\n')
+    return root
+
+def single_run(root, output):
+    extractor = SvelteCSSExtractor(str(root))
+    extractor.process_all_components()
+    extractor.save_results(str(output))
+    return output.read_bytes()
+
+def write_partials(root, tmp_path):
+    paths = []
+    for index in range(1, SHARDS + 1):
+        extractor = SvelteCSSExtractor(str(root))
+        extractor.shard = (index, SHARDS)
+        path = tmp_path / f"part{index}.jsonl"
+        write_partial(extractor, str(path), extractor.shard)
+        paths.append(str(path))
+    return paths
+
+def merged_run(paths, output):
+    extractor = SvelteCSSExtractor('.')
+    header = load_partials(extractor, paths)
+    extractor.base_path = Path(header['base_path'])
+    extractor.save_results(str(output))
+    return header, output.read_bytes()
+
+def test_partials_merge_to_the_single_run(tree, tmp_path):
+    expected = single_run(tree, tmp_path / "single.json")
+    paths = write_partials(tree, tmp_path)
+    header, merged = merged_run(list(reversed(paths)), tmp_path / "merged.json")
+    assert header['shards'] == [1, 2, 3]
+    assert merged == expected
+    assert merged.count(b'"component_name": "Footer"') == 1
+
+def test_chained_merges_match_a_direct_merge(tree, tmp_path):
+    expected = single_run(tree, tmp_path / "single.json")
+    first, second, third = write_partials(tree, tmp_path)
+    partial = tmp_path / "part12.jsonl"
+    merge_partials([second, first], str(partial))
+    _, merged = merged_run([third, str(partial)], tmp_path / "merged.json")
+    assert merged == expected
+
+def test_overlapping_or_mismatched_partials_are_rejected(tree, tmp_path):
+    first, second, _ = write_partials(tree, tmp_path)
+    with pytest.raises(PartialMergeError, match="shard 1"):
+        merge_partials([first, first], str(tmp_path / "dup.jsonl"))
+    extractor = SvelteCSSExtractor(str(tree))
+    extractor.shard = (1, 2)
+    other = tmp_path / "other.jsonl"
+    write_partial(extractor, str(other), extractor.shard)
+    with pytest.raises(PartialMergeError, match="different shard counts"):
+        load_partials(SvelteCSSExtractor('.'), [second, str(other)])
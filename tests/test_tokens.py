@@ -0,0 +1,51 @@
+"""
+Design-token index (css_tokens): var() parsing, definitions, usages and
+the unused/undefined reports.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from css_tokens import TokenIndex, iter_var_references
+
+def component(css_rules):
+    return {'has_styles': True, 'css_rules': css_rules}
+
+def test_var_references_include_nested_fallbacks():
+    assert list(iter_var_references('var(--a, var(--b, 4px)) var(--c)')) == [
+        ('--a', 'var(--b, 4px)'), ('--b', '4px'), ('--c', None)]
+
+def test_component_definitions_and_usages():
+    index = TokenIndex.build([
+        ('Card', component({'.card': {'--card-bg': 'white', 'color': 'var(--fg, black)'}})),
+        ('Page', component({'.page': {'background': 'var(--card-bg)'}})),
+    ])
+    assert [d.source for d in index.definitions_of('--card-bg')] == ['Card']
+    assert index.components_using('--card-bg') == ['Page']
+    assert index.fallbacks_of('--fg') == {'black'}
+    assert index.unused_tokens() == []
+    assert index.undefined_tokens() == ['--fg']
+
+def test_reindexing_a_component_replaces_its_entries():
+    index = TokenIndex.build([('Card', component({'.card': {'color': 'var(--a)'}}))])
+    index.add_component('Card', component({'.card': {'color': 'var(--b)'}}))
+    assert index.tokens_used_by('Card') == {'--b'}
+    assert index.usages_of('--a') == []
+    index.remove_component('Card')
+    assert index.undefined_tokens() == []
+
+def test_stylesheet_aliases_count_as_usages(tmp_path):
+    stylesheet = tmp_path / "app.css"
+    stylesheet.write_text(":root { --color-neutral-900: #111; --text-primary: var(--color-neutral-900); }\n",
+                          encoding='utf-8')
+    index = TokenIndex.build([('Title', component({'h1': {'color': 'var(--text-primary)'}}))], [stylesheet])
+    assert index.unused_tokens() == []
+    assert index.components_using('--color-neutral-900') == [str(stylesheet)]
+
+def test_source_entries_compare_equal_for_identical_content():
+    index = TokenIndex.build([('Card', component({'.card': {'color': 'var(--a)', '--b': '1px'}}))])
+    before = index.source_entries('Card')
+    index.add_component('Card', component({'.card': {'--b': '1px', 'color': 'var(--a)'}}))
+    assert index.source_entries('Card') == before